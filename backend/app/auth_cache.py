@@ -0,0 +1,95 @@
+import hashlib
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.cache import LRUCache
+from app.models import User
+from app.schemas import UserPublic
+
+
+class AuthCache:
+    """인증 요청마다 반복되던 JWT 검증과 users 조회를 줄이는 캐시.
+
+    - 토큰 해시 → 사용자 id (토큰 만료 시각을 넘지 않게 보관)
+    - 사용자 id → UserPublic (is_admin 같은 플래그가 바뀌면 커밋 직후 무효화, 다른 워커는 user_ttl 안에 반영)
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 10_000,
+        max_users: int = 10_000,
+        token_ttl: float = 300.0,
+        user_ttl: float = 60.0,
+    ) -> None:
+        self.token_ttl = token_ttl
+        self.user_ttl = user_ttl
+        self.tokens = LRUCache(max_tokens)
+        self.users = LRUCache(max_users)
+        # 캐시 미스 때 실제로 든 시간. 적중 한 번이 아낀 시간의 추정치로 쓴다.
+        self.decode_seconds = 0.0
+        self.query_seconds = 0.0
+
+    @staticmethod
+    def token_key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get_user_id(self, token: str) -> int | None:
+        return self.tokens.get(self.token_key(token))
+
+    def put_token(self, token: str, user_id: int, exp: float | None, elapsed: float) -> None:
+        self.decode_seconds += elapsed
+        expires_at = time.monotonic() + self.token_ttl
+        if exp is not None:
+            expires_at = min(expires_at, time.monotonic() + exp - time.time())
+        self.tokens.put(self.token_key(token), user_id, expires_at)
+
+    def get_user(self, user_id: int) -> UserPublic | None:
+        return self.users.get(user_id)
+
+    def put_user(self, user: UserPublic, elapsed: float) -> None:
+        self.query_seconds += elapsed
+        self.users.put(user.id, user, time.monotonic() + self.user_ttl)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.users.pop(user_id)
+
+    def stats(self) -> dict[str, Any]:
+        token_stats = self.tokens.stats()
+        user_stats = self.users.stats()
+        avg_decode = self.decode_seconds / token_stats["misses"] if token_stats["misses"] else 0.0
+        avg_query = self.query_seconds / user_stats["misses"] if user_stats["misses"] else 0.0
+        saved = token_stats["hits"] * avg_decode + user_stats["hits"] * avg_query
+        requests = token_stats["hits"] + token_stats["misses"]
+        return {
+            "tokens": token_stats,
+            "users": user_stats,
+            "avg_decode_ms": round(avg_decode * 1000, 4),
+            "avg_query_ms": round(avg_query * 1000, 4),
+            "saved_ms_total": round(saved * 1000, 2),
+            "saved_ms_per_request": round(saved * 1000 / requests, 4) if requests else 0.0,
+        }
+
+
+auth_cache = AuthCache()
+
+
+@event.listens_for(User, "after_update")
+def _remember_updated_user(_mapper, _connection, target: User) -> None:
+    # 커밋 전에 지우면 다른 요청이 옛 값을 다시 채울 수 있으므로 id 만 모아 두고 커밋 뒤에 무효화한다.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("updated_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_updated_users(session: Session) -> None:
+    for user_id in session.info.pop("updated_user_ids", ()):
+        auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_updated_users(session: Session) -> None:
+    session.info.pop("updated_user_ids", None)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import orjson
+from sqlalchemy import select
+
+from app.database import ReadSessionLocal
+from app.models import Board
+from app.schemas import BoardOut
+from app.serializers import board_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+class BoardRegistry:
+    """게시판 전체를 메모리에 들고 있는 레지스트리.
+
+    게시판은 수가 적고 관리자만 바꾸므로 글 목록/작성 같은 게시판 단위 요청마다 boards 를 조회하지 않는다.
+    이 프로세스의 관리자 API 는 커밋 직후 reload() 를 부르고,
+    다른 워커 프로세스에서 바뀐 내용은 refresh_interval 주기의 재적재로 따라잡는다.
+    """
+
+    def __init__(self, refresh_interval: float = 30.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.by_slug: dict[str, BoardOut] = {}
+        self.by_id: dict[int, BoardOut] = {}
+        self.version = 0
+        self.last_updated: datetime | None = None
+        # GET /boards 응답 본문. 요청마다 직렬화하지 않도록 적재할 때 한 번만 만든다.
+        self.active_json = b"[]"
+        self._boards: list[BoardOut] = []
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def get_active(self, slug: str) -> BoardOut | None:
+        board = self.by_slug.get(slug)
+        if board is None or board.is_deleted:
+            return None
+        return board
+
+    async def reload(self) -> None:
+        async with self._lock:
+            async with ReadSessionLocal() as session:
+                rows = list(await session.scalars(select(Board).order_by(Board.created_at.asc())))
+
+            boards = [BoardOut.model_validate(x) for x in rows]
+            last_updated = max((x.updated_at for x in rows), default=None)
+            # 바뀐 것이 없으면 버전을 그대로 두어 클라이언트의 ETag 가 계속 유효하게 한다.
+            if boards == self._boards and last_updated == self.last_updated:
+                return
+
+            self.by_id = {x.id: x for x in boards}
+            self.by_slug = {x.slug: x for x in boards}
+            self.active_json = orjson.dumps([board_to_dict(x) for x in boards if not x.is_deleted])
+            self.last_updated = last_updated
+            self._boards = boards
+            self.version += 1
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.reload()
+            except Exception:
+                # 실패하면 기존 내용을 그대로 쓰고 다음 주기에 다시 읽는다.
+                logger.warning("게시판 목록 재적재 실패", exc_info=True)
+
+
+board_registry = BoardRegistry()
@@ -0,0 +1,399 @@
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+import orjson
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.database import engine, read_engine
+from app.fts import create_posts_fts_triggers, drop_posts_fts_triggers, request_posts_fts_rebuild
+from app.fts_maintenance import fts_maintainer
+from app.models import comment_path, make_excerpt
+from app.og import extract_first_url
+from app.og_worker import og_enricher
+from app.pagination import sqlite_timestamp
+from app.schemas import CommentImport, ImportRecord, LikeImport, PostImport
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH = 1000
+
+# 게시판 하나를 NDJSON 으로 내보낸다. 한 줄에 레코드 하나이고 "type" 으로 종류를 구분한다.
+# 작성자는 id 대신 닉네임으로 내보내 다른 DB 로 옮길 수 있게 한다.
+# 모두 인덱스 순서대로 읽어 정렬용 임시 B-tree 없이 흘려보낸다. 댓글은 부모가 항상 자식보다 먼저 나온다.
+EXPORT_QUERIES = (
+    (
+        "post",
+        """
+        SELECT p.id, u.nickname AS author, p.title, p.body_md,
+               p.og_url, p.og_title, p.og_image, p.og_status,
+               p.like_count, p.view_count, p.created_at, p.updated_at
+        FROM posts p JOIN users u ON u.id = p.author_id
+        WHERE p.board_id = :board_id
+        ORDER BY p.id
+        """,
+    ),
+    (
+        "comment",
+        """
+        SELECT c.id, c.post_id, c.parent_id, u.nickname AS author, c.body_md, c.is_deleted,
+               c.created_at, c.updated_at
+        FROM posts p
+        JOIN comments c ON c.post_id = p.id
+        JOIN users u ON u.id = c.author_id
+        WHERE p.board_id = :board_id
+        ORDER BY p.id, c.id
+        """,
+    ),
+    (
+        "like",
+        """
+        SELECT l.post_id, u.nickname AS user, l.created_at
+        FROM posts p
+        JOIN likes l ON l.post_id = p.id
+        JOIN users u ON u.id = l.user_id
+        WHERE p.board_id = :board_id
+        ORDER BY p.id, l.id
+        """,
+    ),
+)
+
+
+def _line(kind: str, row: Any) -> bytes:
+    return orjson.dumps({"type": kind, **row}, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def export_board(board_id: int) -> AsyncIterator[bytes]:
+    """게시판의 글·댓글·좋아요를 EXPORT_BATCH 행씩 읽어 NDJSON 으로 내보낸다. 메모리는 배치 하나만큼만 쓴다."""
+    async with read_engine.connect() as conn:
+        board = (
+            await conn.execute(
+                text("SELECT name, slug, description FROM boards WHERE id = :id"), {"id": board_id}
+            )
+        ).mappings().one()
+        yield _line("board", board)
+        for kind, sql in EXPORT_QUERIES:
+            result = await conn.stream(text(sql), {"board_id": board_id})
+            async for rows in result.mappings().partitions(EXPORT_BATCH):
+                yield b"".join(_line(kind, row) for row in rows)
+
+
+async def ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    """요청 본문 조각을 줄 단위로 잘라 레코드로 돌려준다."""
+    buffer = b""
+    lineno = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            lineno += 1
+            if line.strip():
+                yield _parse_line(lineno, line)
+    if buffer.strip():
+        yield _parse_line(lineno + 1, buffer)
+
+
+import_record = TypeAdapter(ImportRecord)
+
+
+def _parse_line(lineno: int, line: bytes) -> ImportRecord:
+    # JSON 해석과 검사를 한 번에 한다. 제목·본문은 API 로 쓸 때와 같은 제약을 받는다.
+    try:
+        return import_record.validate_json(line)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        if error["type"] == "json_invalid":
+            detail = f"{lineno}번째 줄이 JSON 이 아닙니다."
+        elif not error["loc"]:
+            detail = f"{lineno}번째 줄의 type 을 알 수 없습니다."
+        else:
+            field = ".".join(str(part) for part in error["loc"][1:])
+            detail = f"{lineno}번째 줄의 {field} 값이 올바르지 않습니다: {error['msg']}"
+        raise HTTPException(status_code=400, detail=detail)
+
+
+def _timestamp(value: datetime | None) -> str | None:
+    # 저장된 다른 행과 같은 포맷(UTC, 'YYYY-MM-DD HH:MM:SS')이어야 키셋 커서 비교가 어긋나지 않는다.
+    return sqlite_timestamp(value) if value is not None else None
+
+
+# 가져온 레코드의 원래 id 와 새 id 대응표. 쓰기 연결은 하나뿐이라 TEMP 테이블이 트랜잭션 사이에도 남는다.
+IMPORT_MAP_DDL = (
+    "CREATE TEMP TABLE IF NOT EXISTS import_posts(old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)",
+    """
+    CREATE TEMP TABLE IF NOT EXISTS import_comments(
+        old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL, path TEXT NOT NULL, depth INTEGER NOT NULL
+    )
+    """,
+)
+
+
+def _lookup(sync_conn, sql: str, ids: list[int]) -> dict[int, Any]:
+    rows = sync_conn.execute(text(sql), {"ids": orjson.dumps(ids).decode()}).all()
+    return {row[0]: row[1:] if len(row) > 2 else row[1] for row in rows}
+
+
+class BoardImporter:
+    """NDJSON 을 chunk_size 개씩 한 트랜잭션으로 executemany 한다.
+
+    가져오는 동안은 검색 색인 트리거를 떼어 두고, 끝나면 트리거를 되돌린 뒤 온라인 재색인을 한 번 돌린다.
+    OG 는 내보낸 값을 그대로 쓰고, 수집이 필요한 글은 다 넣은 뒤 백그라운드 큐에 넣는다.
+    """
+
+    def __init__(self, chunk_size: int = 5000) -> None:
+        self.chunk_size = chunk_size
+        self.running = False
+        self.users: dict[str, int] = {}
+        self.fallback_author_id = 0
+
+    def _insert_posts(self, sync_conn, board_id: int, records: list[PostImport], stats: dict[str, int]) -> None:
+        # _flush 가 BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡았으므로 다른 프로세스도 max(id) 를 바꾸지 못한다.
+        base = sync_conn.execute(text("SELECT coalesce(max(id), 0) FROM posts")).scalar_one()
+        rows = []
+        for offset, record in enumerate(records, start=1):
+            author_id = self.users.get(record.author)
+            if author_id is None:
+                author_id = self.fallback_author_id
+                stats["unknown_authors"] += 1
+            body_md = record.body_md
+            og_status = record.og_status
+            og_url = record.og_url
+            if og_status is None:
+                og_url = extract_first_url(body_md)
+                og_status = "pending" if og_url else "none"
+            rows.append(
+                {
+                    "id": base + offset,
+                    "old_id": record.id,
+                    "board_id": board_id,
+                    "author_id": author_id,
+                    "title": record.title,
+                    "body_md": body_md,
+                    "excerpt": make_excerpt(body_md),
+                    "og_url": og_url,
+                    "og_title": record.og_title,
+                    "og_image": record.og_image,
+                    "og_status": og_status,
+                    "view_count": record.view_count,
+                    "created_at": _timestamp(record.created_at),
+                    "updated_at": _timestamp(record.updated_at),
+                }
+            )
+        sync_conn.execute(
+            text(
+                """
+                INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt,
+                                  og_url, og_title, og_image, og_status, like_count, view_count,
+                                  created_at, updated_at)
+                VALUES(:id, :board_id, :author_id, :title, :body_md, :excerpt,
+                       :og_url, :og_title, :og_image, :og_status, 0, :view_count,
+                       coalesce(:created_at, CURRENT_TIMESTAMP), coalesce(:updated_at, :created_at, CURRENT_TIMESTAMP))
+                """
+            ),
+            rows,
+        )
+        mapped = [row for row in rows if row["old_id"] is not None]
+        if mapped:
+            sync_conn.execute(
+                text("INSERT INTO temp.import_posts(old_id, new_id) VALUES(:old_id, :id)"), mapped
+            )
+        stats["posts"] += len(rows)
+
+    def _insert_comments(self, sync_conn, records: list[CommentImport], stats: dict[str, int]) -> None:
+        post_ids = _lookup(
+            sync_conn,
+            "SELECT old_id, new_id FROM temp.import_posts WHERE old_id IN (SELECT value FROM json_each(:ids))",
+            [r.post_id for r in records],
+        )
+        # 부모는 항상 먼저 나오므로 앞선 청크(대응표)나 이 청크 안에 있다.
+        parents = _lookup(
+            sync_conn,
+            "SELECT old_id, new_id, path, depth FROM temp.import_comments "
+            "WHERE old_id IN (SELECT value FROM json_each(:ids))",
+            [r.parent_id for r in records if r.parent_id is not None],
+        )
+        base = sync_conn.execute(text("SELECT coalesce(max(id), 0) FROM comments")).scalar_one()
+        rows = []
+        for record in records:
+            post_id = post_ids.get(record.post_id)
+            parent = parents.get(record.parent_id) if record.parent_id is not None else None
+            if post_id is None or (record.parent_id is not None and parent is None):
+                stats["skipped"] += 1
+                continue
+            author_id = self.users.get(record.author)
+            if author_id is None:
+                author_id = self.fallback_author_id
+                stats["unknown_authors"] += 1
+            new_id = base + len(rows) + 1
+            parent_id, parent_path, parent_depth = parent if parent else (None, "", -1)
+            path = parent_path + comment_path(None, new_id)
+            rows.append(
+                {
+                    "id": new_id,
+                    "post_id": post_id,
+                    "author_id": author_id,
+                    "parent_id": parent_id,
+                    "path": path,
+                    "depth": parent_depth + 1,
+                    "body_md": record.body_md,
+                    "is_deleted": record.is_deleted,
+                    "created_at": _timestamp(record.created_at),
+                    "updated_at": _timestamp(record.updated_at),
+                }
+            )
+            if record.id is not None:
+                parents[record.id] = (new_id, path, parent_depth + 1)
+                rows[-1]["old_id"] = record.id
+        if not rows:
+            return
+        sync_conn.execute(
+            text(
+                """
+                INSERT INTO comments(id, post_id, author_id, parent_id, path, depth, body_md, is_deleted,
+                                     created_at, updated_at)
+                VALUES(:id, :post_id, :author_id, :parent_id, :path, :depth, :body_md, :is_deleted,
+                       coalesce(:created_at, CURRENT_TIMESTAMP), coalesce(:updated_at, :created_at, CURRENT_TIMESTAMP))
+                """
+            ),
+            rows,
+        )
+        mapped = [row for row in rows if "old_id" in row]
+        if mapped:
+            sync_conn.execute(
+                text(
+                    "INSERT INTO temp.import_comments(old_id, new_id, path, depth) "
+                    "VALUES(:old_id, :id, :path, :depth)"
+                ),
+                mapped,
+            )
+        stats["comments"] += len(rows)
+
+    def _insert_likes(self, sync_conn, records: list[LikeImport], stats: dict[str, int]) -> None:
+        post_ids = _lookup(
+            sync_conn,
+            "SELECT old_id, new_id FROM temp.import_posts WHERE old_id IN (SELECT value FROM json_each(:ids))",
+            [r.post_id for r in records],
+        )
+        rows = []
+        for record in records:
+            post_id = post_ids.get(record.post_id)
+            user_id = self.users.get(record.user)
+            # 좋아요는 누른 사람이 있어야 의미가 있으므로 모르는 사용자는 건너뛴다.
+            if post_id is None or user_id is None:
+                stats["skipped"] += 1
+                continue
+            rows.append({"post_id": post_id, "user_id": user_id, "created_at": _timestamp(record.created_at)})
+        if not rows:
+            return
+        inserted = sync_conn.execute(
+            text(
+                "INSERT OR IGNORE INTO likes(post_id, user_id, created_at) "
+                "VALUES(:post_id, :user_id, coalesce(:created_at, CURRENT_TIMESTAMP))"
+            ),
+            rows,
+        ).rowcount
+        # 글의 like_count 는 내보낸 값이 아니라 실제로 들어간 좋아요 수로 맞춘다(글은 0 으로 들어간다).
+        sync_conn.execute(
+            text(
+                "UPDATE posts SET like_count = (SELECT count(*) FROM likes WHERE likes.post_id = posts.id) "
+                "WHERE id IN (SELECT value FROM json_each(:ids))"
+            ),
+            {"ids": orjson.dumps(sorted({row["post_id"] for row in rows})).decode()},
+        )
+        stats["likes"] += inserted
+        stats["skipped"] += len(rows) - inserted
+
+    async def _flush(self, board_id: int, kind: str, records: list[ImportRecord], stats: dict[str, int]) -> None:
+        async with engine.begin() as conn:
+            # pysqlite 는 첫 INSERT 직전에야 BEGIN 을 보내 max(id) 조회가 트랜잭션 밖에서 읽힌다.
+            # 다른 워커 프로세스와 같은 id 를 고르지 않도록 쓰기 잠금부터 잡는다.
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if kind == "post":
+                await conn.run_sync(self._insert_posts, board_id, records, stats)
+            elif kind == "comment":
+                await conn.run_sync(self._insert_comments, records, stats)
+            elif kind == "like":
+                await conn.run_sync(self._insert_likes, records, stats)
+
+    async def _prepare(self) -> None:
+        async with engine.begin() as conn:
+            for ddl in IMPORT_MAP_DDL:
+                await conn.execute(text(ddl))
+            await conn.execute(text("DELETE FROM temp.import_posts"))
+            await conn.execute(text("DELETE FROM temp.import_comments"))
+            await conn.run_sync(drop_posts_fts_triggers)
+            self.users = dict((await conn.execute(text("SELECT nickname, id FROM users"))).all())
+
+    async def _finish(self) -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(create_posts_fts_triggers)
+            # 가져온 글은 outbox 를 거치지 않아 재색인이 끝나야 검색된다. 그 전에 멈춰도 다음 시작 때 색인하도록 남긴다.
+            await conn.run_sync(request_posts_fts_rebuild, "import")
+            pending = (
+                await conn.execute(
+                    text(
+                        """
+                        SELECT p.id, p.og_url FROM temp.import_posts m JOIN posts p ON p.id = m.new_id
+                        WHERE p.og_status = 'pending'
+                        """
+                    )
+                )
+            ).all()
+            await conn.execute(text("DROP TABLE temp.import_posts"))
+            await conn.execute(text("DROP TABLE temp.import_comments"))
+        if not fts_maintainer.start_rebuild():
+            # 이미 돌던 재색인은 가져온 글을 다 담지 못했을 수 있다. 요청이 남아 있으므로 그 재색인이 끝나면
+            # 유지보수 루프가 다시 시작한다.
+            logger.warning("가져오기 뒤 재색인을 바로 시작하지 못했습니다. 진행 중인 재색인이 끝나면 다시 시작합니다.")
+        for post_id, og_url in pending:
+            og_enricher.enqueue(post_id, og_url)
+
+    async def _import(self, board_id: int, chunks: AsyncIterator[bytes], stats: dict[str, int]) -> None:
+        kind = None
+        batch: list[ImportRecord] = []
+        try:
+            async for record in ndjson_records(chunks):
+                if record.type == "board":
+                    continue
+                if record.type != kind or len(batch) >= self.chunk_size:
+                    if batch:
+                        await self._flush(board_id, kind, batch, stats)
+                    kind, batch = record.type, []
+                batch.append(record)
+        except HTTPException:
+            # 잘못된 줄 앞까지 읽은 레코드는 넣은 뒤 오류를 알린다. stats 가 곧 그 줄 직전까지의 진행 상황이다.
+            if batch:
+                await self._flush(board_id, kind, batch, stats)
+            raise
+        if batch:
+            await self._flush(board_id, kind, batch, stats)
+
+    async def run(self, board_id: int, chunks: AsyncIterator[bytes], fallback_author_id: int) -> dict[str, Any]:
+        if self.running or fts_maintainer.rebuild.get("state") == "running":
+            raise HTTPException(status_code=409, detail="가져오기나 재색인이 이미 진행 중입니다.")
+        self.running = True
+        self.fallback_author_id = fallback_author_id
+        stats = {"posts": 0, "comments": 0, "likes": 0, "skipped": 0, "unknown_authors": 0}
+        try:
+            # 준비는 한 트랜잭션이라 실패하면 아무것도 바뀌지 않는다.
+            await self._prepare()
+            try:
+                await self._import(board_id, chunks, stats)
+            except IntegrityError:
+                raise HTTPException(status_code=400, detail=f"id 가 중복된 레코드가 있습니다. (이미 가져온 것: {stats})")
+            except HTTPException as exc:
+                # 오류 직전 레코드까지는 커밋됐다. 어디까지 들어갔는지 함께 알려 준다.
+                exc.detail = f"{exc.detail} (이미 가져온 것: {stats})"
+                raise
+            finally:
+                await self._finish()
+        finally:
+            self.running = False
+        return {**stats, "fts_rebuild": fts_maintainer.rebuild["state"]}
+
+
+board_importer = BoardImporter()
@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class LRUCache:
+    """프로세스 안 캐시가 함께 쓰는 LRU. 항목마다 만료 시각(time.monotonic 기준)과 대략적인 크기를 줄 수 있다.
+
+    OG, 인증, 검색 캐시가 이 위에 각자의 키·만료 규칙만 얹는다. 적중률은 get() 기준으로 센다.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        # 키 → (만료 시각 또는 None, 값, 크기)
+        self.entries: OrderedDict[Any, tuple[float | None, Any, int]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any, default: Any = None, accept: Callable[[Any], bool] | None = None) -> Any:
+        """값을 돌려준다. 없거나 만료됐거나 accept(값) 이 False 면 항목을 지우고 default."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, value, _ = entry
+            if (expires_at is None or expires_at > time.monotonic()) and (accept is None or accept(value)):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.pop(key)
+        self.misses += 1
+        return default
+
+    def put(self, key: Any, value: Any, expires_at: float | None = None, size: int = 0) -> None:
+        self.pop(key)
+        self.entries[key] = (expires_at, value, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries:
+            self.pop(next(iter(self.entries)))
+
+    def pop(self, key: Any) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
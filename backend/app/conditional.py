@@ -0,0 +1,97 @@
+import hashlib
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 프로세스마다 다른 값. 메모리 버전 카운터로 만든 ETag 가 다른 워커의 것과 우연히 같아지지 않게 한다.
+BOOT_ID = secrets.token_hex(4)
+
+# 게시판 목록 응답(글 추가/수정/삭제, 좋아요, 조회수, OG 수집)은 모두 posts 행을 바꾸므로,
+# posts 트리거가 같은 트랜잭션에서 boards.version 을 올린다. 어느 워커가 쓴 변경이든 모든 워커의 ETag 가 바뀐다.
+BOARD_VERSION_TRIGGERS = {
+    "boards_version_ai": """
+        CREATE TRIGGER IF NOT EXISTS boards_version_ai AFTER INSERT ON posts BEGIN
+            UPDATE boards SET version = version + 1 WHERE id = new.board_id;
+        END
+    """,
+    "boards_version_ad": """
+        CREATE TRIGGER IF NOT EXISTS boards_version_ad AFTER DELETE ON posts BEGIN
+            UPDATE boards SET version = version + 1 WHERE id = old.board_id;
+        END
+    """,
+    "boards_version_au": """
+        CREATE TRIGGER IF NOT EXISTS boards_version_au AFTER UPDATE ON posts BEGIN
+            UPDATE boards SET version = version + 1 WHERE id IN (old.board_id, new.board_id);
+        END
+    """,
+}
+
+
+def create_board_version_triggers(sync_conn) -> None:
+    for ddl in BOARD_VERSION_TRIGGERS.values():
+        sync_conn.execute(text(ddl))
+
+
+async def board_versions(db: AsyncSession, board_id: int) -> tuple[int, int]:
+    """(목록 버전, 검색 색인 세대). ETag 와 검색 캐시용으로 본문을 만들기 전에 PK 로 한 번만 읽는다."""
+    row = (
+        await db.execute(text("SELECT version, search_version FROM boards WHERE id = :id"), {"id": board_id})
+    ).first()
+    return (row.version, row.search_version) if row else (0, 0)
+
+
+def _http_date(value: datetime) -> str:
+    # SQLite CURRENT_TIMESTAMP 값은 UTC 기준 naive datetime 으로 읽힌다.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+class ConditionalGet:
+    """ETag / Last-Modified 검사. 일치하면 본문을 만들기 전에 304 를 던진다.
+
+    Last-Modified 는 그 값만으로 변경을 모두 알 수 있는 응답(updated_at 의 최댓값 등)에만 넘긴다.
+    """
+
+    def __init__(self, request: Request) -> None:
+        self.request = request
+        self.headers = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+    def check(self, *parts: object, last_modified: datetime | None = None) -> None:
+        digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+        etag = f'W/"{digest}"'
+        self.headers["ETag"] = etag
+        if last_modified is not None:
+            self.headers["Last-Modified"] = _http_date(last_modified)
+
+        if self._is_fresh(etag, last_modified):
+            raise HTTPException(status_code=304, headers=self.headers)
+
+    def _is_fresh(self, etag: str, last_modified: datetime | None) -> bool:
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in candidates or etag.removeprefix("W/") in candidates
+
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return parsedate_to_datetime(self.headers["Last-Modified"]) <= since
+        return False
+
+    def respond(self, response: Response) -> Response:
+        response.headers.update(self.headers)
+        return response
+
+
+async def conditional_get(request: Request) -> ConditionalGet:
+    return ConditionalGet(request)
@@ -1,41 +1,160 @@
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 
+from fastapi import Request
+from sqlalchemy import event, inspect, text
 from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import text
+from sqlalchemy.schema import CreateColumn
 
-DATABASE_URL = "sqlite+aiosqlite:///./board.db"
+DATABASE_PATH = "./board.db"
+DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+READ_DATABASE_URL = f"sqlite+aiosqlite:///file:{DATABASE_PATH}?mode=ro&uri=true"
 
+READ_POOL_SIZE = 8
+
+SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "cache_size": "-20000",
+    "mmap_size": "268435456",
+    "busy_timeout": "5000",
+    "temp_store": "MEMORY",
+}
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# 쓰기는 연결 하나로만 처리한다. 풀이 비어 있으면 다음 트랜잭션은 비동기 큐에서 기다린다.
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
+    pool_size=1,
+    max_overflow=0,
+    connect_args={"check_same_thread": False},
+)
+read_engine = create_async_engine(
+    READ_DATABASE_URL,
+    echo=False,
+    pool_size=READ_POOL_SIZE,
+    max_overflow=0,
     connect_args={"check_same_thread": False},
 )
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
+
+def _apply_pragmas(dbapi_conn, journal_mode: str | None) -> None:
+    cursor = dbapi_conn.cursor()
+    if journal_mode:
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_write_connect(dbapi_conn, _) -> None:
+    _apply_pragmas(dbapi_conn, journal_mode="WAL")
+
+
+@event.listens_for(read_engine.sync_engine, "connect")
+def _on_read_connect(dbapi_conn, _) -> None:
+    _apply_pragmas(dbapi_conn, journal_mode=None)
+    dbapi_conn.cursor().execute("PRAGMA query_only=ON")
+
+
+# 요청 하나가 실행한 SQL 문 수. 미들웨어가 요청마다 [0] 을 넣고 X-DB-Queries 헤더로 내보낸다.
+query_counter: ContextVar[list[int] | None] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+@event.listens_for(read_engine.sync_engine, "before_cursor_execute")
+def _count_query(*_) -> None:
+    counter = query_counter.get()
+    if counter is not None:
+        counter[0] += 1
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    session_factory = ReadSessionLocal if request.method in READ_METHODS else SessionLocal
+    async with session_factory() as session:
+        yield session
+
+
+async def close_db() -> None:
+    await read_engine.dispose()
+    await engine.dispose()
+
+
+def _add_missing_columns(sync_conn) -> None:
+    # 기존 board.db 에 나중에 추가된 컬럼을 붙인다. (server_default 가 있는 컬럼만 추가 가능)
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+def _create_missing_indexes(sync_conn) -> None:
+    # create_all 은 기존 테이블에 새로 추가된 인덱스를 만들지 않는다.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db() -> None:
     from app import models  # noqa: F401
+    from app.conditional import create_board_version_triggers
+    from app.fts import migrate_posts_fts
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.execute(
+            text(
+                """
+                UPDATE posts
+                SET excerpt = CASE
+                    WHEN length(trim(replace(body_md, char(10), ' '))) > 140
+                    THEN substr(trim(replace(body_md, char(10), ' ')), 1, 140) || '…'
+                    ELSE trim(replace(body_md, char(10), ' '))
+                END
+                WHERE excerpt = '';
+                """
+            )
+        )
         await conn.execute(
             text(
                 """
-                CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
-                    post_id UNINDEXED,
-                    title,
-                    body
-                );
+                WITH RECURSIVE tree(id, path, depth) AS (
+                    SELECT id, printf('%010d/', id), 0 FROM comments WHERE parent_id IS NULL
+                    UNION ALL
+                    SELECT c.id, tree.path || printf('%010d/', c.id), tree.depth + 1
+                    FROM comments c JOIN tree ON c.parent_id = tree.id
+                )
+                UPDATE comments
+                SET path = (SELECT path FROM tree WHERE tree.id = comments.id),
+                    depth = (SELECT depth FROM tree WHERE tree.id = comments.id)
+                WHERE path = '';
                 """
             )
         )
+        await conn.run_sync(create_board_version_triggers)
+        await conn.run_sync(migrate_posts_fts)
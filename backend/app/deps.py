@@ -1,10 +1,13 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.auth_cache import auth_cache
+from app.database import ReadSessionLocal
 from app.models import User
+from app.schemas import UserPublic
 from app.security import decode_token
 
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -12,21 +15,39 @@ bearer_scheme = HTTPBearer(auto_error=False)
 
 async def get_optional_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User | None:
+) -> UserPublic | None:
     if not credentials:
         return None
-    payload = decode_token(credentials.credentials)
-    if not payload or not payload.get("sub"):
-        return None
 
-    user = await db.scalar(select(User).where(User.id == int(payload["sub"])))
+    token = credentials.credentials
+    user_id = auth_cache.get_user_id(token)
+    if user_id is None:
+        started = time.perf_counter()
+        payload = decode_token(token)
+        if not payload or not payload.get("sub"):
+            return None
+        user_id = int(payload["sub"])
+        auth_cache.put_token(token, user_id, payload.get("exp"), time.perf_counter() - started)
+
+    user = auth_cache.get_user(user_id)
+    if user is None:
+        started = time.perf_counter()
+        # 요청 세션(get_db)을 쓰면 POST 에서는 하나뿐인 쓰기 연결을 요청이 끝날 때까지 잡는다.
+        # 읽기 연결로 조회하고 바로 돌려준다.
+        async with ReadSessionLocal() as session:
+            row = (
+                await session.execute(select(User.id, User.nickname, User.is_admin).where(User.id == user_id))
+            ).first()
+        if row is None:
+            return None
+        user = UserPublic(id=row.id, nickname=row.nickname, is_admin=row.is_admin)
+        auth_cache.put_user(user, time.perf_counter() - started)
     return user
 
 
 async def get_current_user(
-    user: User | None = Depends(get_optional_user),
-) -> User:
+    user: UserPublic | None = Depends(get_optional_user),
+) -> UserPublic:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,7 +56,7 @@ async def get_current_user(
     return user
 
 
-async def get_current_admin(user: User = Depends(get_current_user)) -> User:
+async def get_current_admin(user: UserPublic = Depends(get_current_user)) -> UserPublic:
     if not user.is_admin:
         raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
     return user
@@ -1,21 +1,407 @@
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+import os
+import re
 
-from app.models import Post
+import orjson
+from sqlalchemy import column, literal_column, table, text
 
+# unicode61: 공백·문장부호 단위 토큰. 어절 앞부분 검색은 접두 질의("고양"*)로 찾는다.
+# trigram: 세 글자 단위 토큰. 어절 중간도 찾지만 색인이 크고 세 글자 미만 검색어는 쓸 수 없다.
+FTS_TOKENIZER = os.environ.get("FTS_TOKENIZER", "unicode61")
+FTS_TOKENIZERS = {
+    "unicode61": "unicode61 remove_diacritics 2",
+    "trigram": "trigram",
+}
+# 입력 중 자동완성("고"*, "고양"*)을 위한 접두 색인. trigram 은 접두 질의를 쓰지 않는다.
+FTS_PREFIXES = {
+    "unicode61": "1 2 3",
+}
 
-async def upsert_post_fts(db: AsyncSession, post: Post) -> None:
-    await db.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post.id})
-    await db.execute(
+# posts 를 원본으로 쓰는 external content FTS5 테이블. 본문은 posts 에만 저장하고 색인만 따로 둔다.
+# 원본은 posts 위의 뷰다. 게시판은 '~3~' 같은 키로 색인해 'board_key:"~3~" AND {title body_md}: (...)' 처럼
+# MATCH 안에서 거른다(trigram 에서도 세 글자 이상이고 다른 게시판 키의 일부가 되지 않는다).
+POSTS_FTS_SOURCE_DDL = """
+CREATE VIEW posts_fts_source AS
+SELECT id, title, body_md, printf('~%d~', board_id) AS board_key FROM posts
+"""
+
+
+def posts_fts_ddl(tokenizer: str = FTS_TOKENIZER, name: str = "posts_fts") -> str:
+    prefix = f"\n    prefix='{FTS_PREFIXES[tokenizer]}'," if tokenizer in FTS_PREFIXES else ""
+    return f"""
+CREATE VIRTUAL TABLE {name} USING fts5(
+    title,
+    body_md,
+    board_key,
+    content='posts_fts_source',
+    content_rowid='id',{prefix}
+    tokenize='{FTS_TOKENIZERS[tokenizer]}'
+)
+"""
+
+
+# 세그먼트 병합 설정(posts_fts_config 에 저장된다).
+# automerge: 한 레벨에 세그먼트가 이만큼 쌓이면 글 쓰기 트랜잭션 안에서 조금씩 병합한다(기본 4).
+#   8 로 올려 쓰기 경로의 병합을 줄이고, 나머지는 한가할 때 백그라운드 'merge' 가 맡는다.
+# crisismerge: 한 레벨이 이만큼 쌓이면 그 쓰기에서 레벨 전체를 한 번에 병합한다. 백그라운드가 밀렸을 때의 상한.
+# usermerge: 'merge' 명령이 병합을 시작하는 레벨당 최소 세그먼트 수. 2 로 두어 한가할 때 끝까지 합친다.
+FTS_CONFIG = {
+    "automerge": 8,
+    "crisismerge": 16,
+    "usermerge": 2,
+}
+
+
+posts_fts = table("posts_fts", column("rowid"))
+fts_ref = literal_column("posts_fts")
+
+# bm25() 컬럼 가중치(title, body_md, board_key). 게시판 키는 점수에 넣지 않는다.
+BM25_WEIGHTS = (1.0, 1.0, 0.0)
+
+# 글 쓰기는 트리거가 같은 트랜잭션에서 search_outbox 에 남기고, 색인은 app.search_indexer 가 모아서 반영한다.
+# 제목/본문/게시판이 바뀔 때만 남겨 조회수·좋아요 UPDATE 는 색인 작업을 만들지 않는다.
+POSTS_FTS_TRIGGERS = {
+    "posts_fts_ai": """
+        CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO search_outbox(post_id, new_board_id, new_title, new_body_md)
+            VALUES (new.id, new.board_id, new.title, new.body_md);
+        END
+    """,
+    "posts_fts_ad": """
+        CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO search_outbox(post_id, old_board_id, old_title, old_body_md)
+            VALUES (old.id, old.board_id, old.title, old.body_md);
+        END
+    """,
+    "posts_fts_au": """
+        CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, body_md, board_id ON posts BEGIN
+            INSERT INTO search_outbox(post_id, old_board_id, old_title, old_body_md, new_board_id, new_title, new_body_md)
+            VALUES (old.id, old.board_id, old.title, old.body_md, new.board_id, new.title, new.body_md);
+        END
+    """,
+}
+
+# 온라인 재색인: 새 색인 posts_fts_rebuild 를 posts 의 id 순서로 조금씩 채우고, 다 채우면 posts_fts 와 바꾼다.
+# 채우는 동안의 글 쓰기는 이미 복사한 구간(copied_upto 이하)만 트리거가 새 색인에도 반영한다.
+POSTS_FTS_REBUILD_STATE_DDL = (
+    "CREATE TABLE posts_fts_rebuild_state(copied_upto INTEGER NOT NULL, requested_upto INTEGER NOT NULL)"
+)
+# 트리거 없이 글을 넣은 작업(대량 가져오기)이 남기는 재색인 요청. 그 글은 재색인이 끝나야 검색된다.
+# 재색인이 시작될 때까지 쌓인 요청(requested_upto 이하)은 그 재색인을 바꿔 넣을 때 지운다.
+# 끝나기 전에 프로세스가 멈추면 요청이 남아 다음 시작 때 migrate_posts_fts 가 다시 색인한다.
+POSTS_FTS_REBUILD_REQUESTS_DDL = """
+CREATE TABLE IF NOT EXISTS posts_fts_rebuild_requests(
+    id INTEGER PRIMARY KEY,
+    reason TEXT NOT NULL,
+    requested_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+POSTS_FTS_REBUILD_TRIGGERS = {
+    "posts_fts_rebuild_ai": """
+        CREATE TRIGGER posts_fts_rebuild_ai AFTER INSERT ON posts
+        WHEN new.id <= (SELECT copied_upto FROM posts_fts_rebuild_state) BEGIN
+            INSERT INTO posts_fts_rebuild(rowid, title, body_md, board_key)
+            VALUES (new.id, new.title, new.body_md, printf('~%d~', new.board_id));
+        END
+    """,
+    "posts_fts_rebuild_ad": """
+        CREATE TRIGGER posts_fts_rebuild_ad AFTER DELETE ON posts
+        WHEN old.id <= (SELECT copied_upto FROM posts_fts_rebuild_state) BEGIN
+            INSERT INTO posts_fts_rebuild(posts_fts_rebuild, rowid, title, body_md, board_key)
+            VALUES ('delete', old.id, old.title, old.body_md, printf('~%d~', old.board_id));
+        END
+    """,
+    "posts_fts_rebuild_au": """
+        CREATE TRIGGER posts_fts_rebuild_au AFTER UPDATE OF title, body_md, board_id ON posts
+        WHEN old.id <= (SELECT copied_upto FROM posts_fts_rebuild_state) BEGIN
+            INSERT INTO posts_fts_rebuild(posts_fts_rebuild, rowid, title, body_md, board_key)
+            VALUES ('delete', old.id, old.title, old.body_md, printf('~%d~', old.board_id));
+            INSERT INTO posts_fts_rebuild(rowid, title, body_md, board_key)
+            VALUES (new.id, new.title, new.body_md, printf('~%d~', new.board_id));
+        END
+    """,
+}
+
+BUMP_ALL_SEARCH_VERSIONS = "UPDATE boards SET search_version = search_version + 1"
+
+
+def apply_search_outbox(sync_conn, limit: int) -> dict:
+    """search_outbox 를 id 순서로 limit 개까지 가져가 색인에 반영한다. 한 트랜잭션 안에서 불러야 한다.
+
+    행은 DELETE ... RETURNING 으로 지우면서 읽는다. 첫 문장이 쓰기라 쓰기 잠금을 잡은 뒤에 읽으므로,
+    여러 워커의 색인기가 동시에 돌아도 같은 행을 두 번 반영하지 않는다('delete' 를 두 번 넣으면 색인이 깨진다).
+
+    같은 글의 변경은 하나로 합친다: 첫 변경 전 값을 색인에서 지우고 마지막 변경 후 값을 넣는다.
+    색인에는 항상 그 글의 첫 변경 전 값이 들어 있으므로, 몇 개씩 나눠 반영하든 결과는 id 순서대로
+    하나씩 반영한 것과 같다.
+    """
+    rows = sync_conn.execute(
+        text(
+            """
+            DELETE FROM search_outbox
+            WHERE id IN (SELECT id FROM search_outbox ORDER BY id LIMIT :limit)
+            RETURNING id, post_id, old_board_id, old_title, old_body_md,
+                      new_board_id, new_title, new_body_md, queued_at
+            """
+        ),
+        {"limit": limit},
+    ).all()
+    if not rows:
+        return {"applied": 0, "boards": set(), "queued_at": []}
+    # RETURNING 은 순서를 보장하지 않는다.
+    rows.sort(key=lambda row: row.id)
+
+    first: dict[int, tuple] = {}
+    last: dict[int, tuple] = {}
+    boards: set[int] = set()
+    for row in rows:
+        first.setdefault(row.post_id, row)
+        last[row.post_id] = row
+        boards.update(board_id for board_id in (row.old_board_id, row.new_board_id) if board_id is not None)
+
+    deletes = [
+        {"id": post_id, "title": row.old_title, "body_md": row.old_body_md, "board_id": row.old_board_id}
+        for post_id, row in first.items()
+        if row.old_board_id is not None
+    ]
+    inserts = [
+        {"id": post_id, "title": row.new_title, "body_md": row.new_body_md, "board_id": row.new_board_id}
+        for post_id, row in last.items()
+        if row.new_board_id is not None
+    ]
+    if deletes:
+        sync_conn.execute(
+            text(
+                """
+                INSERT INTO posts_fts(posts_fts, rowid, title, body_md, board_key)
+                VALUES ('delete', :id, :title, :body_md, printf('~%d~', :board_id))
+                """
+            ),
+            deletes,
+        )
+    if inserts:
+        sync_conn.execute(
+            text(
+                """
+                INSERT INTO posts_fts(rowid, title, body_md, board_key)
+                VALUES (:id, :title, :body_md, printf('~%d~', :board_id))
+                """
+            ),
+            inserts,
+        )
+    # 같은 트랜잭션에서 세대를 올려 모든 워커의 검색 캐시가 이 반영 이후 결과만 쓰게 한다.
+    sync_conn.execute(
+        text("UPDATE boards SET search_version = search_version + 1 WHERE id IN (SELECT value FROM json_each(:ids))"),
+        {"ids": orjson.dumps(sorted(boards)).decode()},
+    )
+    return {"applied": len(rows), "boards": boards, "queued_at": [row.queued_at for row in rows]}
+
+
+def rebuild_posts_fts(sync_conn) -> None:
+    """posts 에서 색인을 다시 만든다. 밀린 outbox 는 이미 posts 에 반영된 변경이므로 함께 비운다."""
+    sync_conn.execute(text("INSERT INTO posts_fts(posts_fts) VALUES('rebuild')"))
+    sync_conn.execute(text("DELETE FROM search_outbox"))
+    sync_conn.execute(text("DELETE FROM posts_fts_rebuild_requests"))
+    sync_conn.execute(text(BUMP_ALL_SEARCH_VERSIONS))
+
+
+def request_posts_fts_rebuild(sync_conn, reason: str) -> None:
+    """재색인이 끝나야 검색에 반영되는 변경을 기록한다. 그 변경과 같은 트랜잭션에서 불러야 한다."""
+    sync_conn.execute(text("INSERT INTO posts_fts_rebuild_requests(reason) VALUES(:reason)"), {"reason": reason})
+
+
+def posts_fts_rebuild_requested(sync_conn) -> bool:
+    return sync_conn.execute(text("SELECT EXISTS (SELECT 1 FROM posts_fts_rebuild_requests)")).scalar_one() == 1
+
+
+MAX_QUERY_TERMS = 8
+WORD_REGEX = re.compile(r"\w+")
+
+
+def _normalize_sql(sql: str | None) -> str:
+    # ALTER TABLE ... RENAME 은 테이블 이름을 따옴표로 감싸 다시 저장한다.
+    return " ".join((sql or "").replace('"', "").split())
+
+
+def build_match_query(q: str, tokenizer: str = FTS_TOKENIZER) -> str | None:
+    """사용자 검색어를 항상 문법에 맞는 MATCH 식으로 바꾼다. 찾을 단어가 없으면 None.
+
+    FTS5 연산자(AND/OR/NOT, 따옴표, 괄호, 컬럼 필터, *)는 쓸 수 없고 모든 단어를 AND 로 찾는다.
+    - unicode61: 단어마다 접두 질의. 조사가 붙은 어절('고양이는')도 앞부분('고양이')으로 찾는다.
+    - trigram: 공백으로 나눈 조각마다 부분 문자열 질의. 세 글자 미만 조각은 색인으로 찾을 수 없어 뺀다.
+    """
+    if tokenizer == "trigram":
+        terms = [term for term in q.split() if len(term) >= 3]
+        quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    else:
+        quoted = [f'"{term}"*' for term in WORD_REGEX.findall(q)]
+    if not quoted:
+        return None
+    return " ".join(quoted[:MAX_QUERY_TERMS])
+
+
+def is_query_too_short(q: str, tokenizer: str = FTS_TOKENIZER) -> bool:
+    """trigram 에서 모든 조각이 세 글자 미만이라 색인으로 찾을 수 없는 검색어인지.
+
+    build_match_query 가 None 을 돌려주는 이 경우를 빈 결과로 보여 주면 '결과 없음'과 구분되지 않는다.
+    """
+    terms = q.split()
+    return tokenizer == "trigram" and bool(terms) and all(len(term) < 3 for term in terms)
+
+
+def title_prefix_query(prefix: str, tokenizer: str = FTS_TOKENIZER) -> str | None:
+    """자동완성용: 제목에서만 찾는 MATCH 식."""
+    match_query = build_match_query(prefix, tokenizer)
+    return f"title : ({match_query})" if match_query is not None else None
+
+
+def last_word(prefix: str) -> str | None:
+    """자동완성 단어 후보를 찾을 마지막 단어(소문자). unicode61 색인의 단어와 같은 기준으로 자른다."""
+    words = WORD_REGEX.findall(prefix)
+    return words[-1].lower() if words else None
+
+
+# 사용자 검색어가 찾는 컬럼. board_key 는 게시판을 거를 때만 쓴다('1' 로 검색하면 '~1~' 게시판 글이 모두 걸리지 않게).
+SEARCH_COLUMNS = "{title body_md}"
+
+
+def content_match(match_query: str) -> str:
+    """build_match_query 결과를 제목·본문에서만 찾게 한다."""
+    return f"{SEARCH_COLUMNS}: ({match_query})"
+
+
+def board_match(board_id: int, match_query: str) -> str:
+    """build_match_query 결과를 한 게시판의 제목·본문 안으로 좁힌다."""
+    return f'board_key:"~{board_id}~" AND {content_match(match_query)}'
+
+
+def _apply_fts_config(sync_conn, name: str) -> None:
+    for key, value in FTS_CONFIG.items():
+        sync_conn.execute(text(f"INSERT INTO {name}({name}, rank) VALUES(:key, :value)"), {"key": key, "value": value})
+
+
+def create_posts_fts_triggers(sync_conn) -> bool:
+    """색인 트리거를 현재 정의대로 맞춘다. 아예 없던 트리거가 있었으면 True."""
+    existing = dict(
+        sync_conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).all()
+    )
+    missing = False
+    for name, ddl in POSTS_FTS_TRIGGERS.items():
+        if _normalize_sql(existing.get(name)) == _normalize_sql(ddl):
+            continue
+        if name in existing:
+            sync_conn.execute(text(f"DROP TRIGGER {name}"))
+        else:
+            missing = True
+        sync_conn.execute(text(ddl))
+    return missing
+
+
+def drop_posts_fts_triggers(sync_conn) -> None:
+    """대량 가져오기 동안 글마다 색인하지 않도록 트리거를 뗀다. 끝나면 다시 만들고 색인을 재구성해야 한다."""
+    for name in POSTS_FTS_TRIGGERS:
+        sync_conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+
+def drop_posts_fts_rebuild(sync_conn) -> None:
+    """끝나지 않은 온라인 재색인의 흔적(새 색인, 트리거, 진행 상태)을 지운다."""
+    for name in POSTS_FTS_REBUILD_TRIGGERS:
+        sync_conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    sync_conn.execute(text("DROP TABLE IF EXISTS posts_fts_rebuild_state"))
+    sync_conn.execute(text("DROP TABLE IF EXISTS posts_fts_rebuild"))
+
+
+def start_posts_fts_rebuild(sync_conn, tokenizer: str = FTS_TOKENIZER) -> None:
+    """빈 새 색인과 복사 구간을 따라가는 트리거를 만든다."""
+    drop_posts_fts_rebuild(sync_conn)
+    sync_conn.execute(text(posts_fts_ddl(tokenizer, "posts_fts_rebuild")))
+    _apply_fts_config(sync_conn, "posts_fts_rebuild")
+    sync_conn.execute(text(POSTS_FTS_REBUILD_STATE_DDL))
+    sync_conn.execute(
+        text(
+            "INSERT INTO posts_fts_rebuild_state(copied_upto, requested_upto) "
+            "SELECT 0, coalesce(max(id), 0) FROM posts_fts_rebuild_requests"
+        )
+    )
+    for ddl in POSTS_FTS_REBUILD_TRIGGERS.values():
+        sync_conn.execute(text(ddl))
+
+
+def copy_posts_fts_rebuild_chunk(sync_conn, chunk_size: int) -> int:
+    """다음 chunk_size 개 글을 새 색인에 넣고 넣은 개수를 돌려준다. 0 이면 다 복사한 것이다."""
+    lo = sync_conn.execute(text("SELECT copied_upto FROM posts_fts_rebuild_state")).scalar_one()
+    hi = sync_conn.execute(
+        text("SELECT max(id) FROM (SELECT id FROM posts WHERE id > :lo ORDER BY id LIMIT :n)"),
+        {"lo": lo, "n": chunk_size},
+    ).scalar_one()
+    if hi is None:
+        return 0
+    copied = sync_conn.execute(
         text(
             """
-            INSERT INTO posts_fts(rowid, post_id, title, body)
-            VALUES(:id, :id, :title, :body)
+            INSERT INTO posts_fts_rebuild(rowid, title, body_md, board_key)
+            SELECT id, title, body_md, board_key FROM posts_fts_source WHERE id > :lo AND id <= :hi
             """
         ),
-        {"id": post.id, "title": post.title, "body": post.body_md},
+        {"lo": lo, "hi": hi},
+    ).rowcount
+    sync_conn.execute(text("UPDATE posts_fts_rebuild_state SET copied_upto = :hi"), {"hi": hi})
+    return copied
+
+
+def swap_posts_fts_rebuild(sync_conn) -> None:
+    """다 채운 새 색인을 posts_fts 로 바꾼다. 남은 글이 없는지 확인한 트랜잭션 안에서 불러야 한다."""
+    for name in POSTS_FTS_REBUILD_TRIGGERS:
+        sync_conn.execute(text(f"DROP TRIGGER {name}"))
+    # 시작 뒤에 들어온 요청은 이 재색인이 다 담았다고 볼 수 없으므로 남긴다.
+    sync_conn.execute(
+        text(
+            "DELETE FROM posts_fts_rebuild_requests "
+            "WHERE id <= (SELECT requested_upto FROM posts_fts_rebuild_state)"
+        )
     )
+    sync_conn.execute(text("DROP TABLE posts_fts_rebuild_state"))
+    # 없는 테이블을 가리키는 트리거가 있으면 RENAME 이 실패하므로 기존 트리거도 지웠다가 다시 만든다.
+    drop_posts_fts_triggers(sync_conn)
+    sync_conn.execute(text("DROP TABLE posts_fts"))
+    sync_conn.execute(text("ALTER TABLE posts_fts_rebuild RENAME TO posts_fts"))
+    # 새 색인은 posts 의 현재 값을 담고 있으므로 예전 색인 기준의 outbox 는 버린다.
+    sync_conn.execute(text("DELETE FROM search_outbox"))
+    # 토크나이저가 바뀌었을 수도 있으므로 모든 게시판의 검색 캐시를 버린다.
+    sync_conn.execute(text(BUMP_ALL_SEARCH_VERSIONS))
+    create_posts_fts_triggers(sync_conn)
+
 
+def migrate_posts_fts(sync_conn, tokenizer: str = FTS_TOKENIZER) -> None:
+    """posts_fts 와 원본 뷰, 트리거, 병합 설정을 현재 정의대로 맞춘다.
+
+    테이블 정의가 다르면(예전 독립 테이블, 컬럼 추가, 토크나이저 변경 등) 지우고 posts 에서 한 번 rebuild 한다.
+    끝나지 않은 재색인 요청이 남아 있어도 rebuild 한다.
+    """
+    drop_posts_fts_rebuild(sync_conn)
+    sync_conn.execute(text(POSTS_FTS_REBUILD_REQUESTS_DDL))
+    schema = dict(
+        sync_conn.execute(
+            text("SELECT name, sql FROM sqlite_master WHERE name IN ('posts_fts', 'posts_fts_source')")
+        ).all()
+    )
+    if _normalize_sql(schema.get("posts_fts_source")) != _normalize_sql(POSTS_FTS_SOURCE_DDL):
+        if "posts_fts_source" in schema:
+            sync_conn.execute(text("DROP VIEW posts_fts_source"))
+        sync_conn.execute(text(POSTS_FTS_SOURCE_DDL))
 
-async def delete_post_fts(db: AsyncSession, post_id: int) -> None:
-    await db.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post_id})
+    ddl = posts_fts_ddl(tokenizer)
+    rebuilt = False
+    if _normalize_sql(schema.get("posts_fts")) != _normalize_sql(ddl):
+        if "posts_fts" in schema:
+            sync_conn.execute(text("DROP TABLE posts_fts"))
+        sync_conn.execute(text(ddl))
+        rebuild_posts_fts(sync_conn)
+        rebuilt = True
+    _apply_fts_config(sync_conn, "posts_fts")
+    # 예전 자동완성이 쓰던 색인 전체 단어 목록. 게시판을 구분하지 못해 더는 쓰지 않는다.
+    sync_conn.execute(text("DROP TABLE IF EXISTS posts_fts_vocab"))
+    missing_triggers = create_posts_fts_triggers(sync_conn)
+    if not rebuilt and (missing_triggers or posts_fts_rebuild_requested(sync_conn)):
+        # 트리거가 없던 동안(중단된 대량 가져오기 등)의 글 쓰기나, 재색인이 끝나기 전에 멈춘 가져오기의 글은
+        # 색인에 빠져 있다.
+        rebuild_posts_fts(sync_conn)
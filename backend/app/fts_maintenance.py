@@ -0,0 +1,240 @@
+import asyncio
+import contextvars
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event, text
+
+from app.database import ReadSessionLocal, SessionLocal, engine
+from app.fts import (
+    copy_posts_fts_rebuild_chunk,
+    drop_posts_fts_rebuild,
+    posts_fts_rebuild_requested,
+    start_posts_fts_rebuild,
+    swap_posts_fts_rebuild,
+)
+
+logger = logging.getLogger(__name__)
+
+# posts_fts_data 의 id=10 행이 세그먼트 구조 레코드다.
+FTS_STRUCTURE_ROWID = 10
+# SQLite 3.45 부터 tombstone 정보가 붙은 v2 구조 레코드는 쿠키 뒤에 이 표식이 온다.
+FTS_STRUCTURE_V2 = b"\xff\x00\x00\x01"
+
+# 유지보수 작업 자신의 커밋은 '글 쓰기가 있었다'로 세지 않는다.
+_maintenance: ContextVar[bool] = ContextVar("fts_maintenance", default=False)
+
+
+def _read_varint(data: bytes, i: int) -> tuple[int, int]:
+    """SQLite 레코드 varint(빅엔디언 7비트씩, 9번째 바이트는 8비트)를 읽어 (값, 다음 위치)를 돌려준다."""
+    value = 0
+    for n in range(9):
+        byte = data[i + n]
+        if n == 8:
+            return (value << 8) | byte, i + 9
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, i + n + 1
+    return value, i + 9
+
+
+def parse_structure(block: bytes) -> dict[str, Any]:
+    """FTS5 구조 레코드에서 레벨별 세그먼트 수와 페이지 수를 뽑는다."""
+    i = 4
+    v2 = block[i : i + 4] == FTS_STRUCTURE_V2
+    if v2:
+        i += 4
+    n_levels, i = _read_varint(block, i)
+    n_segments, i = _read_varint(block, i)
+    write_counter, i = _read_varint(block, i)
+
+    levels = []
+    pages = 0
+    for level in range(n_levels):
+        merging, i = _read_varint(block, i)
+        n_seg, i = _read_varint(block, i)
+        level_pages = 0
+        for _ in range(n_seg):
+            _segid, i = _read_varint(block, i)
+            first, i = _read_varint(block, i)
+            last, i = _read_varint(block, i)
+            if v2:
+                for _ in range(5):
+                    _, i = _read_varint(block, i)
+            level_pages += last - first + 1
+        if n_seg:
+            levels.append({"level": level, "segments": n_seg, "pages": level_pages, "merging": merging})
+        pages += level_pages
+    return {"segments": n_segments, "pages": pages, "write_counter": write_counter, "levels": levels}
+
+
+class FTSMaintainer:
+    """posts_fts 세그먼트를 한가할 때 조금씩 병합하고, 요청이 오면 온라인 재색인을 한다.
+
+    'optimize' 는 색인 전체를 한 트랜잭션으로 다시 쓰므로 그동안 글 쓰기가 모두 막힌다.
+    대신 마지막 쓰기 후 idle_after 초가 지나면 'merge' 를 merge_pages 페이지씩 돌리고,
+    다른 쓰기가 들어오면 다음 한가한 때로 미룬다.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 1.0,
+        idle_after: float = 2.0,
+        merge_pages: int = 256,
+        rebuild_chunk: int = 2000,
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.idle_after = idle_after
+        self.merge_pages = merge_pages
+        self.rebuild_chunk = rebuild_chunk
+        self.last_write = time.monotonic()
+        # 마지막 'merge' 가 더 합칠 것이 없다고 답한 뒤로 쓰기가 없었으면 True.
+        self.merged = False
+        self.merge_steps = 0
+        self.merge_ms_total = 0.0
+        self.merge_ms_max = 0.0
+        self.rebuild: dict[str, Any] = {"state": "idle"}
+        self._task: asyncio.Task | None = None
+        self._rebuild_task: asyncio.Task | None = None
+
+    def note_write(self) -> None:
+        if not _maintenance.get():
+            self.last_write = time.monotonic()
+            self.merged = False
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self.last_write >= self.idle_after
+
+    async def merge_step(self) -> bool:
+        """'merge' 한 번. 더 합칠 세그먼트가 남았으면 True."""
+        started = time.perf_counter()
+        async with SessionLocal() as session:
+            before = await session.scalar(text("SELECT total_changes()"))
+            await session.execute(
+                text("INSERT INTO posts_fts(posts_fts, rank) VALUES('merge', :pages)"),
+                {"pages": self.merge_pages},
+            )
+            changed = await session.scalar(text("SELECT total_changes()")) - before
+            await session.commit()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.merge_steps += 1
+        self.merge_ms_total += elapsed
+        self.merge_ms_max = max(self.merge_ms_max, elapsed)
+        # 병합할 것이 없으면 'merge' 는 아무 행도 바꾸지 않는다(FTS5 문서 기준 2 미만).
+        return changed >= 2
+
+    async def _run(self) -> None:
+        _maintenance.set(True)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            # 가져오기 뒤 재색인을 시작하지 못했으면(이미 다른 재색인이 돌던 중 등) 요청이 남아 있다.
+            # 실패한 재색인은 되풀이하지 않고 다음 시작 때 migrate_posts_fts 에 맡긴다.
+            if self.rebuild["state"] in ("idle", "done"):
+                try:
+                    if await self.rebuild_requested():
+                        self.start_rebuild()
+                except Exception:
+                    # 잠금 충돌 등은 다음 주기에 다시 시도한다.
+                    logger.warning("FTS 재색인 요청 확인 실패", exc_info=True)
+            # 한 단계씩 writer 연결을 잡았다 놓는다. 그 사이 쓰기가 들어오면 is_idle() 이 False 가 된다.
+            while not self.merged and self.is_idle():
+                try:
+                    self.merged = not await self.merge_step()
+                except Exception:
+                    # 잠금 충돌 등은 다음 주기에 다시 시도한다.
+                    logger.warning("FTS merge 실패", exc_info=True)
+                    break
+
+    async def _rebuild(self) -> None:
+        _maintenance.set(True)
+        started = time.perf_counter()
+        status = self.rebuild
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(start_posts_fts_rebuild)
+                status["total"] = await conn.scalar(text("SELECT count(*) FROM posts"))
+            while True:
+                chunk_started = time.perf_counter()
+                async with engine.begin() as conn:
+                    copied = await conn.run_sync(copy_posts_fts_rebuild_chunk, self.rebuild_chunk)
+                    if copied == 0:
+                        # 남은 글이 없음을 확인한 트랜잭션에서 바로 바꿔야 그 사이 쓰기를 놓치지 않는다.
+                        await conn.run_sync(swap_posts_fts_rebuild)
+                chunk_ms = (time.perf_counter() - chunk_started) * 1000
+                status["max_chunk_ms"] = round(max(status["max_chunk_ms"], chunk_ms), 2)
+                if copied == 0:
+                    break
+                status["copied"] += copied
+                await asyncio.sleep(0)
+        except Exception as exc:
+            logger.warning("FTS 재색인 실패", exc_info=True)
+            status.update(state="failed", error=str(exc))
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(drop_posts_fts_rebuild)
+            except Exception:
+                # 남은 새 색인은 다음 시작 때 migrate_posts_fts 가 지운다.
+                logger.warning("FTS 재색인 정리 실패", exc_info=True)
+            return
+        finally:
+            status["elapsed_sec"] = round(time.perf_counter() - started, 3)
+
+        status["state"] = "done"
+        self.merged = False
+
+    def start_rebuild(self) -> bool:
+        """온라인 재색인을 백그라운드에서 시작한다. 이미 진행 중이면 False."""
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            return False
+        self.rebuild = {"state": "running", "copied": 0, "total": None, "max_chunk_ms": 0.0}
+        self._rebuild_task = asyncio.create_task(self._rebuild(), context=contextvars.Context())
+        return True
+
+    async def rebuild_requested(self) -> bool:
+        async with ReadSessionLocal() as session:
+            return await session.run_sync(posts_fts_rebuild_requested)
+
+    async def segment_stats(self) -> dict[str, Any]:
+        async with ReadSessionLocal() as session:
+            block = await session.scalar(
+                text("SELECT block FROM posts_fts_data WHERE id = :id"), {"id": FTS_STRUCTURE_ROWID}
+            )
+        return parse_structure(block)
+
+    async def stats(self) -> dict[str, Any]:
+        return {
+            "index": await self.segment_stats(),
+            "merge": {
+                "merged": self.merged,
+                "steps": self.merge_steps,
+                "pages_per_step": self.merge_pages,
+                "avg_step_ms": round(self.merge_ms_total / self.merge_steps, 2) if self.merge_steps else 0.0,
+                "max_step_ms": round(self.merge_ms_max, 2),
+            },
+            "rebuild": self.rebuild,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._rebuild_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._rebuild_task = None
+
+
+fts_maintainer = FTSMaintainer()
+
+
+@event.listens_for(engine.sync_engine, "commit")
+def _on_commit(_) -> None:
+    fts_maintainer.note_write()
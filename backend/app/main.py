@@ -4,17 +4,36 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.database import SessionLocal, init_db
-from app.routers import admin, auth, boards, comments, posts
+from app.board_registry import board_registry
+from app.database import SessionLocal, close_db, init_db, query_counter
+from app.fts_maintenance import fts_maintainer
+from app.og import close_http_client
+from app.og_worker import og_enricher
+from app.routers import admin, auth, boards, comments, posts, search
+from app.search_indexer import search_indexer
 from app.seed import seed_data
+from app.view_buffer import view_buffer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    search_indexer.start()
+    await og_enricher.start()
     async with SessionLocal() as session:
         await seed_data(session)
+    await board_registry.reload()
+    board_registry.start()
+    view_buffer.start()
+    fts_maintainer.start()
     yield
+    await fts_maintainer.stop()
+    await view_buffer.stop()
+    await board_registry.stop()
+    await og_enricher.stop()
+    await search_indexer.stop()
+    await close_http_client()
+    await close_db()
 
 
 app = FastAPI(title="Light Board API", lifespan=lifespan)
@@ -28,6 +47,18 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def count_queries(request: Request, call_next):
+    counter = [0]
+    token = query_counter.set(counter)
+    try:
+        response = await call_next(request)
+    finally:
+        query_counter.reset(token)
+    response.headers["X-DB-Queries"] = str(counter[0])
+    return response
+
+
 @app.middleware("http")
 async def security_headers(request: Request, call_next):
     response = await call_next(request)
@@ -58,3 +89,4 @@ app.include_router(boards.router)
 app.include_router(admin.router)
 app.include_router(posts.router)
 app.include_router(comments.router)
+app.include_router(search.router)
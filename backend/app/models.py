@@ -3,18 +3,26 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 
+def make_excerpt(body_md: str, max_len: int = 140) -> str:
+    plain = body_md.replace("\n", " ").strip()
+    return plain[:max_len] + ("…" if len(plain) > max_len else "")
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -38,6 +46,10 @@ class Board(Base):
     description: Mapped[str] = mapped_column(String(255), default="")
     slug: Mapped[str] = mapped_column(String(80), unique=True, index=True)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    # 글 목록 응답이 바뀔 때마다 posts 트리거가 올린다(app.conditional.BOARD_VERSION_TRIGGERS).
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # 이 게시판의 검색 색인이 바뀐 트랜잭션(outbox 반영, 재색인)에서 올린다. 검색 캐시의 세대로 쓴다.
+    search_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -50,16 +62,25 @@ class Board(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_board_created_id", "board_id", "created_at", "id"),
+        Index("ix_posts_board_likes_id", "board_id", "like_count", "id"),
+        Index("ix_posts_board_views_id", "board_id", "view_count", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     board_id: Mapped[int] = mapped_column(ForeignKey("boards.id"), index=True)
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     title: Mapped[str] = mapped_column(String(200), index=True)
     body_md: Mapped[str] = mapped_column(Text)
+    # 목록에서 본문 전체를 읽지 않도록 작성 시점에 미리 잘라 둔다. (make_excerpt)
+    excerpt: Mapped[str] = mapped_column(String(200), default="", server_default="")
 
     og_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     og_title: Mapped[str | None] = mapped_column(String(300), nullable=True)
     og_image: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    # none: URL 없음, pending: 수집 대기, done: 수집 완료, failed: 재시도 후 실패
+    og_status: Mapped[str] = mapped_column(String(20), default="none", server_default="none")
 
     like_count: Mapped[int] = mapped_column(Integer, default=0)
     view_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -102,13 +123,46 @@ class PostView(Base):
     )
 
 
+class SearchOutbox(Base):
+    """검색 색인에 반영할 글 변경. posts 트리거가 같은 트랜잭션에서 넣고 app.search_indexer 가 모아서 색인한다.
+
+    색인에서 지울 때 이전 값이 필요하므로(external content) 바뀌기 전/후 값을 함께 남긴다.
+    """
+
+    __tablename__ = "search_outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 글이 지워져도 남아야 하므로 외래 키를 걸지 않는다.
+    post_id: Mapped[int] = mapped_column(Integer)
+    old_board_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    old_title: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    old_body_md: Mapped[str | None] = mapped_column(Text, nullable=True)
+    new_board_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    new_title: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    new_body_md: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # 쌓인 시각(유닉스 ms). 색인 지연 측정용.
+    queued_at: Mapped[float] = mapped_column(
+        Float, server_default=text("((julianday('now') - 2440587.5) * 86400000.0)")
+    )
+
+
+def comment_path(parent: "Comment | None", comment_id: int) -> str:
+    return (parent.path if parent else "") + f"{comment_id:010d}/"
+
+
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (Index("ix_comments_post_path", "post_id", "path"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     post_id: Mapped[int] = mapped_column(ForeignKey("posts.id"), index=True)
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
-    parent_id: Mapped[int | None] = mapped_column(ForeignKey("comments.id"), nullable=True)
+    parent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("comments.id"), nullable=True, index=True
+    )
+    # Materialized path: 조상부터 자신까지 10자리 id 를 "/" 로 이어 붙인 값. 정렬하면 트리 전위 순회 순서가 된다.
+    path: Mapped[str] = mapped_column(String(1000), default="", server_default="")
+    depth: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     body_md: Mapped[str] = mapped_column(Text)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
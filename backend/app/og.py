@@ -1,10 +1,24 @@
+import asyncio
 import re
+import time
+from html.parser import HTMLParser
 from urllib.parse import urljoin
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.cache import LRUCache
 
 URL_REGEX = re.compile(r"https?://[^\s)\]}>'\"]+")
+HEAD_END_REGEX = re.compile(rb"</head\s*>|<body[\s>]", re.IGNORECASE)
+
+# <head> 가 이보다 길면 앞부분만 보고 판단한다.
+OG_MAX_BYTES = 256 * 1024
+
+_http_client: httpx.AsyncClient | None = None
+
+
+class OGFetchError(Exception):
+    pass
 
 
 def extract_first_url(text: str) -> str | None:
@@ -12,25 +26,156 @@ def extract_first_url(text: str) -> str | None:
     return match.group(0) if match else None
 
 
-async def fetch_og(url: str) -> dict[str, str | None]:
-    try:
-        async with httpx.AsyncClient(timeout=6.0, follow_redirects=True) as client:
-            response = await client.get(url)
-            response.raise_for_status()
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=6.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class _OGHeadParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta: dict[str, str] = {}
+        self.title_parts: list[str] = []
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "meta":
+            values = dict(attrs)
+            prop = values.get("property")
+            if prop in ("og:title", "og:image") and prop not in self.meta:
+                self.meta[prop] = values.get("content") or ""
+        elif tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title_parts.append(data)
+
+
+def parse_og_head(html: str) -> dict[str, str | None]:
+    parser = _OGHeadParser()
+    parser.feed(html)
+    parser.close()
+
+    title = parser.meta.get("og:title") or None
+    if not title and parser.title_parts:
+        title = "".join(parser.title_parts).strip() or None
+    return {"title": title, "image": parser.meta.get("og:image") or None}
+
+
+async def _read_head(response: httpx.Response) -> bytes:
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        # 경계에 걸친 태그를 놓치지 않도록 직전 청크 끝부분부터 다시 찾는다.
+        search_from = max(0, len(buffer) - 16)
+        buffer.extend(chunk)
+        match = HEAD_END_REGEX.search(buffer, search_from)
+        if match:
+            return bytes(buffer[: match.start()])
+        if len(buffer) >= OG_MAX_BYTES:
+            break
+    return bytes(buffer[:OG_MAX_BYTES])
+
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        og_title = soup.find("meta", property="og:title")
-        og_image = soup.find("meta", property="og:image")
+async def scrape_og(url: str) -> dict[str, str | None]:
+    async with get_http_client().stream("GET", url) as response:
+        response.raise_for_status()
+        final_url = str(response.url)
 
-        title = og_title.get("content") if og_title else None
-        if not title:
-            title_tag = soup.find("title")
-            title = title_tag.text.strip() if title_tag else None
+        content_type = response.headers.get("content-type", "").lower()
+        if content_type and "html" not in content_type:
+            return {"url": final_url, "title": None, "image": None}
 
-        image = og_image.get("content") if og_image else None
-        if image:
-            image = urljoin(str(response.url), image)
+        head = await _read_head(response)
+        encoding = response.charset_encoding or "utf-8"
 
-        return {"url": str(response.url), "title": title, "image": image}
-    except Exception:
+    meta = await asyncio.to_thread(parse_og_head, head.decode(encoding, errors="replace"))
+    image = meta["image"]
+    if image:
+        image = urljoin(final_url, image)
+
+    return {"url": final_url, "title": meta["title"], "image": image}
+
+
+_MISSING = object()
+
+
+def _is_positive(value: dict[str, str | None] | None) -> bool:
+    return value is not None
+
+
+class OGCache:
+    """URL → OG 메타데이터 캐시. TTL + LRU, 실패도 짧게 캐시하고 동시 조회는 한 번만 수집한다."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, negative_ttl: float = 300.0) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # 값이 None 이면 실패 결과(negative cache)
+        self.cache = LRUCache(max_entries)
+        self.inflight: dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    def _store(self, url: str, value: dict[str, str | None] | None) -> None:
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self.cache.put(url, value, time.monotonic() + ttl)
+
+    async def _load(self, url: str) -> dict[str, str | None] | None:
+        try:
+            value = await scrape_og(url)
+        except Exception:
+            value = None
+        self._store(url, value)
+        self.inflight.pop(url, None)
+        return value
+
+    async def get(self, url: str, allow_negative: bool = True) -> dict[str, str | None]:
+        value = self.cache.get(url, _MISSING, accept=None if allow_negative else _is_positive)
+        if value is _MISSING:
+            task = self.inflight.get(url)
+            if task is None:
+                task = asyncio.create_task(self._load(url))
+                self.inflight[url] = task
+            else:
+                self.coalesced += 1
+            # 한 요청이 취소돼도 같은 URL 을 기다리는 다른 요청의 수집은 계속된다.
+            value = await asyncio.shield(task)
+
+        if value is None:
+            raise OGFetchError(url)
+        return value
+
+    def stats(self) -> dict[str, int | float]:
+        # 캐시 미스 중 이미 수집 중이던 URL 은 coalesced 로 따로 센다.
+        return {
+            **self.cache.stats(),
+            "inflight": len(self.inflight),
+            "misses": self.cache.misses - self.coalesced,
+            "coalesced": self.coalesced,
+        }
+
+
+og_cache = OGCache()
+
+
+async def fetch_og(url: str) -> dict[str, str | None]:
+    try:
+        return await og_cache.get(url)
+    except OGFetchError:
         return {"url": url, "title": None, "image": None}
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+
+from sqlalchemy import select, text
+
+from app.database import SessionLocal
+from app.models import Post
+from app.og import og_cache
+
+logger = logging.getLogger(__name__)
+
+
+class OGEnricher:
+    """게시글 본문 첫 URL 의 OG 메타데이터를 백그라운드에서 채운다."""
+
+    def __init__(self, concurrency: int = 4, max_attempts: int = 3, retry_delay: float = 1.0) -> None:
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # (글 id, URL, 처리 자체가 실패한 횟수)
+        self.queue: asyncio.Queue[tuple[int, str, int]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+
+    def enqueue(self, post_id: int, url: str, failures: int = 0) -> None:
+        self.queue.put_nowait((post_id, url, failures))
+
+    async def _save(self, post_id: int, source_url: str, og: dict[str, str | None], status: str) -> None:
+        # 처리 중에 글이 다른 URL 로 수정됐다면 og_url 이 바뀌어 있으므로 덮어쓰지 않는다.
+        async with SessionLocal() as session:
+            await session.execute(
+                text(
+                    """
+                    UPDATE posts
+                    SET og_url = :og_url, og_title = :og_title, og_image = :og_image, og_status = :status
+                    WHERE id = :id AND og_url = :source_url AND og_status = 'pending'
+                    """
+                ),
+                {
+                    "id": post_id,
+                    "source_url": source_url,
+                    "og_url": og.get("url") or source_url,
+                    "og_title": og.get("title"),
+                    "og_image": og.get("image"),
+                    "status": status,
+                },
+            )
+            await session.commit()
+
+    async def _process(self, post_id: int, url: str) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                # 재시도 때는 직전 실패가 캐시돼 있으므로 negative cache 를 건너뛴다.
+                og = await og_cache.get(url, allow_negative=attempt == 1)
+            except Exception:
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+                continue
+            await self._save(post_id, url, og, "done")
+            return
+
+        await self._save(post_id, url, {"url": url, "title": None, "image": None}, "failed")
+
+    async def _worker(self) -> None:
+        while True:
+            post_id, url, failures = await self.queue.get()
+            try:
+                await self._process(post_id, url)
+            except Exception:
+                # 저장 실패(DB 잠금 등). pending 으로 두면 상세 화면이 끝없이 다시 묻는다.
+                await self._handle_failure(post_id, url, failures + 1)
+            finally:
+                self.queue.task_done()
+
+    async def _handle_failure(self, post_id: int, url: str, failures: int) -> None:
+        if failures < self.max_attempts:
+            logger.warning("OG 처리 실패, 다시 시도합니다 (post_id=%s, %s회째)", post_id, failures, exc_info=True)
+            # 다른 글의 처리를 막지 않도록 기다리지 않고 나중에 큐 뒤에 다시 넣는다.
+            asyncio.get_running_loop().call_later(
+                self.retry_delay * 2 ** (failures - 1), self.enqueue, post_id, url, failures
+            )
+            return
+        logger.warning("OG 처리 실패, failed 로 표시합니다 (post_id=%s)", post_id, exc_info=True)
+        try:
+            await self._save(post_id, url, {"url": url, "title": None, "image": None}, "failed")
+        except Exception:
+            # pending 으로 남은 글은 다음 시작 때 start() 가 다시 큐에 넣는다.
+            logger.warning("OG failed 표시 실패 (post_id=%s)", post_id, exc_info=True)
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        # 이전 실행에서 처리하지 못한 글을 다시 큐에 넣는다.
+        async with SessionLocal() as session:
+            rows = await session.execute(
+                select(Post.id, Post.og_url).where(Post.og_status == "pending")
+            )
+            for post_id, url in rows:
+                if url:
+                    self.enqueue(post_id, url)
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+og_enricher = OGEnricher()
@@ -1,35 +1,161 @@
+import asyncio
+import math
+import os
+import sqlite3
+import threading
 import time
-from collections import defaultdict, deque
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Callable
 
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 
+# memory: 프로세스별 제한(워커 수만큼 한도가 곱해진다) / sqlite: 같은 호스트의 워커끼리 한도를 공유
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DATABASE_PATH = "./ratelimit.db"
 
-class InMemoryRateLimiter:
-    def __init__(self) -> None:
-        self.bucket: dict[str, deque[float]] = defaultdict(deque)
 
-    def check(self, key: str, limit: int, window_sec: int) -> None:
+class RateLimitBackend(ABC):
+    """요청 제한 상태 저장소. check 는 한도 안이면 기록하고 (남은 횟수, 완전히 채워질 때까지 초) 를,
+    초과면 기록 없이 429 를 던진다. 검사와 기록은 한 번에(원자적으로) 이뤄져야 한다."""
+
+    @abstractmethod
+    def check(self, key: str, limit: int, window_sec: int) -> tuple[int, float]: ...
+
+    async def acquire(self, key: str, limit: int, window_sec: int) -> tuple[int, float]:
+        return self.check(key, limit, window_sec)
+
+
+def _too_many_requests(limit: int, window_sec: int, tat: float, now: float) -> HTTPException:
+    retry_after = tat + window_sec / limit - window_sec - now
+    return HTTPException(
+        status_code=429,
+        detail="요청이 너무 빠릅니다. 잠시 후 다시 시도해 주세요.",
+        headers={
+            "Retry-After": str(max(1, math.ceil(retry_after))),
+            **rate_limit_headers(limit, 0, tat - now),
+        },
+    )
+
+
+def _allowed(limit: int, window_sec: int, new_tat: float, now: float) -> tuple[int, float]:
+    interval = window_sec / limit
+    return int((window_sec - (new_tat - now)) // interval), new_tat - now
+
+
+class InMemoryRateLimiter(RateLimitBackend):
+    """GCRA(Generic Cell Rate Algorithm) 제한기. 키마다 '이론적 도착 시각(TAT)' float 하나만 저장한다.
+
+    window_sec 동안 limit 번을 허용하고, 요청 간격 window_sec / limit 마다 한 번씩 다시 채워진다.
+    TAT 가 현재 시각보다 과거인 키는 지워도 결과가 같으므로 오래 안 쓴 키부터 조금씩 정리하고,
+    그래도 max_keys 를 넘으면 가장 오래 안 쓴 키를 버린다.
+    """
+
+    def __init__(self, max_keys: int = 100_000, sweep_batch: int = 4) -> None:
+        self.max_keys = max_keys
+        self.sweep_batch = sweep_batch
+        self.tats: OrderedDict[str, float] = OrderedDict()
+        self.evicted = 0
+
+    def check(self, key: str, limit: int, window_sec: int) -> tuple[int, float]:
+        """허용되면 (남은 횟수, 완전히 채워질 때까지 초) 를 돌려주고, 초과면 429 를 던진다."""
         now = time.monotonic()
-        q = self.bucket[key]
+        interval = window_sec / limit
+        tat = max(self.tats.get(key, now), now)
+        new_tat = tat + interval
+
+        if new_tat - now > window_sec:
+            # 막힌 키도 최근 사용으로 표시해야 상한 정리 때 먼저 밀려나 제한이 풀리지 않는다.
+            self.tats.move_to_end(key)
+            raise _too_many_requests(limit, window_sec, tat, now)
+
+        self.tats[key] = new_tat
+        self.tats.move_to_end(key)
+        self._sweep(now)
+        return _allowed(limit, window_sec, new_tat, now)
+
+    def _sweep(self, now: float) -> None:
+        for _ in range(self.sweep_batch):
+            oldest = next(iter(self.tats.items()), None)
+            if oldest is None or oldest[1] > now:
+                break
+            del self.tats[oldest[0]]
+        while len(self.tats) > self.max_keys:
+            self.tats.popitem(last=False)
+            self.evicted += 1
+
+
+class SQLiteRateLimiter(RateLimitBackend):
+    """여러 워커 프로세스가 함께 쓰는 GCRA 제한기. 상태는 별도 SQLite 파일에 둔다.
+
+    검사와 갱신은 UPSERT 한 문장이라 SQLite 쓰기 잠금 아래에서 원자적으로 처리된다.
+    프로세스 간에 비교해야 하므로 monotonic 대신 벽시계 시각을 쓴다.
+    """
+
+    UPSERT = (
+        "INSERT INTO rate_limits(key, tat) VALUES(:key, :now + :interval) "
+        "ON CONFLICT(key) DO UPDATE SET tat = max(tat, :now) + :interval "
+        "WHERE max(tat, :now) + :interval - :now <= :window "
+        "RETURNING tat"
+    )
+
+    def __init__(self, path: str = RATE_LIMIT_DATABASE_PATH, sweep_every: int = 1000) -> None:
+        self.path = path
+        self.sweep_every = sweep_every
+        self.checks = 0
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # 제한 상태는 잃어도 잠시 한도가 풀릴 뿐이므로 fsync 를 하지 않는다.
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits(key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def check(self, key: str, limit: int, window_sec: int) -> tuple[int, float]:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            self.UPSERT, {"key": key, "now": now, "interval": window_sec / limit, "window": window_sec}
+        ).fetchone()
+
+        self.checks += 1
+        if self.checks % self.sweep_every == 0:
+            conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+
+        if row is None:
+            tat = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            raise _too_many_requests(limit, window_sec, tat[0] if tat else now, now)
+        return _allowed(limit, window_sec, row[0], now)
 
-        while q and now - q[0] > window_sec:
-            q.popleft()
+    async def acquire(self, key: str, limit: int, window_sec: int) -> tuple[int, float]:
+        # 다른 워커가 쓰기 잠금을 잡고 있으면 기다릴 수 있으므로 이벤트 루프 밖에서 실행한다.
+        return await asyncio.to_thread(self.check, key, limit, window_sec)
 
-        if len(q) >= limit:
-            raise HTTPException(status_code=429, detail="요청이 너무 빠릅니다. 잠시 후 다시 시도해 주세요.")
 
-        q.append(now)
+def rate_limit_headers(limit: int, remaining: int, reset_after: float) -> dict[str, str]:
+    return {
+        "RateLimit-Limit": str(limit),
+        "RateLimit-Remaining": str(remaining),
+        "RateLimit-Reset": str(math.ceil(reset_after)),
+    }
 
 
-limiter = InMemoryRateLimiter()
+limiter: RateLimitBackend = (
+    SQLiteRateLimiter() if RATE_LIMIT_BACKEND == "sqlite" else InMemoryRateLimiter()
+)
 
 
 def rate_limit(action: str, limit: int = 20, window_sec: int = 60) -> Callable:
-    async def dependency(request: Request) -> None:
+    async def dependency(request: Request, response: Response) -> None:
         client_ip = request.client.host if request.client else "unknown"
         auth = request.headers.get("authorization", "guest")
         key = f"{action}:{client_ip}:{auth[-16:]}"
-        limiter.check(key, limit=limit, window_sec=window_sec)
+        remaining, reset_after = await limiter.acquire(key, limit=limit, window_sec=window_sec)
+        response.headers.update(rate_limit_headers(limit, remaining, reset_after))
 
     return dependency
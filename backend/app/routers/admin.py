@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth_cache import auth_cache
+from app.board_registry import board_registry
+from app.board_transfer import board_importer, export_board
 from app.database import get_db
 from app.deps import get_current_admin
-from app.models import Board, User
-from app.schemas import BoardCreate, BoardOut, BoardUpdate
+from app.fts_maintenance import fts_maintainer
+from app.models import Board
+from app.og import og_cache
+from app.schemas import BoardCreate, BoardOut, BoardUpdate, UserPublic
+from app.search_cache import search_cache, suggest_cache
+from app.search_indexer import search_indexer
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -14,7 +24,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/boards", response_model=list[BoardOut])
 async def admin_list_boards(
     include_deleted: bool = True,
-    _: User = Depends(get_current_admin),
+    _: UserPublic = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ) -> list[BoardOut]:
     stmt = select(Board)
@@ -28,7 +38,7 @@ async def admin_list_boards(
 @router.post("/boards", response_model=BoardOut)
 async def admin_create_board(
     payload: BoardCreate,
-    _: User = Depends(get_current_admin),
+    _: UserPublic = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ) -> BoardOut:
     board = Board(
@@ -45,6 +55,7 @@ async def admin_create_board(
         raise HTTPException(status_code=400, detail="슬러그가 이미 존재합니다.")
 
     await db.refresh(board)
+    await board_registry.reload()
     return BoardOut.model_validate(board)
 
 
@@ -52,7 +63,7 @@ async def admin_create_board(
 async def admin_update_board(
     board_id: int,
     payload: BoardUpdate,
-    _: User = Depends(get_current_admin),
+    _: UserPublic = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ) -> BoardOut:
     board = await db.scalar(select(Board).where(Board.id == board_id))
@@ -73,13 +84,14 @@ async def admin_update_board(
         raise HTTPException(status_code=400, detail="슬러그가 이미 존재합니다.")
 
     await db.refresh(board)
+    await board_registry.reload()
     return BoardOut.model_validate(board)
 
 
 @router.delete("/boards/{board_id}")
 async def admin_soft_delete_board(
     board_id: int,
-    _: User = Depends(get_current_admin),
+    _: UserPublic = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, str]:
     board = await db.scalar(select(Board).where(Board.id == board_id))
@@ -88,4 +100,60 @@ async def admin_soft_delete_board(
 
     board.is_deleted = True
     await db.commit()
+    await board_registry.reload()
     return {"message": "삭제 처리되었습니다."}
+
+
+@router.get("/boards/{board_id}/export")
+async def admin_export_board(
+    board_id: int,
+    _: UserPublic = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    board = await db.get(Board, board_id)
+    if not board:
+        raise HTTPException(status_code=404, detail="게시판이 없습니다.")
+    return StreamingResponse(
+        export_board(board_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{board.slug}.ndjson"'},
+    )
+
+
+@router.post("/boards/{board_id}/import")
+async def admin_import_board(
+    board_id: int,
+    request: Request,
+    current_user: UserPublic = Depends(get_current_admin),
+) -> dict[str, Any]:
+    # 가져오기는 청크마다 쓰기 연결을 따로 잡으므로 요청 세션으로 연결을 붙잡고 있으면 안 된다.
+    if board_id not in board_registry.by_id:
+        raise HTTPException(status_code=404, detail="게시판이 없습니다.")
+    return await board_importer.run(board_id, request.stream(), fallback_author_id=current_user.id)
+
+
+@router.get("/og-cache")
+async def admin_og_cache_stats(_: UserPublic = Depends(get_current_admin)) -> dict[str, int | float]:
+    return og_cache.stats()
+
+
+@router.get("/auth-cache")
+async def admin_auth_cache_stats(_: UserPublic = Depends(get_current_admin)) -> dict[str, Any]:
+    return auth_cache.stats()
+
+
+@router.get("/search-cache")
+async def admin_search_cache_stats(_: UserPublic = Depends(get_current_admin)) -> dict[str, Any]:
+    return {"search": search_cache.stats(), "suggest": suggest_cache.stats()}
+
+
+@router.get("/fts")
+async def admin_fts_stats(_: UserPublic = Depends(get_current_admin)) -> dict[str, Any]:
+    return {**await fts_maintainer.stats(), "outbox": await search_indexer.stats()}
+
+
+@router.post("/fts/rebuild", status_code=202)
+async def admin_fts_rebuild(_: UserPublic = Depends(get_current_admin)) -> dict[str, Any]:
+    if board_importer.running or not fts_maintainer.start_rebuild():
+        raise HTTPException(status_code=409, detail="이미 재색인 중입니다.")
+    return fts_maintainer.rebuild
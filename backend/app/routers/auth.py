@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.deps import get_current_user
 from app.models import User
 from app.schemas import TokenOut, UserCreate, UserLogin, UserPublic
@@ -13,33 +14,49 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=TokenOut)
 async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)) -> TokenOut:
-    existing = await db.scalar(select(User).where(User.nickname == payload.nickname))
+    nickname = payload.nickname.strip()
+    existing = await db.scalar(select(User.id).where(User.nickname == nickname))
+    # 해시하는 동안 쓰기 연결을 잡고 있지 않도록 먼저 돌려준다. INSERT 때 다시 잡는다.
+    await db.rollback()
     if existing:
         raise HTTPException(status_code=400, detail="이미 사용 중인 닉네임입니다.")
 
     user = User(
-        nickname=payload.nickname.strip(),
-        password_hash=hash_password(payload.password),
+        nickname=nickname,
+        password_hash=await hash_password(payload.password),
         is_admin=False,
     )
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 해시하는 동안 같은 닉네임이 먼저 가입했다.
+        raise HTTPException(status_code=400, detail="이미 사용 중인 닉네임입니다.")
 
     token = create_access_token(str(user.id))
     return TokenOut(access_token=token, user=UserPublic.model_validate(user))
 
 
 @router.post("/login", response_model=TokenOut)
-async def login(payload: UserLogin, db: AsyncSession = Depends(get_db)) -> TokenOut:
-    user = await db.scalar(select(User).where(User.nickname == payload.nickname))
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: UserLogin, db: AsyncSession = Depends(get_read_db)) -> TokenOut:
+    user = (
+        await db.execute(
+            select(User.id, User.nickname, User.is_admin, User.password_hash).where(
+                User.nickname == payload.nickname
+            )
+        )
+    ).first()
+    # bcrypt 를 기다리는 동안 읽기 연결도 다른 요청이 쓸 수 있게 돌려준다.
+    await db.close()
+    if not user or not await verify_password(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="닉네임 또는 비밀번호가 올바르지 않습니다.")
 
     token = create_access_token(str(user.id))
-    return TokenOut(access_token=token, user=UserPublic.model_validate(user))
+    return TokenOut(
+        access_token=token, user=UserPublic(id=user.id, nickname=user.nickname, is_admin=user.is_admin)
+    )
 
 
 @router.get("/me", response_model=UserPublic)
-async def me(user: User = Depends(get_current_user)) -> UserPublic:
+async def me(user: UserPublic = Depends(get_current_user)) -> UserPublic:
     return UserPublic.model_validate(user)
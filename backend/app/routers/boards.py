@@ -1,17 +1,13 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Response
 
-from app.database import get_db
-from app.models import Board
+from app.board_registry import board_registry
+from app.conditional import BOOT_ID, ConditionalGet, conditional_get
 from app.schemas import BoardOut
 
 router = APIRouter(prefix="/boards", tags=["boards"])
 
 
 @router.get("", response_model=list[BoardOut])
-async def list_boards(db: AsyncSession = Depends(get_db)) -> list[BoardOut]:
-    rows = await db.scalars(
-        select(Board).where(Board.is_deleted.is_(False)).order_by(Board.created_at.asc())
-    )
-    return [BoardOut.model_validate(x) for x in rows]
+async def list_boards(cond: ConditionalGet = Depends(conditional_get)) -> Response:
+    cond.check(BOOT_ID, board_registry.version, last_modified=board_registry.last_updated)
+    return cond.respond(Response(board_registry.active_json, media_type="application/json"))
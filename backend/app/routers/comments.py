@@ -1,58 +1,190 @@
-from collections import defaultdict
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import and_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.conditional import ConditionalGet, conditional_get
 from app.database import get_db
 from app.deps import get_current_user
-from app.models import Comment, Post, User
+from app.models import Comment, Post, comment_path
+from app.pagination import decode_cursor, encode_cursor
 from app.rate_limit import rate_limit
-from app.schemas import CommentCreate, CommentNode, CommentUpdate, UserPublic
+from app.schemas import CommentCreate, CommentNode, CommentPage, CommentUpdate, UserPublic
+from app.serializers import JSONResponse, comment_to_dict, dumps_comment_tree, user_to_dict
 
 router = APIRouter(tags=["comments"])
 
+# path 는 숫자와 "/" 로만 이뤄지므로 "~" 를 붙이면 해당 접두사 범위의 상한이 된다.
+PATH_END = "~"
+# 한 페이지에 함께 내려주는 하위 댓글 최대 개수. 잘린 가지는 reply_count 를 보고 /children 으로 이어 받는다.
+SUBTREE_MAX_ROWS = 500
 
-def build_comment_tree(comments: list[Comment]) -> list[CommentNode]:
-    children_map: dict[int | None, list[Comment]] = defaultdict(list)
-    for c in comments:
-        children_map[c.parent_id].append(c)
-
-    for key in children_map:
-        children_map[key].sort(key=lambda item: item.created_at)
-
-    def make_node(comment: Comment) -> CommentNode:
-        node = CommentNode(
-            id=comment.id,
-            post_id=comment.post_id,
-            parent_id=comment.parent_id,
-            body_md=("삭제된 댓글입니다." if comment.is_deleted else comment.body_md),
-            is_deleted=comment.is_deleted,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at,
-            author=UserPublic.model_validate(comment.author),
-            children=[],
+
+def build_comment_tree(
+    comments: list[Comment],
+    root_parent_id: int | None = None,
+    reply_counts: dict[int, int] | None = None,
+) -> list[dict[str, Any]]:
+    # 부모가 항상 자식보다 앞에 오도록 정렬된 행을 받아 한 번의 순회로 트리를 만든다. (재귀 없음)
+    nodes: dict[int, dict[str, Any]] = {}
+    authors: dict[int, dict[str, Any]] = {}
+    roots: list[dict[str, Any]] = []
+
+    for comment in comments:
+        author = authors.get(comment.author_id)
+        if author is None:
+            author = authors[comment.author_id] = user_to_dict(comment.author)
+
+        node = comment_to_dict(comment, author)
+        nodes[comment.id] = node
+        if comment.parent_id == root_parent_id:
+            roots.append(node)
+        else:
+            parent = nodes.get(comment.parent_id)
+            if parent is not None:
+                parent["children"].append(node)
+
+    for comment_id, node in nodes.items():
+        node["reply_count"] = (
+            reply_counts.get(comment_id, 0) if reply_counts is not None else len(node["children"])
+        )
+    return roots
+
+
+async def load_comment_page(
+    db: AsyncSession,
+    post_id: int,
+    parent: Comment | None,
+    cursor: str | None,
+    limit: int,
+    depth: int,
+) -> dict[str, Any]:
+    # 같은 깊이의 형제를 path 순으로 limit 개 자르고, 그 형제들의 하위 댓글은 path 범위 한 번으로 가져온다.
+    prefix = parent.path if parent else ""
+    base_depth = parent.depth + 1 if parent else 0
+
+    stmt = (
+        select(Comment)
+        .options(selectinload(Comment.author))
+        .where(
+            and_(
+                Comment.post_id == post_id,
+                Comment.depth == base_depth,
+                Comment.path > prefix,
+                Comment.path < prefix + PATH_END,
+            )
         )
-        node.children = [make_node(child) for child in children_map.get(comment.id, [])]
-        return node
+        .order_by(Comment.path.asc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        # 형제는 접두사가 같으므로 커서에는 마지막 마디만 담는다(전체 path 는 깊은 스레드에서 커서 길이 제한을 넘는다).
+        last_segment, last_id = decode_cursor(cursor, "path", str)
+        if last_segment != comment_path(None, last_id):
+            raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+        stmt = stmt.where(Comment.path > prefix + last_segment)
 
-    return [make_node(root) for root in children_map.get(None, [])]
+    heads = list(await db.scalars(stmt))
+    has_more = len(heads) > limit
+    if has_more:
+        heads = heads[:limit]
+    if not heads:
+        return {"items": [], "has_more": False, "next_cursor": None}
+
+    rows = list(heads)
+    if depth > 0:
+        descendants = await db.scalars(
+            select(Comment)
+            .options(selectinload(Comment.author))
+            .where(
+                and_(
+                    Comment.post_id == post_id,
+                    Comment.depth > base_depth,
+                    Comment.depth <= base_depth + depth,
+                    Comment.path > heads[0].path,
+                    Comment.path < heads[-1].path + PATH_END,
+                )
+            )
+            .order_by(Comment.path.asc())
+            .limit(SUBTREE_MAX_ROWS)
+        )
+        rows.extend(descendants)
+
+    count_rows = await db.execute(
+        select(Comment.parent_id, func.count(Comment.id))
+        .where(Comment.parent_id.in_([c.id for c in rows]))
+        .group_by(Comment.parent_id)
+    )
+    reply_counts = {parent_id: count for parent_id, count in count_rows}
+
+    last = heads[-1]
+    return {
+        "items": build_comment_tree(rows, parent.id if parent else None, reply_counts),
+        "has_more": has_more,
+        "next_cursor": encode_cursor("path", comment_path(None, last.id), last.id) if has_more else None,
+    }
 
 
 @router.get("/posts/{post_id}/comments", response_model=list[CommentNode])
-async def list_comments(post_id: int, db: AsyncSession = Depends(get_db)) -> list[CommentNode]:
+async def list_comments(
+    post_id: int,
+    cond: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
     post = await db.scalar(select(Post.id).where(Post.id == post_id))
     if not post:
         raise HTTPException(status_code=404, detail="게시글이 없습니다.")
 
+    count, last_updated = (
+        await db.execute(
+            select(func.count(Comment.id), func.max(Comment.updated_at)).where(
+                Comment.post_id == post_id
+            )
+        )
+    ).one()
+    cond.check(post_id, count, last_updated, last_modified=last_updated)
+
     rows = await db.scalars(
         select(Comment)
         .options(selectinload(Comment.author))
         .where(Comment.post_id == post_id)
-        .order_by(Comment.created_at.asc())
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
     )
-    return build_comment_tree(list(rows))
+    return cond.respond(
+        Response(dumps_comment_tree(build_comment_tree(list(rows))), media_type="application/json")
+    )
+
+
+@router.get("/posts/{post_id}/comments/roots", response_model=CommentPage)
+async def list_root_comments(
+    post_id: int,
+    cursor: str | None = Query(default=None, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    depth: int = Query(default=2, ge=0, le=10),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    post = await db.scalar(select(Post.id).where(Post.id == post_id))
+    if not post:
+        raise HTTPException(status_code=404, detail="게시글이 없습니다.")
+
+    return JSONResponse(await load_comment_page(db, post_id, None, cursor, limit, depth))
+
+
+@router.get("/comments/{comment_id}/children", response_model=CommentPage)
+async def list_child_comments(
+    comment_id: int,
+    cursor: str | None = Query(default=None, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    depth: int = Query(default=2, ge=0, le=10),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    parent = await db.scalar(select(Comment).where(Comment.id == comment_id))
+    if not parent:
+        raise HTTPException(status_code=404, detail="댓글이 없습니다.")
+
+    return JSONResponse(await load_comment_page(db, parent.post_id, parent, cursor, limit, depth))
 
 
 @router.post(
@@ -63,13 +195,14 @@ async def list_comments(post_id: int, db: AsyncSession = Depends(get_db)) -> lis
 async def create_comment(
     post_id: int,
     payload: CommentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> CommentNode:
     post = await db.scalar(select(Post).where(Post.id == post_id))
     if not post:
         raise HTTPException(status_code=404, detail="게시글이 없습니다.")
 
+    parent = None
     if payload.parent_id:
         parent = await db.scalar(
             select(Comment).where(and_(Comment.id == payload.parent_id, Comment.post_id == post_id))
@@ -82,8 +215,11 @@ async def create_comment(
         author_id=current_user.id,
         parent_id=payload.parent_id,
         body_md=payload.body_md.strip(),
+        depth=parent.depth + 1 if parent else 0,
     )
     db.add(comment)
+    await db.flush()
+    comment.path = comment_path(parent, comment.id)
     await db.commit()
 
     row = await db.scalar(
@@ -111,7 +247,7 @@ async def create_comment(
 async def update_comment(
     comment_id: int,
     payload: CommentUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> CommentNode:
     comment = await db.scalar(
@@ -142,7 +278,7 @@ async def update_comment(
 @router.delete("/comments/{comment_id}")
 async def delete_comment(
     comment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, str]:
     comment = await db.scalar(select(Comment).where(Comment.id == comment_id))
@@ -1,65 +1,143 @@
-from typing import Literal
+from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import and_, desc, select, text
-from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy import (
+    FromClause,
+    RowMapping,
+    Select,
+    String,
+    and_,
+    exists,
+    false,
+    func,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.board_registry import board_registry
+from app.conditional import ConditionalGet, board_versions, conditional_get
 from app.database import get_db
 from app.deps import get_current_user, get_optional_user
-from app.fts import delete_post_fts, upsert_post_fts
-from app.models import Board, Like, Post, PostView, User
+from app.fts import BM25_WEIGHTS, board_match, build_match_query, fts_ref, is_query_too_short, posts_fts
+from app.models import Board, Like, Post, PostView, User, make_excerpt
 from app.og import extract_first_url, fetch_og
+from app.og_worker import og_enricher
+from app.pagination import decode_cursor, encode_cursor
 from app.rate_limit import rate_limit
+from app.search_cache import search_cache
+from app.search_indexer import search_indexer
 from app.schemas import (
+    BoardOut,
     LikeToggleOut,
     OGPreviewOut,
     PostCreate,
     PostDetail,
-    PostListItem,
     PostPage,
     PostUpdate,
     UserPublic,
 )
+from app.serializers import JSONResponse
+from app.view_buffer import view_buffer
 
 router = APIRouter(tags=["posts"])
 
-
-def make_excerpt(body_md: str, max_len: int = 140) -> str:
-    plain = body_md.replace("\n", " ").strip()
-    return plain[:max_len] + ("…" if len(plain) > max_len else "")
+SORT_COLUMNS = {
+    "latest": Post.created_at,
+    "likes": Post.like_count,
+    "views": Post.view_count,
+}
+# trigram 색인은 세 글자 미만 검색어를 찾지 못한다.
+SHORT_QUERY_DETAIL = "검색어가 너무 짧습니다. 세 글자 이상 입력해 주세요."
 
 
-async def get_board_or_404(db: AsyncSession, slug: str) -> Board:
-    board = await db.scalar(
-        select(Board).where(and_(Board.slug == slug, Board.is_deleted.is_(False)))
-    )
+def get_board_or_404(slug: str) -> BoardOut:
+    board = board_registry.get_active(slug)
     if not board:
         raise HTTPException(status_code=404, detail="게시판을 찾을 수 없습니다.")
     return board
 
 
-def post_to_item(post: Post, liked_by_me: bool, snippet: str | None = None) -> PostListItem:
-    return PostListItem(
-        id=post.id,
-        board_slug=post.board.slug,
-        title=post.title,
-        excerpt=make_excerpt(post.body_md),
-        body_md=post.body_md,
-        like_count=post.like_count,
-        view_count=post.view_count,
-        liked_by_me=liked_by_me,
-        og_url=post.og_url,
-        og_title=post.og_title,
-        og_image=post.og_image,
-        search_snippet=snippet,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=UserPublic.model_validate(post.author),
+def post_list_query(current_user: UserPublic | None, view: str, source: FromClause | None = None) -> Select:
+    # 글 + 작성자 + 현재 사용자의 좋아요 여부를 한 문장으로 가져온다.
+    columns = [
+        Post.id,
+        Post.title,
+        Post.excerpt,
+        Post.like_count,
+        Post.view_count,
+        Post.og_url,
+        Post.og_title,
+        Post.og_image,
+        Post.og_status,
+        Post.created_at,
+        Post.updated_at,
+        User.id.label("author_id"),
+        User.nickname.label("author_nickname"),
+        User.is_admin.label("author_is_admin"),
+        (Like.id.is_not(None) if current_user else false()).label("liked_by_me"),
+    ]
+    if view == "full":
+        columns.append(Post.body_md)
+
+    stmt = select(*columns).select_from(source if source is not None else Post)
+    stmt = stmt.join(User, User.id == Post.author_id)
+    if current_user:
+        stmt = stmt.outerjoin(Like, and_(Like.post_id == Post.id, Like.user_id == current_user.id))
+    return stmt
+
+
+def row_to_item(row: RowMapping, board_slug: str, view: str) -> dict[str, Any]:
+    item = {
+        "id": row["id"],
+        "board_slug": board_slug,
+        "title": row["title"],
+        "excerpt": row["excerpt"],
+        "like_count": row["like_count"],
+        "view_count": row["view_count"],
+        "liked_by_me": bool(row["liked_by_me"]),
+        "og_url": row["og_url"],
+        "og_title": row["og_title"],
+        "og_image": row["og_image"],
+        "og_status": row["og_status"],
+        "search_snippet": row.get("search_snippet"),
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "author": {
+            "id": row["author_id"],
+            "nickname": row["author_nickname"],
+            "is_admin": row["author_is_admin"],
+        },
+    }
+    if view == "full":
+        item["body_md"] = row["body_md"]
+    return item
+
+
+def post_detail_query(post_id: int, current_user: UserPublic | None) -> Select:
+    return (
+        post_list_query(current_user, "full")
+        .add_columns(Board.slug.label("board_slug"))
+        .join(Board, Board.id == Post.board_id)
+        .where(and_(Post.id == post_id, Board.is_deleted.is_(False)))
     )
 
 
+def row_to_detail(row: RowMapping) -> dict[str, Any]:
+    detail = row_to_item(row, row["board_slug"], "full")
+    del detail["excerpt"], detail["search_snippet"]
+    return detail
+
+
+async def load_post_detail(db: AsyncSession, post_id: int, current_user: UserPublic | None) -> dict[str, Any]:
+    row = (await db.execute(post_detail_query(post_id, current_user))).mappings().first()
+    if not row:
+        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
+    return row_to_detail(row)
+
+
 @router.get("/utils/og-preview", response_model=OGPreviewOut)
 async def og_preview(url: str = Query(..., min_length=8)) -> OGPreviewOut:
     og = await fetch_og(url)
@@ -72,293 +150,213 @@ async def list_posts(
     sort: Literal["latest", "likes", "views"] = "latest",
     q: str | None = Query(default=None, max_length=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, max_length=200),
     limit: int = Query(default=10, ge=1, le=20),
-    current_user: User | None = Depends(get_optional_user),
+    view: Literal["full", "compact"] = "full",
+    current_user: UserPublic | None = Depends(get_optional_user),
+    cond: ConditionalGet = Depends(conditional_get),
     db: AsyncSession = Depends(get_db),
-) -> PostPage:
-    board = await get_board_or_404(db, board_slug)
+) -> JSONResponse:
+    board = get_board_or_404(board_slug)
+    if q and is_query_too_short(q):
+        raise HTTPException(status_code=400, detail=SHORT_QUERY_DETAIL)
+    match_query = build_match_query(q) if q else None
+    if match_query is not None:
+        # 방금 글을 쓴 사용자에게는 그 글이 색인에 들어간 뒤의 결과를 보여 준다.
+        # 검색 세대도 그 뒤에 읽어야 캐시나 304 가 색인 전 결과를 돌려주지 않는다.
+        await search_indexer.wait_for_user(current_user.id if current_user else None)
+    version, search_version = await board_versions(db, board.id)
+    cond.check(
+        board.id,
+        board.slug,
+        version,
+        # 검색 결과는 글이 아니라 색인이 바뀔 때 달라진다. 색인은 글보다 늦게 반영되므로 세대도 함께 넣는다.
+        search_version if match_query is not None else None,
+        current_user.id if current_user else None,
+    )
 
-    items: list[PostListItem] = []
-    next_offset: int | None = None
+    base = post_list_query(current_user, view)
 
     if q:
-        hit_rows = []
-        try:
-            rows = await db.execute(
-                text(
-                    """
-                    SELECT p.id as post_id,
-                           snippet(posts_fts, 2, '<mark>', '</mark>', '…', 18) as body_snippet
-                    FROM posts_fts
-                    JOIN posts p ON p.id = posts_fts.post_id
-                    WHERE p.board_id = :board_id
-                      AND posts_fts MATCH :query
-                    ORDER BY bm25(posts_fts), p.created_at DESC
-                    LIMIT :limit_plus OFFSET :offset;
-                    """
-                ),
-                {
-                    "board_id": board.id,
-                    "query": q,
-                    "limit_plus": limit + 1,
-                    "offset": offset,
-                },
-            )
-            hit_rows = rows.mappings().all()
-        except OperationalError:
-            fallback_rows = await db.scalars(
-                select(Post)
-                .options(selectinload(Post.author), selectinload(Post.board))
-                .where(
-                    and_(
-                        Post.board_id == board.id,
-                        (Post.title.ilike(f"%{q}%") | Post.body_md.ilike(f"%{q}%")),
-                    )
+        post_rows = []
+        if match_query is not None:
+            cache_key = (match_query, offset, limit)
+            ranked = search_cache.get(board.id, cache_key, search_version)
+            if ranked is None:
+                search = post_list_query(
+                    current_user, view, posts_fts.join(Post, Post.id == posts_fts.c.rowid)
                 )
-                .order_by(Post.created_at.desc())
-                .offset(offset)
-                .limit(limit + 1)
-            )
-            fallback_items = list(fallback_rows)
-            has_more = len(fallback_items) > limit
-            if has_more:
-                fallback_items = fallback_items[:limit]
-
-            post_ids = [p.id for p in fallback_items]
-            liked_ids: set[int] = set()
-            if current_user and post_ids:
-                liked_rows = await db.scalars(
-                    select(Like.post_id).where(
-                        and_(Like.user_id == current_user.id, Like.post_id.in_(post_ids))
+                rows = await db.execute(
+                    search.add_columns(
+                        func.snippet(fts_ref, 1, "<mark>", "</mark>", "…", 18).label("search_snippet")
                     )
+                    .where(fts_ref.op("MATCH")(board_match(board.id, match_query)))
+                    .order_by(func.bm25(fts_ref, *BM25_WEIGHTS), Post.created_at.desc())
+                    .offset(offset)
+                    .limit(limit + 1)
                 )
-                liked_ids = set(liked_rows)
-
-            items = [post_to_item(p, p.id in liked_ids) for p in fallback_items]
-            next_offset = offset + len(items) if has_more else None
-            return PostPage(items=items, has_more=has_more, next_offset=next_offset)
-
-        has_more = len(hit_rows) > limit
-        if has_more:
-            hit_rows = hit_rows[:limit]
-
-        post_ids = [r["post_id"] for r in hit_rows]
-        snippet_map = {r["post_id"]: r["body_snippet"] for r in hit_rows}
-
-        if post_ids:
-            posts = await db.scalars(
-                select(Post)
-                .options(selectinload(Post.author), selectinload(Post.board))
-                .where(Post.id.in_(post_ids))
-            )
-            post_map = {p.id: p for p in posts}
-
-            liked_ids: set[int] = set()
-            if current_user:
-                liked_rows = await db.scalars(
-                    select(Like.post_id).where(
-                        and_(Like.user_id == current_user.id, Like.post_id.in_(post_ids))
-                    )
+                post_rows = rows.mappings().all()
+                search_cache.put(
+                    board.id, cache_key, [(r["id"], r["search_snippet"]) for r in post_rows], search_version
                 )
-                liked_ids = set(liked_rows)
-
-            for pid in post_ids:
-                post = post_map.get(pid)
-                if not post:
-                    continue
-                items.append(post_to_item(post, pid in liked_ids, snippet_map.get(pid)))
-
+            elif ranked:
+                # 순위와 snippet 만 캐시에서 가져오고 글 내용·좋아요 여부는 id 로 다시 읽는다.
+                rows = await db.execute(base.where(Post.id.in_([post_id for post_id, _ in ranked])))
+                by_id = {r["id"]: r for r in rows.mappings()}
+                post_rows = [
+                    {**by_id[post_id], "search_snippet": snippet}
+                    for post_id, snippet in ranked
+                    if post_id in by_id
+                ]
+
+        has_more = len(post_rows) > limit
+        items = [row_to_item(r, board.slug, view) for r in post_rows[:limit]]
         next_offset = offset + len(items) if has_more else None
-        return PostPage(items=items, has_more=has_more, next_offset=next_offset)
-
-    order_col = Post.created_at.desc()
-    if sort == "likes":
-        order_col = desc(Post.like_count)
-    elif sort == "views":
-        order_col = desc(Post.view_count)
+        return cond.respond(
+            JSONResponse({"items": items, "has_more": has_more, "next_offset": next_offset, "next_cursor": None})
+        )
 
-    posts = await db.scalars(
-        select(Post)
-        .options(selectinload(Post.author), selectinload(Post.board))
-        .where(Post.board_id == board.id)
-        .order_by(order_col, Post.created_at.desc())
-        .offset(offset)
+    sort_col = SORT_COLUMNS[sort]
+    stmt = (
+        base.where(Post.board_id == board.id)
+        .order_by(sort_col.desc(), Post.id.desc())
         .limit(limit + 1)
     )
-    post_rows = list(posts)
+    if cursor:
+        key, last_id = decode_cursor(cursor, sort, str if sort == "latest" else int)
+        if sort == "latest":
+            # 저장된 문자열 그대로 비교해야 인덱스 순서와 일치한다.
+            key = type_coerce(key, String)
+        stmt = stmt.where(tuple_(sort_col, Post.id) < tuple_(key, last_id))
+    else:
+        stmt = stmt.offset(offset)
+
+    rows = await db.execute(stmt)
+    post_rows = rows.mappings().all()
 
     has_more = len(post_rows) > limit
     if has_more:
         post_rows = post_rows[:limit]
 
-    post_ids = [p.id for p in post_rows]
-    liked_ids: set[int] = set()
-    if current_user and post_ids:
-        liked_rows = await db.scalars(
-            select(Like.post_id).where(
-                and_(Like.user_id == current_user.id, Like.post_id.in_(post_ids))
-            )
-        )
-        liked_ids = set(liked_rows)
-
-    items = [post_to_item(p, p.id in liked_ids) for p in post_rows]
-    next_offset = offset + len(items) if has_more else None
-    return PostPage(items=items, has_more=has_more, next_offset=next_offset)
+    items = [row_to_item(r, board.slug, view) for r in post_rows]
+    next_offset = None
+    next_cursor = None
+    if has_more:
+        last = post_rows[-1]
+        next_cursor = encode_cursor(sort, last[sort_col.key], last["id"])
+        if not cursor:
+            next_offset = offset + len(items)
+    return cond.respond(
+        JSONResponse({"items": items, "has_more": has_more, "next_offset": next_offset, "next_cursor": next_cursor})
+    )
 
 
 @router.post("/boards/{board_slug}/posts", response_model=PostDetail)
 async def create_post(
     board_slug: str,
     payload: PostCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> PostDetail:
-    board = await get_board_or_404(db, board_slug)
+) -> JSONResponse:
+    board = get_board_or_404(board_slug)
 
     first_url = extract_first_url(payload.body_md)
-    og = await fetch_og(first_url) if first_url else {"url": None, "title": None, "image": None}
 
     post = Post(
         board_id=board.id,
         author_id=current_user.id,
         title=payload.title.strip(),
         body_md=payload.body_md.strip(),
-        og_url=og.get("url"),
-        og_title=og.get("title"),
-        og_image=og.get("image"),
+        excerpt=make_excerpt(payload.body_md),
+        og_url=first_url,
+        og_status="pending" if first_url else "none",
     )
     db.add(post)
-    await db.flush()
-    await upsert_post_fts(db, post)
     await db.commit()
+    search_indexer.notify(current_user.id)
+    if first_url:
+        og_enricher.enqueue(post.id, first_url)
 
-    await db.refresh(post)
-    await db.refresh(post, attribute_names=["author", "board"])
-    return PostDetail(
-        id=post.id,
-        board_slug=board.slug,
-        title=post.title,
-        body_md=post.body_md,
-        like_count=post.like_count,
-        view_count=post.view_count,
-        liked_by_me=False,
-        og_url=post.og_url,
-        og_title=post.og_title,
-        og_image=post.og_image,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=UserPublic.model_validate(current_user),
-    )
+    return JSONResponse(await load_post_detail(db, post.id, current_user))
 
 
 @router.get("/posts/{post_id}", response_model=PostDetail)
 async def get_post_detail(
     post_id: int,
     request: Request,
-    current_user: User | None = Depends(get_optional_user),
+    current_user: UserPublic | None = Depends(get_optional_user),
+    cond: ConditionalGet = Depends(conditional_get),
     db: AsyncSession = Depends(get_db),
-) -> PostDetail:
-    post = await db.scalar(
-        select(Post)
-        .options(selectinload(Post.author), selectinload(Post.board))
-        .where(Post.id == post_id)
-    )
-    if not post or post.board.is_deleted:
-        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-
+) -> JSONResponse:
     viewer_key = (
         f"user:{current_user.id}"
         if current_user
         else f"ip:{request.client.host if request.client else 'anon'}"
     )
-
-    db.add(PostView(post_id=post.id, viewer_key=viewer_key))
-    try:
-        await db.flush()
-        post.view_count += 1
-        await db.commit()
-    except IntegrityError:
-        await db.rollback()
-
-    liked = False
-    if current_user:
-        liked = bool(
-            await db.scalar(
-                select(Like.id).where(and_(Like.post_id == post.id, Like.user_id == current_user.id))
-            )
-        )
-
-    await db.refresh(post)
-    await db.refresh(post, attribute_names=["author", "board"])
-    return PostDetail(
-        id=post.id,
-        board_slug=post.board.slug,
-        title=post.title,
-        body_md=post.body_md,
-        like_count=post.like_count,
-        view_count=post.view_count,
-        liked_by_me=liked,
-        og_url=post.og_url,
-        og_title=post.og_title,
-        og_image=post.og_image,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=UserPublic.model_validate(post.author),
+    # 이미 기록된 조회자인지 같은 문장에서 확인해, 버퍼에는 처음 보는 (글, 조회자) 쌍만 넣는다.
+    viewed = exists().where(and_(PostView.post_id == Post.id, PostView.viewer_key == viewer_key))
+    row = (
+        await db.execute(post_detail_query(post_id, current_user).add_columns(viewed.label("viewed")))
+    ).mappings().first()
+    if not row:
+        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
+    detail = row_to_detail(row)
+    if not row["viewed"]:
+        view_buffer.record(post_id, viewer_key)
+
+    detail["view_count"] += view_buffer.pending_count(post_id)
+    cond.check(
+        post_id,
+        detail["board_slug"],
+        detail["updated_at"],
+        detail["like_count"],
+        detail["view_count"],
+        detail["og_status"],
+        detail["liked_by_me"],
+        current_user.id if current_user else None,
     )
+    return cond.respond(JSONResponse(detail))
 
 
 @router.put("/posts/{post_id}", response_model=PostDetail)
 async def update_post(
     post_id: int,
     payload: PostUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> PostDetail:
+) -> JSONResponse:
     post = await db.scalar(
-        select(Post).options(selectinload(Post.board), selectinload(Post.author)).where(Post.id == post_id)
+        select(Post)
+        .join(Board, Board.id == Post.board_id)
+        .where(and_(Post.id == post_id, Board.is_deleted.is_(False)))
     )
-    if not post or post.board.is_deleted:
+    if not post:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
     if post.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="본인 글만 수정할 수 있습니다.")
 
     first_url = extract_first_url(payload.body_md)
-    og = await fetch_og(first_url) if first_url else {"url": None, "title": None, "image": None}
 
     post.title = payload.title.strip()
     post.body_md = payload.body_md.strip()
-    post.og_url = og.get("url")
-    post.og_title = og.get("title")
-    post.og_image = og.get("image")
+    post.excerpt = make_excerpt(post.body_md)
+    post.og_url = first_url
+    post.og_title = None
+    post.og_image = None
+    post.og_status = "pending" if first_url else "none"
 
-    await upsert_post_fts(db, post)
     await db.commit()
-    await db.refresh(post)
+    search_indexer.notify(current_user.id)
+    if first_url:
+        og_enricher.enqueue(post.id, first_url)
 
-    liked = bool(
-        await db.scalar(select(Like.id).where(and_(Like.post_id == post.id, Like.user_id == current_user.id)))
-    )
-    return PostDetail(
-        id=post.id,
-        board_slug=post.board.slug,
-        title=post.title,
-        body_md=post.body_md,
-        like_count=post.like_count,
-        view_count=post.view_count,
-        liked_by_me=liked,
-        og_url=post.og_url,
-        og_title=post.og_title,
-        og_image=post.og_image,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=UserPublic.model_validate(post.author),
-    )
+    return JSONResponse(await load_post_detail(db, post.id, current_user))
 
 
 @router.delete("/posts/{post_id}")
 async def delete_post(
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, str]:
     post = await db.scalar(select(Post).where(Post.id == post_id))
@@ -367,9 +365,9 @@ async def delete_post(
     if post.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="본인 글만 삭제할 수 있습니다.")
 
-    await delete_post_fts(db, post.id)
     await db.delete(post)
     await db.commit()
+    search_indexer.notify(current_user.id)
     return {"message": "삭제되었습니다."}
 
 
@@ -380,7 +378,7 @@ async def delete_post(
 )
 async def toggle_like(
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> LikeToggleOut:
     post = await db.scalar(select(Post).where(Post.id == post_id))
@@ -0,0 +1,121 @@
+from collections import Counter
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.board_registry import board_registry
+from app.conditional import board_versions
+from app.database import get_db
+from app.deps import get_optional_user
+from app.fts import (
+    FTS_PREFIXES,
+    FTS_TOKENIZER,
+    WORD_REGEX,
+    board_match,
+    build_match_query,
+    content_match,
+    fts_ref,
+    is_query_too_short,
+    last_word,
+    posts_fts,
+    title_prefix_query,
+)
+from app.models import Post
+from app.routers.posts import SHORT_QUERY_DETAIL, get_board_or_404
+from app.schemas import SearchOut, SuggestOut, UserPublic
+from app.search_cache import suggest_cache
+from app.search_indexer import search_indexer
+from app.serializers import JSONResponse
+
+router = APIRouter(tags=["search"])
+
+SUGGEST_TERM_MIN_CHARS = 2
+SUGGEST_TITLE_SCAN = 200
+
+
+@router.get("/search", response_model=SearchOut)
+async def search_all_boards(
+    q: str = Query(min_length=1, max_length=100),
+    current_user: UserPublic | None = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    if is_query_too_short(q):
+        raise HTTPException(status_code=400, detail=SHORT_QUERY_DETAIL)
+    match_query = build_match_query(q)
+    if match_query is None:
+        return JSONResponse({"q": q, "total": 0, "boards": []})
+    await search_indexer.wait_for_user(current_user.id if current_user else None)
+
+    # 전체 색인을 한 번 훑으며 게시판별 적중 수를 센다. 글 목록은 게시판 검색(list_posts)에서 가져간다.
+    rows = (
+        await db.execute(
+            select(Post.board_id, func.count().label("count"))
+            .select_from(posts_fts.join(Post, Post.id == posts_fts.c.rowid))
+            .where(fts_ref.op("MATCH")(content_match(match_query)))
+            .group_by(Post.board_id)
+        )
+    ).all()
+
+    boards = []
+    for board_id, count in rows:
+        board = board_registry.by_id.get(board_id)
+        if board is None or board.is_deleted:
+            continue
+        boards.append({"board_id": board.id, "slug": board.slug, "name": board.name, "count": count})
+    boards.sort(key=lambda x: (-x["count"], x["board_id"]))
+
+    return JSONResponse({"q": q, "total": sum(x["count"] for x in boards), "boards": boards})
+
+
+@router.get("/boards/{board_slug}/search/suggest", response_model=SuggestOut)
+async def suggest(
+    board_slug: str,
+    prefix: str = Query(min_length=1, max_length=50),
+    limit: int = Query(default=5, ge=1, le=10),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """입력 중 자동완성. 접두 색인으로 단어 후보와 제목을 찾고, 결과는 글이 바뀔 때까지 캐시한다."""
+    board = get_board_or_404(board_slug)
+    normalized = " ".join(prefix.lower().split())
+    _, generation = await board_versions(db, board.id)
+    cached = suggest_cache.get(board.id, (normalized, limit), generation)
+    if cached is not None:
+        return JSONResponse(cached)
+
+    terms = []
+    word = last_word(normalized)
+    if word is not None and len(word) >= SUGGEST_TERM_MIN_CHARS and FTS_TOKENIZER in FTS_PREFIXES:
+        # 단어 후보는 이 게시판에서 그 접두어로 시작하는 단어가 제목에 있는 최근 글들에서 뽑는다.
+        # 캐시가 이 게시판의 세대로만 무효화되므로 다른 게시판(지운 게시판 포함)의 단어를 섞으면 안 된다.
+        rows = await db.scalars(
+            select(Post.title)
+            .select_from(posts_fts.join(Post, Post.id == posts_fts.c.rowid))
+            .where(fts_ref.op("MATCH")(board_match(board.id, f'title : "{word}"*')))
+            .order_by(posts_fts.c.rowid.desc())
+            .limit(SUGGEST_TITLE_SCAN)
+        )
+        counts: Counter[str] = Counter()
+        for title in rows:
+            counts.update({term for term in WORD_REGEX.findall(title.lower()) if term.startswith(word)})
+        terms = [
+            {"term": term, "doc_count": doc_count}
+            for term, doc_count in sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:limit]
+        ]
+
+    titles = []
+    match_query = title_prefix_query(normalized)
+    if match_query is not None:
+        rows = await db.execute(
+            select(Post.id, Post.title)
+            .select_from(posts_fts.join(Post, Post.id == posts_fts.c.rowid))
+            .where(fts_ref.op("MATCH")(board_match(board.id, match_query)))
+            # bm25 는 적중한 글을 모두 점수 매겨야 하므로 색인 순서(최신 글부터)로 바로 끊는다.
+            .order_by(posts_fts.c.rowid.desc())
+            .limit(limit)
+        )
+        titles = [{"id": post_id, "title": title} for post_id, title in rows]
+
+    result = {"prefix": normalized, "terms": terms, "titles": titles}
+    suggest_cache.put(board.id, (normalized, limit), result, generation)
+    return JSONResponse(result)
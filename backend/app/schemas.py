@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -52,12 +53,12 @@ class BoardOut(BaseModel):
 
 class PostCreate(BaseModel):
     title: str = Field(min_length=1, max_length=200)
-    body_md: str = Field(min_length=1)
+    body_md: str = Field(min_length=1, max_length=50_000)
 
 
 class PostUpdate(BaseModel):
     title: str = Field(min_length=1, max_length=200)
-    body_md: str = Field(min_length=1)
+    body_md: str = Field(min_length=1, max_length=50_000)
 
 
 class OGPreviewOut(BaseModel):
@@ -71,13 +72,14 @@ class PostListItem(BaseModel):
     board_slug: str
     title: str
     excerpt: str
-    body_md: str
+    body_md: str | None = None
     like_count: int
     view_count: int
     liked_by_me: bool = False
     og_url: str | None = None
     og_title: str | None = None
     og_image: str | None = None
+    og_status: str = "none"
     search_snippet: str | None = None
     created_at: datetime
     updated_at: datetime
@@ -95,6 +97,7 @@ class PostDetail(BaseModel):
     og_url: str | None = None
     og_title: str | None = None
     og_image: str | None = None
+    og_status: str = "none"
     created_at: datetime
     updated_at: datetime
     author: UserPublic
@@ -104,6 +107,36 @@ class PostPage(BaseModel):
     items: list[PostListItem]
     has_more: bool
     next_offset: int | None = None
+    next_cursor: str | None = None
+
+
+class SearchBoardCount(BaseModel):
+    board_id: int
+    slug: str
+    name: str
+    count: int
+
+
+class SearchOut(BaseModel):
+    q: str
+    total: int
+    boards: list[SearchBoardCount]
+
+
+class SuggestTerm(BaseModel):
+    term: str
+    doc_count: int
+
+
+class SuggestTitle(BaseModel):
+    id: int
+    title: str
+
+
+class SuggestOut(BaseModel):
+    prefix: str
+    terms: list[SuggestTerm]
+    titles: list[SuggestTitle]
 
 
 class LikeToggleOut(BaseModel):
@@ -112,12 +145,12 @@ class LikeToggleOut(BaseModel):
 
 
 class CommentCreate(BaseModel):
-    body_md: str = Field(min_length=1)
+    body_md: str = Field(min_length=1, max_length=10_000)
     parent_id: int | None = None
 
 
 class CommentUpdate(BaseModel):
-    body_md: str = Field(min_length=1)
+    body_md: str = Field(min_length=1, max_length=10_000)
 
 
 class CommentNode(BaseModel):
@@ -129,7 +162,53 @@ class CommentNode(BaseModel):
     created_at: datetime
     updated_at: datetime
     author: UserPublic
+    reply_count: int = 0
     children: list["CommentNode"] = Field(default_factory=list)
 
 
 CommentNode.model_rebuild()
+
+
+class CommentPage(BaseModel):
+    items: list[CommentNode]
+    has_more: bool
+    next_cursor: str | None = None
+
+
+# 게시판 가져오기(NDJSON) 한 줄. "type" 으로 종류를 구분하고 제목·본문은 API 로 쓸 때와 같은 제약을 받는다.
+# id 는 내보낸 DB 의 id 로, 댓글·좋아요가 어느 글을 가리키는지 잇는 데만 쓴다.
+class BoardImport(BaseModel):
+    type: Literal["board"]
+
+
+class PostImport(PostCreate):
+    type: Literal["post"]
+    id: int | None = None
+    author: str | None = None
+    og_url: str | None = None
+    og_title: str | None = None
+    og_image: str | None = None
+    og_status: Literal["none", "pending", "done", "failed"] | None = None
+    view_count: int = Field(default=0, ge=0)
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class CommentImport(CommentCreate):
+    type: Literal["comment"]
+    id: int | None = None
+    post_id: int
+    author: str | None = None
+    is_deleted: bool = False
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class LikeImport(BaseModel):
+    type: Literal["like"]
+    post_id: int
+    user: str | None = None
+    created_at: datetime | None = None
+
+
+ImportRecord = Annotated[BoardImport | PostImport | CommentImport | LikeImport, Field(discriminator="type")]
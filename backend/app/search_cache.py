@@ -0,0 +1,44 @@
+import sys
+from typing import Any
+
+from app.cache import LRUCache
+
+
+def _approx_size(value: Any) -> int:
+    """캐시 항목의 대략적인 메모리 크기(bytes). 컨테이너는 안쪽 값까지 더한다."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(x) for x in value)
+    return size
+
+
+class GenerationCache:
+    """게시판별 검색 결과 캐시. 값과 함께 계산을 시작할 때의 검색 색인 세대(boards.search_version)를 기록한다.
+
+    세대는 색인을 바꾸는 트랜잭션이 DB 에서 올리므로 어느 워커가 반영했든 모든 워커의 옛 항목이 무효가 된다.
+    호출하는 쪽이 조회 전에 conditional.board_versions() 로 세대를 읽어 get/put 에 넘긴다.
+    조회 도중 색인이 바뀌면 옛 세대로 저장되어 다음 조회 때 버려진다.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        # (게시판 id, 키) → (세대, 값)
+        self.cache = LRUCache(max_entries)
+
+    def get(self, board_id: int, key: Any, generation: int) -> Any | None:
+        entry = self.cache.get((board_id, key), accept=lambda entry: entry[0] == generation)
+        return entry[1] if entry is not None else None
+
+    def put(self, board_id: int, key: Any, value: Any, generation: int) -> None:
+        self.cache.put((board_id, key), (generation, value), size=_approx_size(key) + _approx_size(value))
+
+    def stats(self) -> dict[str, int | float]:
+        return {**self.cache.stats(), "bytes": self.cache.bytes}
+
+
+# 자동완성 결과. 키는 정규화한 접두어와 개수.
+suggest_cache = GenerationCache(max_entries=4096)
+# 게시판 검색의 순위 결과(글 id 와 snippet). 키는 MATCH 식과 offset, limit.
+# 글 내용·좋아요 여부는 캐시하지 않고 조회 때마다 id 로 채운다.
+search_cache = GenerationCache(max_entries=2048)
@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from typing import Any
+
+from sqlalchemy import text
+
+from app.database import ReadSessionLocal, engine
+from app.fts import apply_search_outbox
+
+logger = logging.getLogger(__name__)
+
+# 글쓴이가 방금 쓴 글을 검색할 때 색인이 따라올 때까지 잠깐 기다린다(0 이면 끈다).
+SEARCH_READ_YOUR_WRITES = os.environ.get("SEARCH_READ_YOUR_WRITES", "1") != "0"
+
+
+class SearchIndexer:
+    """search_outbox 를 batch_size 개씩 한 트랜잭션으로 posts_fts 에 반영한다.
+
+    글 쓰기는 outbox 한 행만 남기고 끝나므로 토큰화 비용을 내지 않는다. 쓰기 뒤 notify() 로 깨우고,
+    트리거로만 들어온 변경(대량 작업 등)도 poll_interval 마다 확인한다.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+        read_your_writes: bool = SEARCH_READ_YOUR_WRITES,
+        wait_timeout: float = 1.0,
+    ) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.read_your_writes = read_your_writes
+        self.wait_timeout = wait_timeout
+        # notify() 마다 1 씩 올린다. applied_seq 이하의 쓰기는 모두 색인에 들어가 있다.
+        self.seq = 0
+        self.applied_seq = 0
+        # 사용자별 마지막 글 쓰기의 seq. 그 사용자의 검색은 applied_seq 가 여기에 닿을 때까지 기다린다.
+        self.user_marks: dict[int, int] = {}
+        self.applied = 0
+        self.batches = 0
+        self.batch_ms_total = 0.0
+        self.lag_ms_total = 0.0
+        self.lag_ms_max = 0.0
+        self._wake = asyncio.Event()
+        self._caught_up = asyncio.Condition()
+        self._task: asyncio.Task | None = None
+
+    def notify(self, user_id: int | None = None) -> None:
+        """글 쓰기 커밋 뒤에 부른다."""
+        self.seq += 1
+        if user_id is not None:
+            self.user_marks[user_id] = self.seq
+        self._wake.set()
+
+    async def wait_for_user(self, user_id: int | None) -> None:
+        """그 사용자의 마지막 글 쓰기가 색인에 들어갈 때까지 wait_timeout 초까지 기다린다."""
+        if not self.read_your_writes or user_id is None:
+            return
+        mark = self.user_marks.get(user_id)
+        if mark is None:
+            return
+        if self.applied_seq >= mark:
+            self.user_marks.pop(user_id, None)
+            return
+        self._wake.set()
+        async with self._caught_up:
+            try:
+                await asyncio.wait_for(self._caught_up.wait_for(lambda: self.applied_seq >= mark), self.wait_timeout)
+            except asyncio.TimeoutError:
+                # 색인이 밀려 있으면 기다리지 않고 지금 색인으로 검색한다.
+                pass
+
+    async def apply_batch(self) -> bool:
+        """한 번 반영한다. outbox 가 남아 있으면 True."""
+        started_seq = self.seq
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            result = await conn.run_sync(apply_search_outbox, self.batch_size)
+        if result["applied"]:
+            elapsed = (time.perf_counter() - started) * 1000
+            now_ms = time.time() * 1000
+            lags = [now_ms - queued_at for queued_at in result["queued_at"]]
+            self.applied += result["applied"]
+            self.batches += 1
+            self.batch_ms_total += elapsed
+            self.lag_ms_total += sum(lags)
+            self.lag_ms_max = max(self.lag_ms_max, max(lags))
+        more = result["applied"] >= self.batch_size
+        if not more:
+            # 시작 전에 커밋된 쓰기까지 모두 반영했다.
+            self.applied_seq = max(self.applied_seq, started_seq)
+            async with self._caught_up:
+                self._caught_up.notify_all()
+        return more
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self.apply_batch():
+                    # 배치 사이에 다른 쓰기가 writer 연결을 잡을 수 있게 양보한다.
+                    await asyncio.sleep(0)
+            except Exception:
+                # 잠금 충돌 등은 다음 주기에 다시 시도한다. outbox 는 반영된 만큼만 지워진다.
+                logger.warning("검색 색인 반영 실패", exc_info=True)
+
+    async def stats(self) -> dict[str, Any]:
+        async with ReadSessionLocal() as session:
+            pending, oldest = (
+                await session.execute(text("SELECT count(*), min(queued_at) FROM search_outbox"))
+            ).one()
+        return {
+            "pending": pending,
+            "oldest_pending_ms": round(time.time() * 1000 - oldest, 1) if oldest is not None else 0.0,
+            "applied": self.applied,
+            "batches": self.batches,
+            "avg_batch_ms": round(self.batch_ms_total / self.batches, 2) if self.batches else 0.0,
+            "avg_lag_ms": round(self.lag_ms_total / self.applied, 1) if self.applied else 0.0,
+            "max_lag_ms": round(self.lag_ms_max, 1),
+            "read_your_writes": self.read_your_writes,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # 종료 전에 밀린 변경을 반영한다. 남더라도 다음 시작 때 이어서 반영한다.
+        try:
+            while await self.apply_batch():
+                pass
+        except Exception:
+            logger.warning("종료 전 검색 색인 반영 실패", exc_info=True)
+
+
+search_indexer = SearchIndexer()
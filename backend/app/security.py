@@ -1,6 +1,11 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 
+from fastapi import HTTPException
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -10,13 +15,55 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHasher:
+    """bcrypt 를 이벤트 루프 밖의 전용 스레드 풀에서 돌린다.
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    해시 한 번이 수십~수백 ms 라 루프에서 돌리면 그동안 다른 요청이 모두 멈춘다.
+    실행 중 + 대기 중 작업이 max_pending 을 넘으면 줄을 세우지 않고 바로 503 을 돌려준다.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int = 32) -> None:
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+
+    def _done(self, _: Future) -> None:
+        # 작업 스레드(또는 시작 전 취소한 스레드)에서 불린다.
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="로그인 요청이 많습니다. 잠시 후 다시 시도해 주세요.",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        # 요청이 취소돼도 이미 시작한 해시는 스레드에서 끝까지 돈다. 그래서 pending 은 기다리던 코루틴이 아니라
+        # 작업 future 가 끝날 때(완료 또는 시작 전 취소) 줄인다.
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+
+password_hasher = PasswordHasher()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
 
 
 def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
@@ -1,9 +1,11 @@
-from sqlalchemy import select, text
+import asyncio
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.fts import upsert_post_fts
-from app.models import Board, Comment, Like, Post, User
-from app.og import extract_first_url, fetch_og
+from app.models import Board, Comment, Like, Post, User, comment_path, make_excerpt
+from app.og import extract_first_url
+from app.og_worker import og_enricher
 from app.security import hash_password
 
 
@@ -12,9 +14,12 @@ async def seed_data(db: AsyncSession) -> None:
     if existing_user:
         return
 
-    admin = User(nickname="admin", password_hash=hash_password("admin123"), is_admin=True)
-    alice = User(nickname="alice", password_hash=hash_password("alice123"), is_admin=False)
-    bob = User(nickname="bob", password_hash=hash_password("bob123"), is_admin=False)
+    admin_hash, alice_hash, bob_hash = await asyncio.gather(
+        hash_password("admin123"), hash_password("alice123"), hash_password("bob123")
+    )
+    admin = User(nickname="admin", password_hash=admin_hash, is_admin=True)
+    alice = User(nickname="alice", password_hash=alice_hash, is_admin=False)
+    bob = User(nickname="bob", password_hash=bob_hash, is_admin=False)
 
     db.add_all([admin, alice, bob])
     await db.flush()
@@ -58,16 +63,15 @@ FastAPI + Vite 조합이 꽤 빠름.
     created_posts: list[Post] = []
     for row in samples:
         url = extract_first_url(row["body"])
-        og = await fetch_og(url) if url else {"url": None, "title": None, "image": None}
 
         post = Post(
             board_id=row["board"].id,
             author_id=row["author"].id,
             title=row["title"],
             body_md=row["body"],
-            og_url=og.get("url"),
-            og_title=og.get("title"),
-            og_image=og.get("image"),
+            excerpt=make_excerpt(row["body"]),
+            og_url=url,
+            og_status="pending" if url else "none",
             like_count=0,
             view_count=0,
         )
@@ -76,9 +80,6 @@ FastAPI + Vite 조합이 꽤 빠름.
 
     await db.flush()
 
-    for post in created_posts:
-        await upsert_post_fts(db, post)
-
     db.add(Like(post_id=created_posts[0].id, user_id=bob.id))
     created_posts[0].like_count = 1
 
@@ -90,16 +91,21 @@ FastAPI + Vite 조합이 꽤 빠름.
     )
     db.add(root_comment)
     await db.flush()
+    root_comment.path = comment_path(None, root_comment.id)
 
-    db.add(
-        Comment(
-            post_id=created_posts[0].id,
-            author_id=alice.id,
-            body_md="테스트하면 결과 공유 부탁!",
-            parent_id=root_comment.id,
-        )
+    reply = Comment(
+        post_id=created_posts[0].id,
+        author_id=alice.id,
+        body_md="테스트하면 결과 공유 부탁!",
+        parent_id=root_comment.id,
+        depth=1,
     )
+    db.add(reply)
+    await db.flush()
+    reply.path = comment_path(root_comment, reply.id)
 
-    # FTS 테이블 초기화
-    await db.execute(text("INSERT INTO posts_fts(posts_fts) VALUES('optimize')"))
     await db.commit()
+
+    for post in created_posts:
+        if post.og_url:
+            og_enricher.enqueue(post.id, post.og_url)
@@ -0,0 +1,70 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.models import Board, Comment, User
+
+
+# 응답 모델 검증을 다시 거치지 않도록 읽기 경로는 dict 를 만들어 바로 직렬화한다.
+# 필드 구성은 app.schemas 의 응답 모델과 같게 유지해야 한다.
+JSONResponse = ORJSONResponse
+
+
+def dumps_comment_tree(roots: list[dict[str, Any]]) -> bytes:
+    """중첩 깊이 제한 없이 댓글 트리를 JSON bytes 로 만든다.
+
+    orjson 과 표준 json 모두 재귀로 직렬화하므로 아주 깊은 답글 체인에서 실패한다.
+    노드의 스칼라 필드만 orjson 으로 직렬화하고 children 배열은 명시적인 스택으로 이어 붙인다.
+    """
+    parts = [b"["]
+    stack = [iter(roots)]
+    first = [True]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            first.pop()
+            parts.append(b"]}" if stack else b"]")
+            continue
+
+        if not first[-1]:
+            parts.append(b",")
+        first[-1] = False
+
+        fields = {key: value for key, value in node.items() if key != "children"}
+        parts.append(orjson.dumps(fields)[:-1])
+        parts.append(b',"children":[')
+        stack.append(iter(node["children"]))
+        first.append(True)
+    return b"".join(parts)
+
+
+def user_to_dict(user: User) -> dict[str, Any]:
+    return {"id": user.id, "nickname": user.nickname, "is_admin": user.is_admin}
+
+
+def board_to_dict(board: Board) -> dict[str, Any]:
+    return {
+        "id": board.id,
+        "name": board.name,
+        "description": board.description,
+        "slug": board.slug,
+        "is_deleted": board.is_deleted,
+        "created_at": board.created_at,
+    }
+
+
+def comment_to_dict(comment: Comment, author: dict[str, Any] | None = None) -> dict[str, Any]:
+    return {
+        "id": comment.id,
+        "post_id": comment.post_id,
+        "parent_id": comment.parent_id,
+        "body_md": "삭제된 댓글입니다." if comment.is_deleted else comment.body_md,
+        "is_deleted": comment.is_deleted,
+        "created_at": comment.created_at,
+        "updated_at": comment.updated_at,
+        "author": author if author is not None else user_to_dict(comment.author),
+        "reply_count": 0,
+        "children": [],
+    }
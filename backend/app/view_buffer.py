@@ -0,0 +1,106 @@
+import asyncio
+import contextvars
+import logging
+from collections import defaultdict
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class ViewBuffer:
+    """조회 기록을 메모리에 모았다가 주기적으로 한 번에 기록한다.
+
+    post_views 에 아직 없는 (글, 조회자) 쌍만 record() 해야 pending_count() 가 실제로 늘어날 조회수와 같다.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, max_pending: int = 500) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: dict[int, set[str]] = defaultdict(set)
+        self.pending_size = 0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    def _add(self, post_id: int, viewer_key: str) -> None:
+        keys = self.pending[post_id]
+        if viewer_key not in keys:
+            keys.add(viewer_key)
+            self.pending_size += 1
+
+    def record(self, post_id: int, viewer_key: str) -> None:
+        self._add(post_id, viewer_key)
+
+        flushing = self._flush_task is not None and not self._flush_task.done()
+        if self.pending_size >= self.max_pending and not flushing:
+            # 요청 컨텍스트를 물려받지 않아야 flush 쿼리가 그 요청의 쿼리 수에 섞이지 않는다.
+            self._flush_task = asyncio.create_task(self.flush(), context=contextvars.Context())
+            self._flush_task.add_done_callback(self._log_flush_error)
+
+    @staticmethod
+    def _log_flush_error(task: asyncio.Task) -> None:
+        # 실패한 기록은 버퍼로 되돌아가 다음 flush 에서 다시 시도하므로 로그만 남긴다.
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("조회수 flush 실패", exc_info=task.exception())
+
+    def pending_count(self, post_id: int) -> int:
+        return len(self.pending.get(post_id, ()))
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self.pending:
+                return
+            batch = self.pending
+            self.pending = defaultdict(set)
+            self.pending_size = 0
+
+            try:
+                async with SessionLocal() as session:
+                    for post_id, keys in batch.items():
+                        result = await session.execute(
+                            text(
+                                "INSERT OR IGNORE INTO post_views(post_id, viewer_key) "
+                                "VALUES(:post_id, :viewer_key)"
+                            ),
+                            [{"post_id": post_id, "viewer_key": key} for key in keys],
+                        )
+                        if result.rowcount > 0:
+                            await session.execute(
+                                text("UPDATE posts SET view_count = view_count + :n WHERE id = :id"),
+                                {"n": result.rowcount, "id": post_id},
+                            )
+                    await session.commit()
+            except Exception:
+                # 기록 실패 시 다음 flush 에서 다시 시도한다.
+                for post_id, keys in batch.items():
+                    for key in keys:
+                        self._add(post_id, key)
+                raise
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.warning("조회수 flush 실패", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+view_buffer = ViewBuffer()
@@ -0,0 +1,200 @@
+"""게시판 NDJSON 내보내기/가져오기 벤치마크: 글·댓글·좋아요 합쳐 100만 행을 내보내고 새 게시판으로 다시 가져온다.
+시간, 파일 크기, 파이썬 프로세스의 익명 메모리 최대 증가량(RssAnon), 가져오기 청크 트랜잭션의 최대 길이를 잰다.
+
+    cd backend
+    python -m bench.board_transfer
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+POSTS = 300_000
+COMMENTS = 500_000
+LIKES = 200_000
+USERS = 200
+READ_SIZE = 64 * 1024
+
+
+class AnonPeak:
+    """RssAnon 을 주기적으로 읽어 최대값을 기록한다. mmap 으로 읽은 DB 페이지는 빼고 힙만 본다."""
+
+    def __init__(self) -> None:
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current() -> int:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            time.sleep(0.02)
+
+    def __enter__(self) -> "AnonPeak":
+        self.base = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def seed(path: str) -> None:
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    for name in ("posts_fts_ai", "posts_fts_ad", "posts_fts_au"):
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.executemany(
+        "INSERT INTO users(id, nickname, password_hash, is_admin) VALUES(?, ?, '', 0)",
+        [(i, f"user{i}") for i in range(1, USERS + 1)],
+    )
+    conn.execute("INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(1, 'src', '', 'src', 0)")
+    conn.execute("INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(2, 'dst', '', 'dst', 0)")
+    conn.executemany(
+        """
+        INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count)
+        VALUES(?, 1, ?, ?, ?, '', 0, 0)
+        """,
+        (
+            (i, rng.randint(1, USERS), f"제목 {i}", f"본문 {i} " + "내용 " * rng.randint(5, 60))
+            for i in range(1, POSTS + 1)
+        ),
+    )
+
+    def comments():
+        for i in range(1, COMMENTS + 1):
+            post_id = rng.randint(1, POSTS)
+            yield (i, post_id, rng.randint(1, USERS), f"{i:010d}/", f"댓글 {i}")
+
+    conn.executemany(
+        "INSERT INTO comments(id, post_id, author_id, path, depth, body_md, is_deleted) VALUES(?, ?, ?, ?, 0, ?, 0)",
+        comments(),
+    )
+    # 글마다 앞 댓글에 답글을 붙여 부모 대응을 확인한다.
+    conn.execute(
+        """
+        UPDATE comments SET parent_id = (
+            SELECT min(p.id) FROM comments p WHERE p.post_id = comments.post_id AND p.id < comments.id
+        )
+        WHERE id % 3 = 0
+        """
+    )
+    conn.execute(
+        """
+        UPDATE comments SET
+            path = (SELECT p.path FROM comments p WHERE p.id = comments.parent_id) || printf('%010d/', id),
+            depth = 1
+        WHERE parent_id IS NOT NULL
+        """
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO likes(post_id, user_id) VALUES(?, ?)",
+        ((rng.randint(1, POSTS), rng.randint(1, USERS)) for _ in range(LIKES)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def counts(conn: sqlite3.Connection, board_id: int) -> tuple[int, int, int, int]:
+    return conn.execute(
+        """
+        SELECT (SELECT count(*) FROM posts WHERE board_id = :b),
+               (SELECT count(*) FROM comments c JOIN posts p ON p.id = c.post_id WHERE p.board_id = :b),
+               (SELECT count(*) FROM comments c JOIN posts p ON p.id = c.post_id
+                WHERE p.board_id = :b AND c.parent_id IS NOT NULL),
+               (SELECT count(*) FROM likes l JOIN posts p ON p.id = l.post_id WHERE p.board_id = :b)
+        """,
+        {"b": board_id},
+    ).fetchone()
+
+
+async def read_chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_SIZE):
+            yield chunk
+
+
+async def main() -> None:
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+    db_path = os.path.join(tmp, "board.db")
+    dump_path = os.path.join(tmp, "src.ndjson")
+
+    from app.database import close_db, init_db
+
+    await init_db()
+    await close_db()
+    started = time.perf_counter()
+    seed(db_path)
+    await init_db()
+    conn = sqlite3.connect(db_path)
+    source = counts(conn, 1)
+    print(
+        f"seeded posts={source[0]:,} comments={source[1]:,} (replies {source[2]:,}) likes={source[3]:,} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    from app.board_transfer import board_importer, export_board
+    from app.fts_maintenance import fts_maintainer
+
+    # 청크마다 트랜잭션 길이(= 다른 쓰기가 기다릴 수 있는 최대 시간)를 잰다.
+    flush = board_importer._flush
+    chunk_ms: list[float] = []
+
+    async def timed_flush(*args):
+        chunk_started = time.perf_counter()
+        await flush(*args)
+        chunk_ms.append((time.perf_counter() - chunk_started) * 1000)
+
+    board_importer._flush = timed_flush
+
+    print(f"{'step':>8} | {'rows':>9} | {'sec':>6} | {'rows/s':>8} | {'file MB':>7} | {'heap +MB':>8}")
+    rows = sum(source) - source[2]
+    with AnonPeak() as mem:
+        started = time.perf_counter()
+        with open(dump_path, "wb") as f:
+            async for part in export_board(1):
+                f.write(part)
+        elapsed = time.perf_counter() - started
+    size = os.path.getsize(dump_path) / 2**20
+    print(
+        f"{'export':>8} | {rows:>9,} | {elapsed:>6.1f} | {rows / elapsed:>8,.0f} | {size:>7.0f} | "
+        f"{(mem.peak - mem.base) / 2**20:>8.1f}"
+    )
+
+    with AnonPeak() as mem:
+        started = time.perf_counter()
+        stats = await board_importer.run(2, read_chunks(dump_path), fallback_author_id=1)
+        elapsed = time.perf_counter() - started
+    imported = stats["posts"] + stats["comments"] + stats["likes"]
+    print(
+        f"{'import':>8} | {imported:>9,} | {elapsed:>6.1f} | {imported / elapsed:>8,.0f} | {'':>7} | "
+        f"{(mem.peak - mem.base) / 2**20:>8.1f}"
+    )
+    print(f"import: {len(chunk_ms)} chunks of {board_importer.chunk_size}, max transaction {max(chunk_ms):.0f} ms")
+
+    started = time.perf_counter()
+    await fts_maintainer._rebuild_task
+    print(f"fts online rebuild after import: {fts_maintainer.rebuild}, waited {time.perf_counter() - started:.1f}s")
+
+    target = counts(conn, 2)
+    print(f"source={source} imported={target} {'ok' if source == target else 'MISMATCH'} stats={stats}")
+    conn.close()
+    await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
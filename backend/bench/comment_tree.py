@@ -0,0 +1,128 @@
+"""댓글 트리 직렬화 벤치마크: 기존 재귀 CommentNode + response_model 검증 vs 반복 dict + orjson.
+
+    cd backend
+    python -m bench.comment_tree
+"""
+
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.routers.comments import build_comment_tree
+from app.schemas import CommentNode, UserPublic
+from app.serializers import dumps_comment_tree
+
+SIZES = [10_000, 100_000]
+ROUNDS = 3
+CHAIN_DEPTH = 5_000
+
+
+def legacy_build_comment_tree(comments) -> list[CommentNode]:
+    children_map = defaultdict(list)
+    for c in comments:
+        children_map[c.parent_id].append(c)
+
+    for key in children_map:
+        children_map[key].sort(key=lambda item: item.created_at)
+
+    def make_node(comment) -> CommentNode:
+        node = CommentNode(
+            id=comment.id,
+            post_id=comment.post_id,
+            parent_id=comment.parent_id,
+            body_md=("삭제된 댓글입니다." if comment.is_deleted else comment.body_md),
+            is_deleted=comment.is_deleted,
+            created_at=comment.created_at,
+            updated_at=comment.updated_at,
+            author=UserPublic.model_validate(comment.author),
+            children=[],
+        )
+        node.children = [make_node(child) for child in children_map.get(comment.id, [])]
+        return node
+
+    return [make_node(root) for root in children_map.get(None, [])]
+
+
+def make_comments(count: int, max_depth: int) -> list[SimpleNamespace]:
+    rng = random.Random(count)
+    authors = [SimpleNamespace(id=i, nickname=f"user{i}", is_admin=False) for i in range(1, 51)]
+    started = datetime(2025, 1, 1)
+    depth: dict[int, int] = {}
+    rows = []
+    for cid in range(1, count + 1):
+        parent_id = None
+        if cid > 1 and rng.random() < 0.8:
+            candidate = rng.randint(max(1, cid - 200), cid - 1)
+            if depth[candidate] < max_depth:
+                parent_id = candidate
+        depth[cid] = depth[parent_id] + 1 if parent_id else 0
+        author = rng.choice(authors)
+        created = started + timedelta(seconds=cid)
+        rows.append(
+            SimpleNamespace(
+                id=cid,
+                post_id=1,
+                parent_id=parent_id,
+                author_id=author.id,
+                author=author,
+                body_md="댓글 본문 " * 8,
+                is_deleted=False,
+                created_at=created,
+                updated_at=created,
+            )
+        )
+    return rows
+
+
+def legacy_pipeline(rows) -> bytes:
+    nodes = legacy_build_comment_tree(rows)
+    # FastAPI 가 response_model 로 한 번 더 검증한 뒤 jsonable_encoder + json.dumps 하는 과정
+    validated = TypeAdapter(list[CommentNode]).validate_python(nodes, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode("utf-8")
+
+
+def fast_pipeline(rows) -> bytes:
+    return dumps_comment_tree(build_comment_tree(rows))
+
+
+def best_of(fn, rows) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main() -> None:
+    sys.setrecursionlimit(10_000)
+    print(f"{'comments':>9} | {'legacy ms':>10} | {'fast ms':>8} | {'speedup':>7}")
+    for size in SIZES:
+        rows = make_comments(size, max_depth=50)
+        legacy_ms = best_of(legacy_pipeline, rows)
+        fast_ms = best_of(fast_pipeline, rows)
+        print(f"{size:>9} | {legacy_ms:>10.1f} | {fast_ms:>8.1f} | {legacy_ms / fast_ms:>6.1f}x")
+
+    # 한 줄로 이어진 깊은 답글 체인: 기존 구현은 기본 재귀 한도에 걸린다.
+    sys.setrecursionlimit(1_000)
+    chain = make_comments(CHAIN_DEPTH, max_depth=CHAIN_DEPTH)
+    for i, row in enumerate(chain[1:], start=1):
+        row.parent_id = chain[i - 1].id
+    try:
+        legacy_pipeline(chain)
+        legacy_result = "ok"
+    except RecursionError:
+        legacy_result = "RecursionError"
+    fast_pipeline(chain)
+    print(f"depth-{CHAIN_DEPTH} chain: legacy={legacy_result}, fast=ok")
+
+
+if __name__ == "__main__":
+    main()
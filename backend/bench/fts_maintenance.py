@@ -0,0 +1,167 @@
+"""FTS 색인 유지보수 벤치마크: 작은 트랜잭션으로 쌓인 세그먼트를
+한 번에 'optimize' 할 때와 한가할 때 'merge' 를 페이지 단위로 나눠 돌릴 때의 글 쓰기 차단 시간,
+그리고 'rebuild' 명령 vs 온라인 재색인(구간별 복사 후 교체)의 최대 차단 시간을 잰다.
+
+    cd backend
+    python -m bench.fts_maintenance
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+POSTS = 100_000
+POSTS_PER_COMMIT = 20
+MERGE_PAGES = 256
+REBUILD_CHUNK = 2000
+ROUNDS = 50
+VOCAB = [f"단어{i}" for i in range(20000)]
+
+
+def seed(path: str) -> None:
+    # 글 쓰기 요청처럼 작은 트랜잭션으로 쓰고, 색인기가 작은 배치로 반영할 때마다 새 세그먼트가 생긴다.
+    from app.fts import apply_search_outbox
+
+    rng = random.Random(3)
+    sync_engine = create_engine(f"sqlite:///{path}", pool_size=1)
+    with sync_engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.execute(text("INSERT INTO users(id, nickname, password_hash, is_admin) VALUES(1, 'u', '', 0)"))
+        conn.execute(text("INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(1, 'b', '', 'b', 0)"))
+    for start in range(1, POSTS + 1, POSTS_PER_COMMIT):
+        rows = []
+        for i in range(start, min(start + POSTS_PER_COMMIT, POSTS + 1)):
+            words = rng.choices(VOCAB, k=30)
+            rows.append({"id": i, "title": " ".join(words[:3]), "body_md": " ".join(words)})
+        with sync_engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count)
+                    VALUES(:id, 1, 1, :title, :body_md, '', 0, 0)
+                    """
+                ),
+                rows,
+            )
+        with sync_engine.begin() as conn:
+            apply_search_outbox(conn, POSTS_PER_COMMIT)
+    sync_engine.dispose()
+
+
+def segments(conn: sqlite3.Connection) -> int:
+    from app.fts_maintenance import FTS_STRUCTURE_ROWID, parse_structure
+
+    block = conn.execute("SELECT block FROM posts_fts_data WHERE id = ?", (FTS_STRUCTURE_ROWID,)).fetchone()[0]
+    return parse_structure(block)["segments"]
+
+
+def query_ms(conn: sqlite3.Connection) -> float:
+    from app.fts import board_match, build_match_query
+
+    rng = random.Random(9)
+    matches = [board_match(1, build_match_query(rng.choice(VOCAB))) for _ in range(ROUNDS)]
+    for match in matches:
+        # 페이지 캐시를 데운다.
+        conn.execute("SELECT count(*) FROM posts_fts WHERE posts_fts MATCH ?", (match,)).fetchone()
+    timings = []
+    for match in matches:
+        started = time.perf_counter()
+        conn.execute(
+            "SELECT rowid FROM posts_fts WHERE posts_fts MATCH ? ORDER BY bm25(posts_fts, 1.0, 1.0, 0.0) LIMIT 21",
+            (match,),
+        ).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def timed_commit(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> tuple[float, int]:
+    """한 트랜잭션(= 그동안 다른 쓰기가 기다리는 시간)의 ms 와 바뀐 행 수."""
+    before = conn.total_changes
+    started = time.perf_counter()
+    conn.execute(sql, params)
+    conn.commit()
+    return (time.perf_counter() - started) * 1000, conn.total_changes - before
+
+
+async def main() -> None:
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+    path = os.path.join(tmp, "board.db")
+
+    from app.database import close_db, init_db
+    from app.fts import copy_posts_fts_rebuild_chunk, start_posts_fts_rebuild, swap_posts_fts_rebuild
+
+    await init_db()
+    await close_db()
+    started = time.perf_counter()
+    seed(path)
+    print(f"posts={POSTS:,} ({POSTS_PER_COMMIT} per commit and per indexer batch) seeded in {time.perf_counter() - started:.1f}s")
+
+    conn = sqlite3.connect(path)
+    print(f"fragmented: {segments(conn)} segments, query median {query_ms(conn):.2f} ms")
+    conn.close()
+    incremental = os.path.join(tmp, "incremental.db")
+    shutil.copy(path, incremental)
+
+    print()
+    print(f"{'maintenance':>22} | {'total ms':>8} | {'max block ms':>12} | {'steps':>5} | {'segments':>8} | {'query ms':>8}")
+    conn = sqlite3.connect(path)
+    elapsed, _ = timed_commit(conn, "INSERT INTO posts_fts(posts_fts) VALUES('optimize')")
+    print(f"{'optimize':>22} | {elapsed:>8.0f} | {elapsed:>12.0f} | {1:>5} | {segments(conn):>8} | {query_ms(conn):>8.2f}")
+    conn.close()
+
+    conn = sqlite3.connect(incremental)
+    steps = []
+    while True:
+        elapsed, changed = timed_commit(conn, "INSERT INTO posts_fts(posts_fts, rank) VALUES('merge', ?)", (MERGE_PAGES,))
+        steps.append(elapsed)
+        if changed < 2:
+            break
+    label = f"merge {MERGE_PAGES} pages x N"
+    print(
+        f"{label:>22} | {sum(steps):>8.0f} | {max(steps):>12.0f} | {len(steps):>5} | "
+        f"{segments(conn):>8} | {query_ms(conn):>8.2f}"
+    )
+    conn.close()
+
+    print()
+    print(f"{'rebuild':>22} | {'total ms':>8} | {'max block ms':>12} | {'steps':>5}")
+    conn = sqlite3.connect(path)
+    elapsed, _ = timed_commit(conn, "INSERT INTO posts_fts(posts_fts) VALUES('rebuild')")
+    print(f"{'rebuild command':>22} | {elapsed:>8.0f} | {elapsed:>12.0f} | {1:>5}")
+    conn.close()
+
+    sync_engine = create_engine(f"sqlite:///{path}")
+    steps = []
+    while True:
+        chunk_started = time.perf_counter()
+        with sync_engine.begin() as sa_conn:
+            if not steps:
+                start_posts_fts_rebuild(sa_conn)
+                copied = 1
+            else:
+                copied = copy_posts_fts_rebuild_chunk(sa_conn, REBUILD_CHUNK)
+                if copied == 0:
+                    swap_posts_fts_rebuild(sa_conn)
+        steps.append((time.perf_counter() - chunk_started) * 1000)
+        if copied == 0:
+            break
+    label = f"online {REBUILD_CHUNK} posts x N"
+    print(f"{label:>22} | {sum(steps):>8.0f} | {max(steps):>12.0f} | {len(steps):>5}")
+    sync_engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO posts_fts(posts_fts, rank) VALUES('integrity-check', 1)")
+    print(f"online rebuild: {segments(conn)} segments, integrity-check ok, query median {query_ms(conn):.2f} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""FTS 토크나이저 벤치마크: unicode61(접두 질의) vs trigram — 색인 크기, 재색인 시간, 검색 지연과 적중 수.
+기존 LIKE '%q%' 전체 스캔을 기준선으로 함께 잰다.
+
+    cd backend
+    python -m bench.fts_tokenizers
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+POSTS = 100_000
+WORDS_PER_POST = 40
+ROUNDS = 20
+SYLLABLES = list("가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치")
+PARTICLES = ["은", "는", "이", "가", "을", "를", "에", "에서", "으로", "의", "도", "와", "과"]
+
+
+def make_vocab(rng: random.Random) -> list[str]:
+    vocab = set()
+    while len(vocab) < 3000:
+        vocab.add("".join(rng.choices(SYLLABLES, k=rng.choice((2, 3, 4)))))
+    return sorted(vocab)
+
+
+def seed(path: str, vocab: list[str]) -> None:
+    rng = random.Random(5)
+    weights = [1 / (i + 1) for i in range(len(vocab))]
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users(id, nickname, password_hash, is_admin) VALUES(1, 'u', '', 0)")
+    conn.execute("INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(1, 'b', '', 'b', 0)")
+
+    def rows():
+        for i in range(1, POSTS + 1):
+            words = [w + rng.choice(PARTICLES) for w in rng.choices(vocab, weights=weights, k=WORDS_PER_POST)]
+            yield (i, " ".join(words[:4]), " ".join(words))
+
+    conn.executemany(
+        """
+        INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count)
+        VALUES(?, 1, 1, ?, ?, '', 0, 0)
+        """,
+        rows(),
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(conn: sqlite3.Connection, page_sql: str, count_sql: str, params: tuple) -> tuple[float, int]:
+    """한 페이지(21개) 조회의 중앙값 지연과 전체 적중 수."""
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        conn.execute(page_sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), conn.execute(count_sql, params).fetchone()[0]
+
+
+async def main() -> None:
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+    path = os.path.join(tmp, "board.db")
+
+    from app.database import close_db, init_db
+    from app.fts import board_match, build_match_query, migrate_posts_fts
+
+    await init_db()
+    await close_db()
+    vocab = make_vocab(random.Random(5))
+    seed(path, vocab)
+
+    # 빈도가 중간쯤인 네 글자 단어
+    four = [w for w in vocab if len(w) == 4]
+    stem = four[len(four) // 10]
+    queries = {
+        "eojeol": stem + "는",  # 조사까지 붙은 어절 그대로
+        "stem": stem,  # 어절 앞부분
+        "2-char": stem[:2],  # 두 글자 검색어
+        "infix": stem[1:],  # 어절 가운데 부분
+    }
+
+    sync_engine = create_engine(f"sqlite:///{path}")
+    conn = sqlite3.connect(path)
+
+    print(f"posts={POSTS:,} words/post={WORDS_PER_POST}")
+    print(f"{'tokenizer':>9} | {'rebuild s':>9} | {'index MB':>8}")
+    results: dict[str, dict[str, tuple[float, int]]] = {}
+    for tokenizer in ("unicode61", "trigram"):
+        conn.execute("DROP TABLE posts_fts")
+        conn.commit()
+        started = time.perf_counter()
+        with sync_engine.begin() as sa_conn:
+            migrate_posts_fts(sa_conn, tokenizer)
+        rebuild = time.perf_counter() - started
+        size = conn.execute("SELECT sum(length(block)) FROM posts_fts_data").fetchone()[0]
+        print(f"{tokenizer:>9} | {rebuild:>9.1f} | {size / 2**20:>8.1f}")
+
+        results[tokenizer] = {}
+        for name, q in queries.items():
+            match = build_match_query(q, tokenizer)
+            if match is None:
+                results[tokenizer][name] = (0.0, 0)
+                continue
+            results[tokenizer][name] = measure(
+                conn,
+                "SELECT rowid FROM posts_fts WHERE posts_fts MATCH ? "
+                "ORDER BY bm25(posts_fts, 1.0, 1.0, 0.0) LIMIT 21",
+                "SELECT count(*) FROM posts_fts WHERE posts_fts MATCH ?",
+                (board_match(1, match),),
+            )
+
+    where = "board_id = 1 AND (title LIKE ?1 OR body_md LIKE ?1)"
+    results["LIKE scan"] = {
+        name: measure(
+            conn,
+            f"SELECT id FROM posts WHERE {where} ORDER BY created_at DESC LIMIT 21",
+            f"SELECT count(*) FROM posts WHERE {where}",
+            (f"%{q}%",),
+        )
+        for name, q in queries.items()
+    }
+
+    print()
+    print(f"{'query':>7} | {'text':>8} | " + " | ".join(f"{name:>19}" for name in results))
+    for name, q in queries.items():
+        cells = [f"{results[impl][name][0]:>7.2f} ms {results[impl][name][1]:>5} hit" for impl in results]
+        print(f"{name:>7} | {q:>8} | " + " | ".join(f"{cell:>19}" for cell in cells))
+    print("(지연은 21개 한 페이지, hit 는 전체 적중 수. 세 글자 미만 검색어는 trigram 에서 색인으로 찾을 수 없어 0)")
+    conn.close()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
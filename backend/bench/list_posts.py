@@ -0,0 +1,156 @@
+"""list_posts 벤치마크: ORM + selectinload + 좋아요 조회(기존) vs Core 단일 쿼리 프로젝션.
+
+    cd backend
+    python -m bench.list_posts
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import and_, event, select
+from sqlalchemy.orm import selectinload
+
+POSTS = 50_000
+USERS = 200
+BOARDS = 5
+ROUNDS = 300
+LIMIT = 20
+
+
+def seed(path: str) -> None:
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users(id, nickname, password_hash, is_admin) VALUES(?, ?, '', 0)",
+        [(i, f"user{i}") for i in range(1, USERS + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(?, ?, '', ?, 0)",
+        [(i, f"board {i}", f"b{i}") for i in range(1, BOARDS + 1)],
+    )
+    conn.executemany(
+        """
+        INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count,
+                          created_at, updated_at)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, datetime('2025-01-01', '+' || ? || ' seconds'),
+               datetime('2025-01-01', '+' || ? || ' seconds'))
+        """,
+        [
+            (
+                i,
+                rng.randint(1, BOARDS),
+                rng.randint(1, USERS),
+                f"글 제목 {i}",
+                "본문 " * 400,
+                "본문 " * 28,
+                rng.randint(0, 500),
+                rng.randint(0, 5000),
+                i,
+                i,
+            )
+            for i in range(1, POSTS + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO likes(post_id, user_id) VALUES(?, 1)",
+        [(rng.randint(1, POSTS),) for _ in range(POSTS // 10)],
+    )
+    conn.commit()
+    conn.close()
+
+
+async def legacy_list_posts(db, board_slug: str, sort: str, user) -> dict:
+    from app.models import Board, Like, Post
+    from app.routers.posts import SORT_COLUMNS
+
+    board = await db.scalar(select(Board).where(and_(Board.slug == board_slug, Board.is_deleted.is_(False))))
+    posts = await db.scalars(
+        select(Post)
+        .options(selectinload(Post.author), selectinload(Post.board))
+        .where(Post.board_id == board.id)
+        .order_by(SORT_COLUMNS[sort].desc(), Post.id.desc())
+        .limit(LIMIT + 1)
+    )
+    rows = list(posts)[:LIMIT]
+    liked_ids = set(
+        await db.scalars(
+            select(Like.post_id).where(and_(Like.user_id == user.id, Like.post_id.in_([p.id for p in rows])))
+        )
+    )
+    return {
+        "items": [
+            {
+                "id": p.id,
+                "board_slug": p.board.slug,
+                "title": p.title,
+                "excerpt": p.excerpt,
+                "like_count": p.like_count,
+                "view_count": p.view_count,
+                "liked_by_me": p.id in liked_ids,
+                "created_at": p.created_at,
+                "author": {"id": p.author.id, "nickname": p.author.nickname, "is_admin": p.author.is_admin},
+            }
+            for p in rows
+        ]
+    }
+
+
+async def main() -> None:
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+
+    from fastapi import Request
+
+    from app.board_registry import board_registry
+    from app.conditional import ConditionalGet
+    from app.database import ReadSessionLocal, close_db, init_db, read_engine
+    from app.routers.posts import list_posts
+
+    await init_db()
+    seed(os.path.join(tmp, "board.db"))
+    await board_registry.reload()
+
+    statements = 0
+
+    @event.listens_for(read_engine.sync_engine, "before_cursor_execute")
+    def count(*_) -> None:
+        nonlocal statements
+        statements += 1
+
+    user = SimpleNamespace(id=1)
+
+    async def new_path(db, slug: str, sort: str) -> None:
+        await list_posts(
+            board_slug=slug, sort=sort, q=None, offset=0, cursor=None, limit=LIMIT,
+            view="compact", current_user=user,
+            cond=ConditionalGet(Request({"type": "http", "headers": []})), db=db,
+        )
+
+    async def old_path(db, slug: str, sort: str) -> None:
+        await legacy_list_posts(db, slug, sort, user)
+
+    print(f"{'sort':>7} | {'impl':>6} | {'queries':>7} | {'median ms':>9} | {'p95 ms':>7}")
+    for sort in ("latest", "likes", "views"):
+        for name, fn in (("legacy", old_path), ("core", new_path)):
+            timings = []
+            async with ReadSessionLocal() as db:
+                for i in range(ROUNDS):
+                    db.expunge_all()
+                    statements = 0
+                    started = time.perf_counter()
+                    await fn(db, f"b{i % BOARDS + 1}", sort)
+                    timings.append((time.perf_counter() - started) * 1000)
+            p95 = statistics.quantiles(timings, n=20)[18]
+            print(f"{sort:>7} | {name:>6} | {statements:>7} | {statistics.median(timings):>9.2f} | {p95:>7.2f}")
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""로그인 폭주 중 다른 요청의 지연시간: 쓰기 세션을 잡은 채 bcrypt 를 기다리던 기존 /auth/login vs
+읽기 세션으로 조회하고 bcrypt 전에 연결을 돌려주는 현재 /auth/login.
+
+임시 디렉터리에 시드된 앱을 띄워 ASGI 로 실제 라우트에 요청한다. 로그인이 몰리는 동안
+무관한 GET(글 목록)과 쓰기(글 수정 PUT)를 일정 간격으로 보내 예약 시각부터 응답까지를 잰다.
+
+    cd backend
+    python -m bench.login_storm
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CONCURRENT_LOGINS = 16
+PROBE_INTERVAL = 0.05
+NICKNAME = "alice"
+PASSWORD = "alice123"
+
+
+async def legacy_login(payload: dict, db: AsyncSession) -> bool:
+    """기존 구현: POST 라 get_db 가 쓰기 세션을 주고, 그 연결을 잡은 채 bcrypt 를 기다린다."""
+    from app.models import User
+    from app.security import verify_password
+
+    user = await db.scalar(select(User).where(User.nickname == payload["nickname"]))
+    if not user or not await verify_password(payload["password"], user.password_hash):
+        raise HTTPException(status_code=401, detail="닉네임 또는 비밀번호가 올바르지 않습니다.")
+    return True
+
+
+async def probe(client: httpx.AsyncClient, method: str, url: str, done: asyncio.Event, timings: list[float], **kwargs) -> None:
+    # 일정 간격으로 요청을 예약하고 예약 시각부터 응답까지를 잰다(앞 요청이 밀린 시간도 지연에 포함).
+    begin = time.perf_counter()
+    tick = 0
+    while not done.is_set():
+        scheduled = begin + tick * PROBE_INTERVAL
+        tick += 1
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        response = await client.request(method, url, **kwargs)
+        assert response.status_code == 200, response.text
+        timings.append((time.perf_counter() - scheduled) * 1000)
+
+
+async def storm(client: httpx.AsyncClient, login_path: str, headers: dict[str, str], post_id: int) -> dict:
+    done = asyncio.Event()
+    reads: list[float] = []
+    writes: list[float] = []
+    probes = [
+        asyncio.create_task(probe(client, "GET", "/boards/free/posts", done, reads)),
+        asyncio.create_task(
+            probe(
+                client, "PUT", f"/posts/{post_id}", done, writes,
+                headers=headers, json={"title": "로그인 폭주 중 수정", "body_md": "본문"},
+            )
+        ),
+    ]
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    responses = await asyncio.gather(
+        *(
+            client.post(login_path, json={"nickname": NICKNAME, "password": PASSWORD})
+            for _ in range(CONCURRENT_LOGINS)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    done.set()
+    await asyncio.gather(*probes)
+    statuses = [response.status_code for response in responses]
+    return {
+        "reads": reads,
+        "writes": writes,
+        "ok": statuses.count(200),
+        "rejected": statuses.count(503),
+        "elapsed": elapsed,
+    }
+
+
+def row(label: str, timings: list[float]) -> str:
+    p99 = statistics.quantiles(timings, n=100, method="inclusive")[98]
+    return f"{label:>6} | {len(timings):>5} | {statistics.median(timings):>8.2f} | {p99:>8.2f} | {max(timings):>8.2f}"
+
+
+async def main() -> None:
+    os.chdir(tempfile.mkdtemp())
+
+    from app.database import get_db
+    from app.main import app
+    from app.security import password_hasher
+
+    async def legacy_route(payload: dict, db: AsyncSession = Depends(get_db)) -> dict[str, bool]:
+        return {"ok": await legacy_login(payload, db)}
+
+    app.add_api_route("/bench/legacy-login", legacy_route, methods=["POST"])
+
+    print(
+        f"bcrypt workers={password_hasher.workers}, max_pending={password_hasher.max_pending}, "
+        f"concurrent logins={CONCURRENT_LOGINS}, probe every {PROBE_INTERVAL * 1000:.0f} ms"
+    )
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            login = await client.post("/auth/login", json={"nickname": NICKNAME, "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            post = await client.post("/boards/free/posts", headers=headers, json={"title": "벤치", "body_md": "본문"})
+            post_id = post.json()["id"]
+
+            print(f"{'login':>14} | {'probe':>6} | {'count':>5} | {'p50 ms':>8} | {'p99 ms':>8} | {'max ms':>8}")
+            for label, path in (("writer session", "/bench/legacy-login"), ("read + release", "/auth/login")):
+                result = await storm(client, path, headers, post_id)
+                print(f"{label:>14} | {row('GET', result['reads'])}")
+                print(f"{'':>14} | {row('PUT', result['writes'])}")
+                print(
+                    f"{'':>14} | logins ok={result['ok']} 503={result['rejected']} "
+                    f"storm {result['elapsed']:.2f}s"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
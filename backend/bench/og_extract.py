@@ -0,0 +1,112 @@
+"""OG 추출 벤치마크: 기존 전체 다운로드 + BeautifulSoup vs 스트리밍 <head> 추출.
+
+    cd backend
+    pip install beautifulsoup4  # 비교 대상(기존 구현)에만 필요
+    python -m bench.og_extract
+"""
+
+import asyncio
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urljoin
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.og import close_http_client, scrape_og
+
+SIZES_MB = [1, 5, 20]
+ROUNDS = 5
+
+HEAD = (
+    "<!doctype html><html><head><meta charset='utf-8'>"
+    "<title>벤치마크 문서</title>"
+    "<meta property='og:title' content='대용량 페이지'>"
+    "<meta property='og:image' content='/cover.png'>"
+    "</head><body>"
+)
+
+
+async def legacy_fetch_og(url: str) -> dict[str, str | None]:
+    async with httpx.AsyncClient(timeout=6.0, follow_redirects=True) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    og_title = soup.find("meta", property="og:title")
+    og_image = soup.find("meta", property="og:image")
+
+    title = og_title.get("content") if og_title else None
+    if not title:
+        title_tag = soup.find("title")
+        title = title_tag.text.strip() if title_tag else None
+
+    image = og_image.get("content") if og_image else None
+    if image:
+        image = urljoin(str(response.url), image)
+
+    return {"url": str(response.url), "title": title, "image": image}
+
+
+def write_fixtures(root: Path) -> None:
+    paragraph = "<p>" + "가나다라마바사 lorem ipsum dolor sit amet " * 20 + "</p>\n"
+    for size in SIZES_MB:
+        body = paragraph * (size * 1024 * 1024 // len(paragraph.encode()) + 1)
+        (root / f"page-{size}mb.html").write_text(HEAD + body + "</body></html>", encoding="utf-8")
+
+
+def serve(root: Path) -> ThreadingHTTPServer:
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+    class QuietServer(ThreadingHTTPServer):
+        def handle_error(self, request, client_address) -> None:
+            # 스트리밍 추출은 <head> 만 읽고 연결을 끊으므로 BrokenPipe 가 정상이다.
+            pass
+
+    server = QuietServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure(fn, url: str) -> tuple[float, float]:
+    timings = []
+    peak = 0
+    for _ in range(ROUNDS):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = await fn(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert result["title"] == "대용량 페이지", result
+    return statistics.median(timings), peak / 1024 / 1024
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_fixtures(root)
+        server = serve(root)
+        base = f"http://127.0.0.1:{server.server_port}"
+
+        print(f"{'fixture':>10} | {'impl':>9} | {'median ms':>10} | {'peak MiB':>9}")
+        for size in SIZES_MB:
+            url = f"{base}/page-{size}mb.html"
+            for name, fn in (("legacy", legacy_fetch_og), ("streaming", scrape_og)):
+                ms, mib = await measure(fn, url)
+                print(f"{size:>8}MB | {name:>9} | {ms:>10.1f} | {mib:>9.2f}")
+
+        server.shutdown()
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
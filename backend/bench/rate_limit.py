@@ -0,0 +1,82 @@
+"""요청 제한기 벤치마크: 키별 deque(기존) vs GCRA + 유휴 키 정리/상한 — 서로 다른 키 수백만 개.
+
+    cd backend
+    python -m bench.rate_limit
+"""
+
+import gc
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+from fastapi import HTTPException
+
+from app.rate_limit import InMemoryRateLimiter
+
+DISTINCT_KEYS = 2_000_000
+HOT_KEYS = 1_000
+LIMIT = 20
+WINDOW = 60
+
+
+class LegacyRateLimiter:
+    def __init__(self) -> None:
+        self.bucket: dict[str, deque[float]] = defaultdict(deque)
+
+    def check(self, key: str, limit: int, window_sec: int) -> None:
+        now = time.monotonic()
+        q = self.bucket[key]
+        while q and now - q[0] > window_sec:
+            q.popleft()
+        if len(q) >= limit:
+            raise HTTPException(status_code=429, detail="요청이 너무 빠릅니다. 잠시 후 다시 시도해 주세요.")
+        q.append(now)
+
+
+def run(limiter, keys: list[str]) -> int:
+    rejected = 0
+    for key in keys:
+        try:
+            limiter.check(key, LIMIT, WINDOW)
+        except HTTPException:
+            rejected += 1
+    return rejected
+
+
+def main() -> None:
+    # 대부분 한 번만 보이는 키(IP·토큰 조합) + 계속 들어오는 소수의 키
+    keys = [f"like:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:{i:016x}" for i in range(DISTINCT_KEYS)]
+    hot = [f"like:hot:{i}" for i in range(HOT_KEYS)]
+    workload = []
+    for i, key in enumerate(keys):
+        workload.append(key)
+        if i % 10 == 0:
+            workload.append(hot[i // 10 % HOT_KEYS])
+
+    print(f"checks={len(workload):,} distinct keys={DISTINCT_KEYS + HOT_KEYS:,}")
+    print(f"{'impl':>7} | {'ns/check':>8} | {'memory MB':>9} | {'tracked':>9} | {'rejected':>8}")
+    for name, factory in (("legacy", LegacyRateLimiter), ("gcra", InMemoryRateLimiter)):
+        # 시간은 tracemalloc 없이, 메모리는 같은 작업을 한 번 더 돌려서 잰다.
+        gc.collect()
+        limiter = factory()
+        started = time.perf_counter()
+        rejected = run(limiter, workload)
+        elapsed = time.perf_counter() - started
+        del limiter
+
+        gc.collect()
+        tracemalloc.start()
+        limiter = factory()
+        run(limiter, workload)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tracked = len(limiter.bucket) if name == "legacy" else len(limiter.tats)
+        print(
+            f"{name:>7} | {elapsed / len(workload) * 1e9:>8.0f} | {memory / 2**20:>9.1f} | "
+            f"{tracked:>9,} | {rejected:>8,}"
+        )
+        del limiter
+
+
+if __name__ == "__main__":
+    main()
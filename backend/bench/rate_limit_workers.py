@@ -0,0 +1,60 @@
+"""여러 워커 프로세스가 한 한도를 나눠 쓰는지 확인: 프로세스별 메모리 제한기 vs SQLite 공유 제한기.
+
+    cd backend
+    python -m bench.rate_limit_workers
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+
+from fastapi import HTTPException
+
+WORKERS = 4
+REQUESTS_PER_WORKER = 200
+LIMIT = 50
+WINDOW = 3600
+
+
+def worker(backend: str, path: str, start, results) -> None:
+    from app.rate_limit import InMemoryRateLimiter, SQLiteRateLimiter
+
+    limiter = SQLiteRateLimiter(path) if backend == "sqlite" else InMemoryRateLimiter()
+    allowed = 0
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(REQUESTS_PER_WORKER):
+        try:
+            limiter.check("like:shared", LIMIT, WINDOW)
+            allowed += 1
+        except HTTPException:
+            pass
+    results.put((allowed, time.perf_counter() - started))
+
+
+def main() -> None:
+    ctx = multiprocessing.get_context("spawn")
+    print(f"workers={WORKERS} requests/worker={REQUESTS_PER_WORKER} limit={LIMIT}/{WINDOW}s")
+    print(f"{'backend':>7} | {'allowed':>7} | {'expected':>8} | {'us/check':>8}")
+    for backend in ("memory", "sqlite"):
+        path = os.path.join(tempfile.mkdtemp(), "ratelimit.db")
+        start = ctx.Event()
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(backend, path, start, results)) for _ in range(WORKERS)]
+        for proc in procs:
+            proc.start()
+        time.sleep(1.0)
+        start.set()
+        outcomes = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        allowed = sum(x[0] for x in outcomes)
+        per_check = max(x[1] for x in outcomes) / REQUESTS_PER_WORKER * 1e6
+        status = "ok" if allowed == LIMIT else "EXCEEDED"
+        print(f"{backend:>7} | {allowed:>7} | {LIMIT:>8} | {per_check:>8.1f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""검색 색인 outbox 벤치마크: 글 쓰기 트랜잭션 안에서 바로 FTS 에 넣던 트리거(기존) vs outbox 한 행만 남기는 트리거.
+글 하나를 쓰는 트랜잭션의 지연, 색인기의 배치 반영 속도, 그리고 배치 크기와 상관없이 같은 색인이 나오는지 확인한다.
+
+    cd backend
+    python -m bench.search_outbox
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+POSTS = 100_000
+WRITES = 2000
+BATCH_SIZES = (1, 7, 500)
+VOCAB = [f"단어{i}" for i in range(20000)]
+
+LEGACY_TRIGGERS = (
+    """
+    CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, body_md, board_key)
+        VALUES (new.id, new.title, new.body_md, printf('~%d~', new.board_id));
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, body_md, board_key)
+        VALUES ('delete', old.id, old.title, old.body_md, printf('~%d~', old.board_id));
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, body_md, board_id ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, body_md, board_key)
+        VALUES ('delete', old.id, old.title, old.body_md, printf('~%d~', old.board_id));
+        INSERT INTO posts_fts(rowid, title, body_md, board_key)
+        VALUES (new.id, new.title, new.body_md, printf('~%d~', new.board_id));
+    END
+    """,
+)
+
+
+def body(rng: random.Random) -> tuple[str, str]:
+    words = rng.choices(VOCAB, k=rng.randint(30, 300))
+    return " ".join(words[:4]), " ".join(words)
+
+
+def seed(path: str) -> None:
+    rng = random.Random(1)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users(id, nickname, password_hash, is_admin) VALUES(1, 'u', '', 0)")
+    conn.executemany(
+        "INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(?, ?, '', ?, 0)",
+        [(i, f"board {i}", f"b{i}") for i in range(1, 6)],
+    )
+    conn.executemany(
+        """
+        INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count)
+        VALUES(?, ?, 1, ?, ?, '', 0, 0)
+        """,
+        ((i, rng.randint(1, 5), *body(rng)) for i in range(1, POSTS + 1)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def write_mix(conn: sqlite3.Connection, seed_value: int) -> list[float]:
+    """create/update/delete 를 섞어 WRITES 번, 한 번에 한 트랜잭션. 트랜잭션별 ms 를 돌려준다."""
+    rng = random.Random(seed_value)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    timings = []
+    next_id = POSTS + 1
+    for _ in range(WRITES):
+        kind = rng.random()
+        started = time.perf_counter()
+        if kind < 0.6:
+            conn.execute(
+                "INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count) "
+                "VALUES(?, ?, 1, ?, ?, '', 0, 0)",
+                (next_id, rng.randint(1, 5), *body(rng)),
+            )
+            next_id += 1
+        elif kind < 0.9:
+            conn.execute(
+                "UPDATE posts SET title = ?, body_md = ? WHERE id = ?",
+                (*body(rng), rng.randint(1, next_id - 1)),
+            )
+        else:
+            conn.execute("DELETE FROM posts WHERE id = ?", (rng.randint(1, next_id - 1),))
+        conn.commit()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def results(conn: sqlite3.Connection) -> list:
+    rng = random.Random(5)
+    out = []
+    for _ in range(50):
+        term = rng.choice(VOCAB)
+        out.append(
+            conn.execute(
+                "SELECT rowid FROM posts_fts WHERE posts_fts MATCH ? ORDER BY rowid", (f'"{term}"*',)
+            ).fetchall()
+        )
+    return out
+
+
+async def main() -> None:
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+    path = os.path.join(tmp, "board.db")
+
+    from app.database import close_db, init_db
+    from app.fts import apply_search_outbox, rebuild_posts_fts
+
+    await init_db()
+    await close_db()
+    seed(path)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    with sync_engine.begin() as sa_conn:
+        rebuild_posts_fts(sa_conn)
+    sync_engine.dispose()
+    base = os.path.join(tmp, "base.db")
+    shutil.copy(path, base)
+    print(f"posts={POSTS:,} writes={WRITES:,} (60% create, 30% update, 10% delete, one transaction each)")
+
+    legacy = os.path.join(tmp, "legacy.db")
+    shutil.copy(base, legacy)
+    conn = sqlite3.connect(legacy)
+    for name in ("posts_fts_ai", "posts_fts_ad", "posts_fts_au"):
+        conn.execute(f"DROP TRIGGER {name}")
+    for ddl in LEGACY_TRIGGERS:
+        conn.execute(ddl)
+    conn.commit()
+    legacy_ms = write_mix(conn, 42)
+    expected = results(conn)
+    conn.close()
+
+    outbox = os.path.join(tmp, "outbox.db")
+    shutil.copy(base, outbox)
+    conn = sqlite3.connect(outbox)
+    outbox_ms = write_mix(conn, 42)
+    pending = conn.execute("SELECT count(*) FROM search_outbox").fetchone()[0]
+    conn.close()
+
+    print()
+    print(f"{'write path':>14} | {'p50 ms':>6} | {'p99 ms':>6} | {'max ms':>6}")
+    for label, timings in (("FTS in trigger", legacy_ms), ("outbox row", outbox_ms)):
+        q = statistics.quantiles(timings, n=100)
+        print(f"{label:>14} | {q[49]:>6.2f} | {q[98]:>6.2f} | {max(timings):>6.2f}")
+
+    print()
+    print(f"outbox pending={pending:,}; replay with different batch sizes:")
+    print(f"{'batch':>6} | {'batches':>7} | {'total ms':>8} | {'same results as trigger index':>29}")
+    for batch_size in BATCH_SIZES:
+        replay = os.path.join(tmp, f"replay{batch_size}.db")
+        shutil.copy(outbox, replay)
+        sync_engine = create_engine(f"sqlite:///{replay}")
+        batches = 0
+        started = time.perf_counter()
+        while True:
+            with sync_engine.begin() as sa_conn:
+                applied = apply_search_outbox(sa_conn, batch_size)["applied"]
+            if not applied:
+                break
+            batches += 1
+        elapsed = (time.perf_counter() - started) * 1000
+        sync_engine.dispose()
+        conn = sqlite3.connect(replay)
+        conn.execute("INSERT INTO posts_fts(posts_fts, rank) VALUES('integrity-check', 1)")
+        same = results(conn) == expected
+        conn.close()
+        print(f"{batch_size:>6} | {batches:>7} | {elapsed:>8.0f} | {'yes' if same else 'NO':>29}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
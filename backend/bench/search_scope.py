@@ -0,0 +1,131 @@
+"""게시판 검색 벤치마크: 전체 색인 MATCH 후 board_id 필터(기존) vs MATCH 안에서 게시판 한정, 그리고 /search 게시판별 집계.
+
+    cd backend
+    python -m bench.search_scope
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+POSTS = 1_000_000
+BOARDS = 100
+ROUNDS = 30
+LIMIT = 20
+VOCAB = [f"단어{i}" for i in range(5000)]
+
+LEGACY = """
+SELECT posts.id, snippet(posts_fts, 1, '<mark>', '</mark>', '…', 18)
+FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid
+WHERE posts_fts MATCH :q AND posts.board_id = :board_id
+ORDER BY bm25(posts_fts), posts.created_at DESC
+LIMIT :limit
+"""
+
+SCOPED = """
+SELECT posts.id, snippet(posts_fts, 1, '<mark>', '</mark>', '…', 18)
+FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid
+WHERE posts_fts MATCH :scoped_q
+ORDER BY bm25(posts_fts, 1.0, 1.0, 0.0), posts.created_at DESC
+LIMIT :limit
+"""
+
+COUNTS = """
+SELECT posts.board_id, count(*)
+FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid
+WHERE posts_fts MATCH :q
+GROUP BY posts.board_id
+"""
+
+
+def board_of(rng: random.Random) -> int:
+    # 게시판 크기가 크게 차이 나도록: 1번이 절반 가까이, 나머지는 점점 작아진다.
+    return min(BOARDS, int(rng.paretovariate(1.0)))
+
+
+def seed(path: str) -> None:
+    rng = random.Random(11)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE posts_fts")
+    for name in ("posts_fts_ai", "posts_fts_ad", "posts_fts_au"):
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("INSERT INTO users(id, nickname, password_hash, is_admin) VALUES(1, 'u', '', 0)")
+    conn.executemany(
+        "INSERT INTO boards(id, name, description, slug, is_deleted) VALUES(?, ?, '', ?, 0)",
+        [(i, f"board {i}", f"b{i}") for i in range(1, BOARDS + 1)],
+    )
+
+    def rows():
+        for i in range(1, POSTS + 1):
+            words = rng.choices(VOCAB, k=25)
+            if rng.random() < 0.3:
+                words.append("공통어")
+            if rng.random() < 0.001:
+                words.append("희귀어")
+            yield (i, board_of(rng), f"제목 {words[0]} {words[1]}", " ".join(words), i, i)
+
+    conn.executemany(
+        """
+        INSERT INTO posts(id, board_id, author_id, title, body_md, excerpt, like_count, view_count,
+                          created_at, updated_at)
+        VALUES(?, ?, 1, ?, ?, '', 0, 0, datetime('2025-01-01', '+' || ? || ' seconds'),
+               datetime('2025-01-01', '+' || ? || ' seconds'))
+        """,
+        rows(),
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(conn: sqlite3.Connection, sql: str, params: dict) -> float:
+    started = time.perf_counter()
+    conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - started) * 1000
+
+
+async def main() -> None:
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+
+    from app.database import close_db, init_db
+    from app.fts import board_match, content_match
+
+    await init_db()
+    await close_db()
+    started = time.perf_counter()
+    seed(os.path.join(tmp, "board.db"))
+    # FTS 테이블을 지운 상태에서 다시 init_db 를 돌려 마이그레이션 경로의 rebuild 로 색인을 만든다.
+    await init_db()
+    await close_db()
+    print(f"seeded {POSTS:,} posts + FTS rebuild in {time.perf_counter() - started:.1f}s")
+
+    conn = sqlite3.connect(os.path.join(tmp, "board.db"))
+    sizes = dict(conn.execute("SELECT board_id, count(*) FROM posts GROUP BY board_id").fetchall())
+    small = max(sizes, key=lambda b: (sizes[b] < 2000, sizes[b]))
+    cases = [("big", 1), ("small", small)]
+
+    print(f"{'board':>6} | {'posts':>7} | {'term':>6} | {'legacy ms':>9} | {'scoped ms':>9}")
+    for label, board_id in cases:
+        for term in ("공통어", "희귀어"):
+            params = {"q": term, "scoped_q": board_match(board_id, term), "board_id": board_id, "limit": LIMIT + 1}
+            legacy = [timed(conn, LEGACY, params) for _ in range(ROUNDS)]
+            scoped = [timed(conn, SCOPED, params) for _ in range(ROUNDS)]
+            print(
+                f"{label:>6} | {sizes[board_id]:>7,} | {term:>6} | "
+                f"{statistics.median(legacy):>9.2f} | {statistics.median(scoped):>9.2f}"
+            )
+
+    for term in ("공통어", "희귀어"):
+        params = {"q": content_match(term)}
+        counts = [timed(conn, COUNTS, params) for _ in range(5)]
+        hits = sum(x[1] for x in conn.execute(COUNTS, params).fetchall())
+        print(f"/search counts '{term}': {hits:,} hits, median {statistics.median(counts):.1f} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory: pytest.TempPathFactory):
+    # app.database 는 현재 디렉터리의 board.db 를 쓴다. 앱 싱글턴은 프로세스에 하나라 세션 동안 한 번만 띄운다.
+    os.chdir(tmp_path_factory.mktemp("app"))
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _login(client: TestClient, nickname: str, password: str) -> dict[str, str]:
+    response = client.post("/auth/login", json={"nickname": nickname, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def alice(client: TestClient) -> dict[str, str]:
+    return _login(client, "alice", "alice123")
+
+
+@pytest.fixture(scope="session")
+def bob(client: TestClient) -> dict[str, str]:
+    return _login(client, "bob", "bob123")
+
+
+@pytest.fixture(scope="session")
+def admin(client: TestClient) -> dict[str, str]:
+    return _login(client, "admin", "admin123")
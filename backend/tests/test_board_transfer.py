@@ -0,0 +1,187 @@
+"""게시판 가져오기: like_count 는 실제로 들어간 좋아요로 다시 세고, 잘못된 줄은 줄 번호와 함께 거절하되 그 앞의 레코드는 버리지 않는다."""
+
+import time
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _ndjson(*records: dict) -> bytes:
+    return b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records)
+
+
+def _wait_for_rebuild(client: TestClient, admin: dict[str, str]) -> None:
+    # 가져오기가 끝나면 온라인 재색인이 돈다. 그동안은 다음 가져오기가 409 로 거절된다.
+    for _ in range(100):
+        if client.get("/admin/fts", headers=admin).json()["rebuild"]["state"] != "running":
+            return
+        time.sleep(0.05)
+    raise AssertionError("재색인이 끝나지 않았습니다.")
+
+
+def _create_board(client: TestClient, admin: dict[str, str], slug: str) -> int:
+    return client.post("/admin/boards", headers=admin, json={"name": slug, "slug": slug}).json()["id"]
+
+
+def test_import_recounts_likes_from_imported_rows(client: TestClient, admin: dict[str, str]) -> None:
+    board_id = _create_board(client, admin, "import-likes")
+    body = _ndjson(
+        {"type": "post", "id": 1, "author": "alice", "title": "좋아요 다시 세기", "body_md": "본문", "like_count": 5},
+        {"type": "post", "id": 2, "author": "bob", "title": "좋아요 하나", "body_md": "본문", "like_count": 3},
+        {"type": "like", "post_id": 1, "user": "alice"},
+        {"type": "like", "post_id": 1, "user": "없는 사용자"},
+        {"type": "like", "post_id": 1, "user": "alice"},
+        {"type": "like", "post_id": 2, "user": "bob"},
+    )
+
+    response = client.post(f"/admin/boards/{board_id}/import", headers=admin, content=body)
+    _wait_for_rebuild(client, admin)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["likes"] == 2
+    assert response.json()["skipped"] == 2
+    items = client.get("/boards/import-likes/posts").json()["items"]
+    assert {item["title"]: item["like_count"] for item in items} == {"좋아요 다시 세기": 1, "좋아요 하나": 1}
+
+
+def test_import_keeps_rows_before_a_bad_line(client: TestClient, admin: dict[str, str]) -> None:
+    board_id = _create_board(client, admin, "import-partial")
+    body = _ndjson(
+        {"type": "post", "id": 1, "author": "alice", "title": "첫 글", "body_md": "본문"},
+        {"type": "post", "id": 2, "author": "alice", "title": "둘째 글", "body_md": "본문"},
+    ) + b"{not json\n"
+
+    response = client.post(f"/admin/boards/{board_id}/import", headers=admin, content=body)
+    _wait_for_rebuild(client, admin)
+
+    assert response.status_code == 400
+    assert "3번째 줄" in response.json()["detail"]
+    assert "'posts': 2" in response.json()["detail"]
+    items = client.get("/boards/import-partial/posts").json()["items"]
+    assert {item["title"] for item in items} == {"첫 글", "둘째 글"}
+
+
+def test_import_with_cold_auth_cache(client: TestClient, admin: dict[str, str]) -> None:
+    from app.auth_cache import auth_cache
+
+    board_id = _create_board(client, admin, "import-cold-auth")
+    # 관리자 조회가 DB 로 가게 한다. 그 조회가 쓰기 연결을 잡고 있으면 가져오기가 쓰기 연결을 기다리다 실패한다.
+    auth_cache.users.entries.clear()
+    body = _ndjson({"type": "post", "id": 1, "author": "alice", "title": "차가운 캐시", "body_md": "본문"})
+
+    response = client.post(f"/admin/boards/{board_id}/import", headers=admin, content=body)
+    _wait_for_rebuild(client, admin)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["posts"] == 1
+
+
+def test_unfinished_import_rebuild_runs_at_startup(client: TestClient, tmp_path) -> None:
+    import sqlite3
+
+    from sqlalchemy import create_engine, text
+
+    from app.fts import (
+        create_posts_fts_triggers,
+        drop_posts_fts_triggers,
+        migrate_posts_fts,
+        request_posts_fts_rebuild,
+    )
+
+    # 실행 중인 DB 를 복사해 '가져오기는 커밋됐지만 재색인 전에 프로세스가 멈춘' 상태를 만든다.
+    path = tmp_path / "restart.db"
+    source, copy = sqlite3.connect("board.db"), sqlite3.connect(path)
+    source.backup(copy)
+    source.close()
+    copy.close()
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        drop_posts_fts_triggers(conn)
+        conn.execute(
+            text(
+                "INSERT INTO posts(board_id, author_id, title, body_md, excerpt, like_count, view_count) "
+                "VALUES(1, 1, '재시작색인', '본문', '본문', 0, 0)"
+            )
+        )
+        create_posts_fts_triggers(conn)
+        request_posts_fts_rebuild(conn, "import")
+
+    # 다음 시작
+    with engine.begin() as conn:
+        migrate_posts_fts(conn)
+    with engine.connect() as conn:
+        found = conn.execute(text("SELECT count(*) FROM posts_fts WHERE posts_fts MATCH '\"재시작색인\"*'")).scalar_one()
+        pending = conn.execute(text("SELECT count(*) FROM posts_fts_rebuild_requests")).scalar_one()
+    engine.dispose()
+    assert found == 1
+    assert pending == 0
+
+
+def test_import_rebuild_clears_its_request(client: TestClient, admin: dict[str, str]) -> None:
+    import sqlite3
+
+    board_id = _create_board(client, admin, "import-request")
+    body = _ndjson({"type": "post", "id": 1, "author": "alice", "title": "재색인요청", "body_md": "본문"})
+
+    assert client.post(f"/admin/boards/{board_id}/import", headers=admin, content=body).status_code == 200
+    _wait_for_rebuild(client, admin)
+
+    conn = sqlite3.connect("board.db")
+    assert conn.execute("SELECT count(*) FROM posts_fts_rebuild_requests").fetchone() == (0,)
+    conn.close()
+    assert [item["title"] for item in client.get("/boards/import-request/posts?q=재색인요청").json()["items"]] == [
+        "재색인요청"
+    ]
+
+
+def test_import_normalizes_timestamps(client: TestClient, admin: dict[str, str]) -> None:
+    import sqlite3
+
+    board_id = _create_board(client, admin, "import-time")
+    body = _ndjson(
+        {"type": "post", "id": 1, "author": "alice", "title": "UTC", "body_md": "본문", "created_at": "2024-01-01T00:00:00Z"},
+        {
+            "type": "post", "id": 2, "author": "alice", "title": "KST", "body_md": "본문",
+            "created_at": "2024-01-01T10:00:00+09:00",
+        },
+        {"type": "post", "id": 3, "author": "alice", "title": "저장 포맷", "body_md": "본문", "created_at": "2024-01-01 02:00:00"},
+    )
+
+    assert client.post(f"/admin/boards/{board_id}/import", headers=admin, content=body).status_code == 200
+    _wait_for_rebuild(client, admin)
+
+    conn = sqlite3.connect("board.db")
+    rows = conn.execute("SELECT title, created_at, updated_at FROM posts WHERE board_id = ? ORDER BY id", (board_id,)).fetchall()
+    conn.close()
+    assert rows == [
+        ("UTC", "2024-01-01 00:00:00", "2024-01-01 00:00:00"),
+        ("KST", "2024-01-01 01:00:00", "2024-01-01 01:00:00"),
+        ("저장 포맷", "2024-01-01 02:00:00", "2024-01-01 02:00:00"),
+    ]
+    first = client.get("/boards/import-time/posts?limit=2").json()
+    second = client.get(f"/boards/import-time/posts?limit=2&cursor={first['next_cursor']}").json()
+    assert [item["title"] for item in first["items"] + second["items"]] == ["저장 포맷", "KST", "UTC"]
+
+
+@pytest.mark.parametrize(
+    ("record", "field"),
+    [
+        ({"type": "post", "id": 2, "title": 123, "body_md": "본문"}, "title"),
+        ({"type": "post", "id": 2, "title": "제목", "body_md": "가" * 50_001}, "body_md"),
+        ({"type": "post", "id": 2, "title": "제목", "body_md": "본문", "created_at": "어제"}, "created_at"),
+        ({"type": "comment", "post_id": 1, "body_md": ""}, "body_md"),
+    ],
+)
+def test_import_rejects_invalid_records(
+    client: TestClient, admin: dict[str, str], record: dict, field: str
+) -> None:
+    board_id = _create_board(client, admin, f"import-invalid-{field.replace('_', '-')}-{record['type']}")
+    body = _ndjson({"type": "post", "id": 1, "author": "alice", "title": "먼저 들어갈 글", "body_md": "본문"}, record)
+
+    response = client.post(f"/admin/boards/{board_id}/import", headers=admin, content=body)
+    _wait_for_rebuild(client, admin)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(f"2번째 줄의 {field} 값이 올바르지 않습니다")
+    assert "'posts': 1" in response.json()["detail"]
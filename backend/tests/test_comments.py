@@ -0,0 +1,40 @@
+"""댓글 페이지 커서는 깊이와 상관없이 길이가 같아야 깊은 스레드도 끝까지 넘겨 볼 수 있다."""
+
+from fastapi.testclient import TestClient
+
+
+def test_deep_thread_children_can_be_paged(client: TestClient, bob: dict[str, str]) -> None:
+    post_id = client.post(
+        "/boards/free/posts", headers=bob, json={"title": "깊은 스레드", "body_md": "본문"}
+    ).json()["id"]
+    parent_id = None
+    for depth in range(20):
+        parent_id = client.post(
+            f"/posts/{post_id}/comments", headers=bob, json={"body_md": f"깊이 {depth}", "parent_id": parent_id}
+        ).json()["id"]
+    replies = [
+        client.post(
+            f"/posts/{post_id}/comments", headers=bob, json={"body_md": f"답글 {n}", "parent_id": parent_id}
+        ).json()["id"]
+        for n in range(3)
+    ]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 1, "depth": 0, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/comments/{parent_id}/children", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen.extend(item["id"] for item in page["items"])
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+    assert seen == replies
+
+
+def test_comment_cursor_must_match_its_id(client: TestClient) -> None:
+    from app.pagination import encode_cursor
+
+    cursor = encode_cursor("path", "0000000001/0000000002/", 2)
+    assert client.get("/comments/1/children", params={"cursor": cursor}).status_code == 400
@@ -0,0 +1,45 @@
+"""목록 ETag 는 DB 의 게시판 버전으로 만든다. 다른 워커(= 다른 연결)가 쓴 변경도 바로 반영돼야 한다."""
+
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+
+def test_list_etag_changes_after_write_from_another_process(client: TestClient, alice: dict[str, str]) -> None:
+    post_id = client.post(
+        "/boards/qna/posts", headers=alice, json={"title": "ETag", "body_md": "다른 워커"}
+    ).json()["id"]
+    etag = client.get("/boards/qna/posts").headers["ETag"]
+    assert client.get("/boards/qna/posts", headers={"If-None-Match": etag}).status_code == 304
+
+    # 이 앱의 연결을 거치지 않는 쓰기. 다른 워커 프로세스가 좋아요를 반영한 것과 같다.
+    conn = sqlite3.connect("board.db")
+    conn.execute("UPDATE posts SET like_count = like_count + 1 WHERE id = ?", (post_id,))
+    conn.commit()
+    conn.close()
+
+    response = client.get("/boards/qna/posts", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_list_etag_changes_after_write(client: TestClient, alice: dict[str, str]) -> None:
+    etag = client.get("/boards/qna/posts").headers["ETag"]
+    client.post("/boards/qna/posts", headers=alice, json={"title": "새 글", "body_md": "본문"})
+    assert client.get("/boards/qna/posts", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_search_etag_changes_after_indexing(client: TestClient, alice: dict[str, str]) -> None:
+    client.post("/boards/qna/posts", headers=alice, json={"title": "색인세대", "body_md": "본문"})
+    etag = client.get("/boards/qna/posts?q=색인세대", headers=alice).headers["ETag"]
+    plain_etag = client.get("/boards/qna/posts").headers["ETag"]
+
+    # 다른 워커의 색인기가 한 묶음을 반영한 것과 같다. 글은 그대로라 게시판 버전은 바뀌지 않는다.
+    conn = sqlite3.connect("board.db")
+    conn.execute("UPDATE boards SET search_version = search_version + 1 WHERE slug = 'qna'")
+    conn.commit()
+    conn.close()
+
+    response = client.get("/boards/qna/posts?q=색인세대", headers={**alice, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert client.get("/boards/qna/posts", headers={"If-None-Match": plain_etag}).status_code == 304
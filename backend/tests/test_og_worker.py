@@ -0,0 +1,44 @@
+"""OG 처리 자체가 실패하면(저장 시 DB 잠금 등) 로그를 남기고 몇 번 다시 시도한 뒤 failed 로 표시한다."""
+
+import asyncio
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_failed_processing_is_retried_then_marked_failed(
+    client: TestClient, caplog: pytest.LogCaptureFixture
+) -> None:
+    from app.og_worker import OGEnricher
+
+    enricher = OGEnricher(concurrency=1, max_attempts=3, retry_delay=0.0)
+    attempts: list[int] = []
+    saved: list[tuple[int, str]] = []
+
+    async def process(post_id: int, url: str) -> None:
+        attempts.append(post_id)
+        raise RuntimeError("database is locked")
+
+    async def save(post_id: int, source_url: str, og: dict, status: str) -> None:
+        saved.append((post_id, status))
+
+    enricher._process = process
+    enricher._save = save
+
+    async def main() -> None:
+        enricher._workers = [asyncio.create_task(enricher._worker())]
+        enricher.enqueue(1, "https://example.com/")
+        for _ in range(100):
+            if saved:
+                break
+            await asyncio.sleep(0.01)
+        await enricher.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.og_worker"):
+        asyncio.run(main())
+
+    assert attempts == [1, 1, 1]
+    assert saved == [(1, "failed")]
+    assert all(record.exc_info for record in caplog.records)
+    assert "database is locked" in caplog.text
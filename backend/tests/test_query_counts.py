@@ -0,0 +1,52 @@
+"""라우트별 SQL 문 수(X-DB-Queries). N+1 이 다시 생기면 여기서 깨진다."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def queries(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-DB-Queries"])
+
+
+@pytest.fixture(scope="module")
+def post_id(client: TestClient, alice: dict[str, str]) -> int:
+    for i in range(5):
+        response = client.post(
+            "/boards/free/posts", headers=alice, json={"title": f"쿼리 수 {i}", "body_md": "본문"}
+        )
+        assert response.status_code == 200
+    # 사용자 캐시를 채워 둔다. 이후 인증 요청은 users 조회 없이 처리된다.
+    client.get("/auth/me", headers=alice)
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("view", ["full", "compact"])
+@pytest.mark.parametrize("sort", ["latest", "likes", "views"])
+def test_list_posts(client: TestClient, alice: dict[str, str], post_id: int, sort: str, view: str) -> None:
+    # ETag 용 게시판 버전, 목록
+    assert queries(client.get(f"/boards/free/posts?sort={sort}&view={view}")) == 2
+    assert queries(client.get(f"/boards/free/posts?sort={sort}&view={view}", headers=alice)) == 2
+
+
+def test_list_posts_next_page(client: TestClient, alice: dict[str, str], post_id: int) -> None:
+    first = client.get("/boards/free/posts?limit=2", headers=alice).json()
+    assert queries(client.get(f"/boards/free/posts?limit=2&cursor={first['next_cursor']}", headers=alice)) == 2
+
+
+def test_list_posts_not_modified(client: TestClient, alice: dict[str, str], post_id: int) -> None:
+    etag = client.get("/boards/free/posts", headers=alice).headers["ETag"]
+    response = client.get("/boards/free/posts", headers={**alice, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert int(response.headers["X-DB-Queries"]) == 1
+
+
+def test_post_detail(client: TestClient, alice: dict[str, str], post_id: int) -> None:
+    assert queries(client.get(f"/posts/{post_id}")) == 1
+    assert queries(client.get(f"/posts/{post_id}", headers=alice)) == 1
+
+
+def test_update_post(client: TestClient, alice: dict[str, str], post_id: int) -> None:
+    response = client.put(f"/posts/{post_id}", headers=alice, json={"title": "수정", "body_md": "수정한 본문"})
+    # 글 읽기, UPDATE, 응답용 상세 다시 읽기
+    assert queries(response) == 3
@@ -0,0 +1,49 @@
+"""SQLite 제한기는 여러 워커 프로세스가 한 한도를 나눠 써야 한다."""
+
+import multiprocessing
+
+import pytest
+from fastapi import HTTPException
+
+from app.rate_limit import RateLimitBackend, SQLiteRateLimiter
+
+PROCESSES = 4
+REQUESTS_PER_PROCESS = 100
+LIMIT = 50
+# 테스트 동안 다시 채워지지 않을 만큼 긴 창
+WINDOW = 3600
+
+
+def _worker(path: str, start, results) -> None:
+    limiter = SQLiteRateLimiter(path)
+    allowed = 0
+    start.wait()
+    for _ in range(REQUESTS_PER_PROCESS):
+        try:
+            limiter.check("like:shared", LIMIT, WINDOW)
+            allowed += 1
+        except HTTPException as exc:
+            assert exc.status_code == 429
+    results.put(allowed)
+
+
+def test_backend_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_sqlite_limit_is_shared_across_processes(tmp_path) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    path = str(tmp_path / "ratelimit.db")
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(path, start, results)) for _ in range(PROCESSES)]
+    for proc in procs:
+        proc.start()
+    start.set()
+    allowed = [results.get(timeout=60) for _ in procs]
+    for proc in procs:
+        proc.join(timeout=60)
+        assert proc.exitcode == 0
+
+    assert sum(allowed) == LIMIT
@@ -0,0 +1,121 @@
+"""검색어는 제목·본문에서만 찾는다. 게시판 키('~N~')에 걸리면 숫자 검색어가 게시판의 모든 글을 돌려준다."""
+
+from fastapi.testclient import TestClient
+
+
+def test_numeric_query_does_not_match_board_key(
+    client: TestClient, admin: dict[str, str], alice: dict[str, str]
+) -> None:
+    board = client.post(
+        "/admin/boards", headers=admin, json={"name": "숫자 검색", "slug": "numeric-search"}
+    ).json()
+    q = str(board["id"])
+    unrelated = client.post(
+        "/boards/numeric-search/posts", headers=alice, json={"title": "숫자 없는 글", "body_md": "내용만 있다"}
+    ).json()
+    related = client.post(
+        "/boards/numeric-search/posts", headers=alice, json={"title": f"릴리스 {q} 안내", "body_md": "본문"}
+    ).json()
+
+    # 글쓴이의 검색은 방금 쓴 글이 색인될 때까지 기다린다.
+    items = client.get(f"/boards/numeric-search/posts?q={q}", headers=alice).json()["items"]
+    assert [item["id"] for item in items] == [related["id"]]
+    assert unrelated["id"] not in {item["id"] for item in items}
+
+    counts = client.get(f"/search?q={q}", headers=alice).json()["boards"]
+    assert {"board_id": board["id"], "slug": "numeric-search", "name": "숫자 검색", "count": 1} in counts
+
+
+def test_search_cache_sees_index_changes_from_another_worker(client: TestClient, alice: dict[str, str]) -> None:
+    from sqlalchemy import create_engine, text
+
+    from app.fts import apply_search_outbox
+
+    client.post("/boards/notice/posts", headers=alice, json={"title": "캐시세대 첫 글", "body_md": "본문"})
+    assert len(client.get("/boards/notice/posts?q=캐시세대", headers=alice).json()["items"]) == 1
+    assert len(client.get("/boards/notice/search/suggest?prefix=캐시세대").json()["titles"]) == 1
+
+    # 다른 워커: 글을 쓰고 자기 색인기로 outbox 를 반영한다. 이 프로세스의 색인기는 그 행을 보지 못한다.
+    engine = create_engine("sqlite:///board.db")
+    with engine.begin() as conn:
+        board_id = conn.execute(text("SELECT id FROM boards WHERE slug = 'notice'")).scalar_one()
+        conn.execute(
+            text(
+                "INSERT INTO posts(board_id, author_id, title, body_md, excerpt, like_count, view_count) "
+                "VALUES(:board_id, 1, '캐시세대 다른 워커', '본문', '본문', 0, 0)"
+            ),
+            {"board_id": board_id},
+        )
+        apply_search_outbox(conn, 100)
+    engine.dispose()
+
+    items = client.get("/boards/notice/posts?q=캐시세대").json()["items"]
+    assert {item["title"] for item in items} == {"캐시세대 첫 글", "캐시세대 다른 워커"}
+    assert len(client.get("/boards/notice/search/suggest?prefix=캐시세대").json()["titles"]) == 2
+
+
+def test_concurrent_outbox_appliers_do_not_apply_a_row_twice(client: TestClient, alice: dict[str, str]) -> None:
+    import threading
+
+    from sqlalchemy import create_engine, text
+
+    from app.fts import apply_search_outbox
+
+    ids = [
+        client.post("/boards/qna/posts", headers=alice, json={"title": f"경쟁 {n}", "body_md": "본문"}).json()["id"]
+        for n in range(10)
+    ]
+    engine = create_engine("sqlite:///board.db", connect_args={"timeout": 30})
+    with engine.begin() as conn:
+        for round_ in range(10):
+            conn.execute(
+                text("UPDATE posts SET title = :title || id WHERE id IN (SELECT value FROM json_each(:ids))"),
+                {"title": f"경쟁 {round_}회 ", "ids": str(ids)},
+            )
+
+    # 다른 워커 둘의 색인기가 같은 outbox 를 동시에 비운다.
+    def drain() -> None:
+        while True:
+            with engine.begin() as conn:
+                if not apply_search_outbox(conn, 3)["applied"]:
+                    return
+
+    workers = [threading.Thread(target=drain) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    with engine.begin() as conn:
+        # 같은 'delete' 를 두 번 넣으면 외부 콘텐츠 색인이 posts 와 어긋나 여기서 실패한다.
+        conn.execute(text("INSERT INTO posts_fts(posts_fts, rank) VALUES('integrity-check', 1)"))
+    engine.dispose()
+    items = client.get("/boards/qna/posts?q=경쟁&limit=20", headers=alice).json()["items"]
+    assert {item["title"] for item in items} == {f"경쟁 9회 {post_id}" for post_id in ids}
+
+
+def test_suggest_terms_come_from_this_board_only(
+    client: TestClient, admin: dict[str, str], alice: dict[str, str]
+) -> None:
+    client.post("/admin/boards", headers=admin, json={"name": "단어 후보", "slug": "suggest-terms"})
+    client.post("/boards/suggest-terms/posts", headers=alice, json={"title": "후보단어 하나", "body_md": "본문"})
+    client.post("/boards/suggest-terms/posts", headers=alice, json={"title": "후보단어 후보단어장", "body_md": "본문"})
+    # 다른 게시판의 단어는 이 게시판의 자동완성에 나오면 안 된다.
+    client.post("/boards/notice/posts", headers=alice, json={"title": "후보단어모음 공지", "body_md": "본문"})
+    client.get("/boards/suggest-terms/posts?q=후보단어", headers=alice)
+
+    terms = client.get("/boards/suggest-terms/search/suggest?prefix=후보단").json()["terms"]
+    assert terms == [{"term": "후보단어", "doc_count": 2}, {"term": "후보단어장", "doc_count": 1}]
+
+
+def test_short_trigram_query_is_rejected(client: TestClient) -> None:
+    from app.fts import is_query_too_short
+
+    # trigram 은 세 글자 미만 조각을 색인으로 찾지 못하므로 빈 결과 대신 400 을 돌려준다.
+    assert is_query_too_short("고양", "trigram")
+    assert is_query_too_short("밥 a", "trigram")
+    assert not is_query_too_short("고양이 밥", "trigram")
+    assert not is_query_too_short("고", "unicode61")
+    # 기본 토크나이저(unicode61)는 한 글자도 접두 질의로 찾는다.
+    assert client.get("/boards/free/posts?q=고").status_code == 200
+    assert client.get("/search?q=고").status_code == 200
@@ -29,12 +29,16 @@ export default function BoardPage() {
 
   const postsQuery = useInfiniteQuery({
     queryKey: ['posts', boardSlug, sort, q],
-    initialPageParam: 0,
+    initialPageParam: { offset: 0 },
     queryFn: ({ pageParam }) =>
       apiGet(`/boards/${boardSlug}/posts`, {
-        params: { offset: pageParam, limit: 10, sort, q: q || undefined },
+        params: { ...pageParam, limit: 10, sort, q: q || undefined, view: 'compact' },
       }),
-    getNextPageParam: (lastPage) => (lastPage.has_more ? lastPage.next_offset : undefined),
+    getNextPageParam: (lastPage) => {
+      if (!lastPage.has_more) return undefined
+      if (lastPage.next_cursor) return { cursor: lastPage.next_cursor }
+      return { offset: lastPage.next_offset }
+    },
     enabled: Boolean(boardSlug),
   })
 
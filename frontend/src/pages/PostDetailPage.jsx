@@ -23,6 +23,7 @@ export default function PostDetailPage() {
   const postQuery = useQuery({
     queryKey: ['post', postId],
     queryFn: () => apiGet(`/posts/${postId}`),
+    refetchInterval: (query) => (query.state.data?.og_status === 'pending' ? 2000 : false),
   })
 
   const commentsQuery = useQuery({